@@ -0,0 +1,63 @@
+BEGIN;
+
+-- Vetor de busca em português, mantido pelo próprio Postgres.
+-- O título pesa mais (A) que o conteúdo (B) no ranking.
+ALTER TABLE public.notes
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('portuguese', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('portuguese', coalesce(content, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_notes_search_vector
+    ON public.notes USING GIN (search_vector);
+
+-- Busca ranqueada e paginada com trechos destacados.
+-- O ts_headline é calculado só para a página já ordenada e limitada.
+CREATE OR REPLACE FUNCTION public.search_notes(
+    p_user_id TEXT,
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 20,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    user_id TEXT,
+    title TEXT,
+    content TEXT,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    rank REAL,
+    snippet TEXT
+) AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('portuguese', p_query) AS tsq
+    ),
+    page AS (
+        SELECT n.*, ts_rank_cd(n.search_vector, query.tsq) AS rank, query.tsq
+        FROM public.notes n, query
+        WHERE n.user_id = p_user_id
+          AND n.search_vector @@ query.tsq
+        ORDER BY rank DESC, n.created_at DESC, n.id DESC
+        LIMIT LEAST(GREATEST(p_limit, 1), 100)
+        OFFSET GREATEST(p_offset, 0)
+    )
+    SELECT
+        page.id,
+        page.user_id,
+        page.title,
+        page.content,
+        page.created_at,
+        page.updated_at,
+        page.rank,
+        ts_headline(
+            'portuguese',
+            page.content,
+            page.tsq,
+            'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5'
+        ) AS snippet
+    FROM page
+    ORDER BY page.rank DESC, page.created_at DESC, page.id DESC;
+$$ LANGUAGE sql STABLE;
+
+COMMIT;
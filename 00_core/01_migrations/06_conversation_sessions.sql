@@ -0,0 +1,8 @@
+BEGIN;
+
+-- Histórico de uma sessão de chat: as trocas mais recentes do usuário
+-- com o mesmo metadata->>'session_id'.
+CREATE INDEX IF NOT EXISTS idx_conversations_user_session
+    ON public.conversations (user_id, (metadata->>'session_id'), created_at DESC);
+
+COMMIT;
@@ -0,0 +1,44 @@
+BEGIN;
+
+-- Upsert em lote que nunca toma posse de linhas de outro usuário.
+-- Linhas novas são inseridas; as existentes só são atualizadas quando
+-- `p_owner_column` = `p_user_id`, na mesma instrução. As recusadas não
+-- aparecem no RETURNING. Só as colunas enviadas são gravadas: as demais
+-- mantêm o valor padrão (inserção) ou o atual (atualização).
+CREATE OR REPLACE FUNCTION public.upsert_owned(
+    p_table TEXT,
+    p_key TEXT,
+    p_owner_column TEXT,
+    p_user_id TEXT,
+    p_rows JSONB
+)
+RETURNS SETOF JSONB AS $$
+DECLARE
+    v_columns TEXT;
+    v_updates TEXT;
+BEGIN
+    SELECT
+        string_agg(format('%I', key), ', '),
+        string_agg(format('%1$I = EXCLUDED.%1$I', key), ', ')
+    INTO v_columns, v_updates
+    FROM (
+        SELECT DISTINCT jsonb_object_keys(item) AS key
+        FROM jsonb_array_elements(p_rows) AS item
+    ) keys;
+
+    IF v_columns IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'INSERT INTO public.%1$I AS t (%2$s) '
+        'SELECT %2$s FROM jsonb_populate_recordset(NULL::public.%1$I, $1) '
+        'ON CONFLICT (%3$I) DO UPDATE SET %4$s '
+        'WHERE t.%5$I::text = $2 '
+        'RETURNING to_jsonb(t)',
+        p_table, v_columns, p_key, v_updates, p_owner_column
+    ) USING p_rows, p_user_id;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
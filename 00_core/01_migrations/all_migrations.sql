@@ -16,5 +16,14 @@
 -- 04. Configurar novo usuário
 \i 04_new_user.sql
 
+-- 05. Busca textual em notas
+\i 05_notes_full_text_search.sql
+
+-- 06. Sessões de conversa
+\i 06_conversation_sessions.sql
+
+-- 07. Upsert em lote com dono
+\i 07_upsert_owned.sql
+
 -- Confirmar transação
 COMMIT; 
\ No newline at end of file
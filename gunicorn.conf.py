@@ -1,3 +1,5 @@
+from typing import Any
+
 from server.config.settings import settings
 
 # Configurações do Gunicorn
@@ -11,3 +13,10 @@ loglevel = "info"
 
 # Nome do projeto
 proc_name = settings.PROJECT_NAME
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    """Descarta o cliente Supabase herdado do master; cada worker cria o seu."""
+    from server.config.supabase import registry
+
+    registry.reset()
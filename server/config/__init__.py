@@ -1,6 +1,16 @@
 """Módulo de configuração do servidor."""
 
+from typing import Any
+
 from config.settings import settings
-from config.database import supabase
 
 __all__ = ["settings", "supabase"]
+
+
+def __getattr__(name: str) -> Any:
+    # O cliente Supabase só é criado no primeiro uso (seguro após o fork)
+    if name == "supabase":
+        from config.database import supabase
+
+        return supabase
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,210 @@
+"""Cache de leitura (read-through) para o SupabaseWrapper."""
+
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import json
+
+from config.settings import settings
+from config.database import SupabaseWrapper, T
+from models.batch import BatchItemResult
+from utils.cache import LRUCache, RedisCache, TieredCache
+
+_cache: Optional[TieredCache] = None
+
+
+def get_cache() -> TieredCache:
+    """
+    Retorna o cache compartilhado do processo, criado a partir das settings.
+
+    O LRU local é de cada worker e não vê as invalidações feitas pelos
+    outros, então usa sempre `CACHE_LOCAL_TTL`, curto, para limitar dados
+    obsoletos. Com `CACHE_TYPE=redis`, o Redis é a camada compartilhada,
+    com `CACHE_TTL`, e guarda as gerações das listagens para todos.
+    """
+    global _cache
+    if _cache is None:
+        remote = None
+        if settings.CACHE_TYPE == "redis" and settings.CACHE_REDIS_URL:
+            remote = RedisCache(settings.CACHE_REDIS_URL, ttl=settings.CACHE_TTL)
+        local_ttl = min(settings.CACHE_LOCAL_TTL, settings.CACHE_TTL)
+        _cache = TieredCache(
+            LRUCache(max_entries=settings.CACHE_MAX_ENTRIES, ttl=local_ttl), remote
+        )
+    return _cache
+
+
+class CachedSupabaseWrapper(SupabaseWrapper[T]):
+    """
+    SupabaseWrapper com cache de `get_by_id` e das listagens.
+
+    Cada linha é guardada uma única vez por ID e conferida contra o dono na
+    leitura. As listagens são guardadas por usuário e invalidadas por
+    geração a cada escrita feita pelo wrapper.
+
+    Uma linha lida do banco só entra no cache se nenhuma escrita na tabela
+    aconteceu durante a leitura: senão ela poderia ser anterior à escrita
+    e voltar ao cache logo depois da invalidação.
+    """
+
+    def __init__(
+        self,
+        model_class: type[T],
+        table_name: str,
+        owner_column: Optional[str] = "user_id",
+        cache: Optional[TieredCache] = None,
+    ) -> None:
+        super().__init__(model_class, table_name, owner_column)
+        self._cache = cache
+
+    @property
+    def cache(self) -> TieredCache:
+        return self._cache or get_cache()
+
+    def _row_key(self, id: str) -> str:
+        return f"{self.table_name}:row:{id}"
+
+    @property
+    def _rows_scope(self) -> str:
+        # Geração incrementada a cada escrita de linhas da tabela
+        return f"{self.table_name}:rows"
+
+    async def _list_key(self, user_id: Optional[str], params: List[Any]) -> str:
+        scope = user_id or "*"
+        table_generation = await self.cache.generation(self.table_name)
+        scope_generation = await self.cache.generation(f"{self.table_name}:{scope}")
+        digest = hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return (
+            f"{self.table_name}:list:{scope}:"
+            f"{table_generation}.{scope_generation}:{digest}"
+        )
+
+    async def _invalidate(
+        self, ids: Sequence[str] = (), owner: Optional[str] = None
+    ) -> None:
+        if ids:
+            await self.cache.bump(self._rows_scope)
+        for id in ids:
+            await self.cache.delete(self._row_key(str(id)))
+        if owner:
+            await self.cache.bump(f"{self.table_name}:{owner}")
+            await self.cache.bump(f"{self.table_name}:*")
+        else:
+            # Dono desconhecido: invalida as listagens de todos os usuários
+            await self.cache.bump(self.table_name)
+
+    def _owner_of(self, item: Any) -> Optional[str]:
+        if item is None or not self.owner_column:
+            return None
+        owner = getattr(item, self.owner_column, None)
+        return str(owner) if owner is not None else None
+
+    async def select_rows(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        key = await self._list_key(user_id, [query, list(fields or []), limit, cursor])
+        rows = await self.cache.get(key)
+        if rows is None:
+            rows = await super().select_rows(
+                query, fields=fields, limit=limit, cursor=cursor, user_id=user_id
+            )
+            await self.cache.set(key, rows)
+        return list(rows)
+
+    async def get_by_id(self, id: str, *, user_id: Optional[str] = None) -> Optional[T]:
+        key = self._row_key(id)
+        row = await self.cache.get(key)
+        if row is None:
+            generation = await self.cache.generation(self._rows_scope)
+            item = await super().get_by_id(id, user_id=user_id)
+            if item is None:
+                return None
+            if await self.cache.generation(self._rows_scope) == generation:
+                await self.cache.set(key, item.model_dump(mode="json"))
+            return item
+        if user_id and self.owner_column and str(row.get(self.owner_column)) != user_id:
+            return None
+        return self._validate_model(row)
+
+    async def insert(self, data: Dict[str, Any], *, user_id: Optional[str] = None) -> T:
+        item = await super().insert(data, user_id=user_id)
+        await self._invalidate(owner=self._owner_of(item) or user_id)
+        return item
+
+    async def update(
+        self, id: str, data: Dict[str, Any], *, user_id: Optional[str] = None
+    ) -> Optional[T]:
+        item = await super().update(id, data, user_id=user_id)
+        await self._invalidate([id], owner=self._owner_of(item) or user_id)
+        return item
+
+    async def delete(self, id: str, *, user_id: Optional[str] = None) -> bool:
+        deleted = await super().delete(id, user_id=user_id)
+        await self._invalidate([id], owner=user_id)
+        return deleted
+
+    async def _invalidate_batch(
+        self, results: List[BatchItemResult], user_id: Optional[str]
+    ) -> None:
+        await self._invalidate(
+            [result.id for result in results if result.id], owner=user_id
+        )
+
+    async def insert_many(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        *,
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        results = await super().insert_many(
+            rows, chunk_size=chunk_size, user_id=user_id
+        )
+        await self._invalidate_batch(results, user_id)
+        return results
+
+    async def upsert_many(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        *,
+        on_conflict: str = "id",
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        results = await super().upsert_many(
+            rows, on_conflict=on_conflict, chunk_size=chunk_size, user_id=user_id
+        )
+        await self._invalidate_batch(results, user_id)
+        return results
+
+    async def update_many(
+        self,
+        ids: Sequence[str],
+        data: Dict[str, Any],
+        *,
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        results = await super().update_many(
+            ids, data, chunk_size=chunk_size, user_id=user_id
+        )
+        await self._invalidate_batch(results, user_id)
+        return results
+
+    async def delete_many(
+        self,
+        ids: Sequence[str],
+        *,
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        results = await super().delete_many(ids, chunk_size=chunk_size, user_id=user_id)
+        await self._invalidate_batch(results, user_id)
+        return results
@@ -1,59 +1,412 @@
-from typing import TypeVar, Generic, List, Optional, Dict, Any, cast
-from supabase import create_client
+import base64
+import json
+from typing import (
+    TypeVar,
+    Generic,
+    List,
+    Optional,
+    Dict,
+    Any,
+    Callable,
+    Sequence,
+    cast,
+)
 from pydantic import BaseModel
-from postgrest.request_builder import SelectRequestBuilder
+from postgrest import AsyncPostgrestClient
 
-from config.settings import settings
+# Sempre pelo caminho canônico: importado também como `config.supabase`,
+# o módulo seria carregado duas vezes, com dois registros e dois pools
+from server.config.supabase import registry
+from models.batch import BatchItemResult
 
 T = TypeVar("T", bound=BaseModel)
 
+# Paginação por cursor (keyset) sobre (created_at, id)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+CURSOR_COLUMNS = ("created_at", "id")
+
+# Tamanho padrão dos lotes enviados por operações em massa
+BATCH_CHUNK_SIZE = 500
+
+# Operadores aceitos em filtros no formato "coluna__operador"
+FILTER_OPERATORS = {"eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "in", "is"}
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginação malformado."""
+
+
+def encode_cursor(row: Any) -> str:
+    """Gera um cursor opaco a partir da última linha de uma página."""
+    if isinstance(row, BaseModel):
+        row = row.model_dump(mode="json")
+    payload = json.dumps([str(row[column]) for column in CURSOR_COLUMNS])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[str]:
+    """Decodifica um cursor gerado por `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+    if not isinstance(values, list) or len(values) != len(CURSOR_COLUMNS):
+        raise InvalidCursorError("Cursor inválido")
+    return [str(value) for value in values]
+
+
+def _quote(value: str) -> str:
+    """Protege valores usados em expressões lógicas do PostgREST."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def apply_filters(builder: Any, query: Optional[Dict[str, Any]]) -> Any:
+    """
+    Converte um dicionário de filtros em filtros do PostgREST.
+
+    As chaves podem ser o nome da coluna (igualdade, `in` para listas e
+    `is null` para None) ou `coluna__operador`, ex.: `{"due_date__lt": "..."}`.
+    """
+    for key, value in (query or {}).items():
+        column, _, operator = key.partition("__")
+        if operator and operator not in FILTER_OPERATORS:
+            raise ValueError(f"Operador de filtro inválido: {operator}")
+        if not operator:
+            if value is None:
+                operator = "is"
+            elif isinstance(value, (list, tuple, set)):
+                operator = "in"
+            else:
+                operator = "eq"
+
+        if operator == "in":
+            builder = builder.in_(column, [str(item) for item in value])
+        elif operator == "is":
+            builder = builder.is_(column, "null" if value is None else str(value))
+        else:
+            builder = getattr(builder, operator)(column, str(value))
+    return builder
+
+
+def apply_cursor(builder: Any, cursor: Optional[str]) -> Any:
+    """Ordena por (created_at, id) desc e aplica a condição de keyset."""
+    if cursor:
+        created_at, row_id = (_quote(value) for value in decode_cursor(cursor))
+        builder.params = builder.params.add(
+            "or",
+            f"(created_at.lt.{created_at},"
+            f"and(created_at.eq.{created_at},id.lt.{row_id}))",
+        )
+    return builder.order("created_at", desc=True).order("id", desc=True)
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Limita o tamanho de página ao intervalo permitido."""
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def chunked(items: Sequence[Any], size: Optional[int]) -> List[Sequence[Any]]:
+    """Divide uma sequência em lotes de até `size` itens."""
+    size = size or BATCH_CHUNK_SIZE
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def next_cursor(items: Sequence[Any], limit: Optional[int]) -> Optional[str]:
+    """Retorna o cursor da próxima página, ou None se esta for a última."""
+    if not items or len(items) < page_size(limit):
+        return None
+    return encode_cursor(items[-1])
+
+
+def _match_rows(
+    sent: Sequence[Dict[str, Any]], returned: Sequence[Dict[str, Any]], key: str
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Associa cada linha enviada à linha devolvida pelo banco (ou None).
+
+    Linhas com `key` são associadas pelo valor da chave, não pela posição:
+    o banco pode devolver menos linhas que as enviadas. As demais (ex.:
+    inserções sem ID) seguem a ordem das devolvidas sem chave conhecida.
+    """
+    keys = {str(row[key]) for row in sent if row.get(key) is not None}
+    by_key = {str(row[key]): row for row in returned if row.get(key) is not None}
+    unkeyed = iter(
+        [row for row in returned if row.get(key) is None or str(row[key]) not in keys]
+    )
+    return [
+        by_key.get(str(row[key])) if row.get(key) is not None else next(unkeyed, None)
+        for row in sent
+    ]
+
 
 class SupabaseWrapper(Generic[T]):
-    def __init__(self, model_class: type[T], table_name: str) -> None:
-        self.client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    """
+    Acesso assíncrono a uma tabela do Supabase.
+
+    Usa o cliente PostgREST assíncrono do event loop atual, de modo que
+    as consultas não bloqueiam o loop e podem rodar concorrentemente.
+    """
+
+    def __init__(
+        self,
+        model_class: type[T],
+        table_name: str,
+        owner_column: Optional[str] = "user_id",
+    ) -> None:
         self.model_class = model_class
         self.table_name = table_name
+        # Coluna que identifica o dono da linha, usada para escopar por usuário
+        self.owner_column = owner_column
+
+    @property
+    def client(self) -> AsyncPostgrestClient:
+        # Cliente compartilhado do loop atual, criado sob demanda após o fork
+        return registry.get_async_client()
 
     def _validate_model(self, data: Dict[str, Any]) -> T:
         return self.model_class(**data)
 
-    async def select(self, query: Optional[Dict[str, Any]] = None) -> List[T]:
-        response = await cast(
-            SelectRequestBuilder, self.client.table(self.table_name).select("*")
-        ).execute()
-        data = response.data
+    def _owned(self, builder: Any, user_id: Optional[str]) -> Any:
+        """Restringe a consulta às linhas do usuário, quando informado."""
+        if user_id and self.owner_column:
+            return builder.eq(self.owner_column, user_id)
+        return builder
+
+    def _columns(self, fields: Optional[Sequence[str]]) -> str:
+        """Monta a projeção, sempre incluindo as colunas do cursor."""
+        if not fields:
+            return "*"
+        allowed = set(self.model_class.model_fields)
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise ValueError(f"Campos inválidos: {', '.join(unknown)}")
+        columns = list(dict.fromkeys([*CURSOR_COLUMNS, *fields]))
+        return ",".join(columns)
+
+    async def select_rows(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retorna uma página de linhas brutas, com filtros e projeção no banco."""
+        builder = self.client.from_(self.table_name).select(self._columns(fields))
+        builder = apply_filters(self._owned(builder, user_id), query)
+        builder = apply_cursor(builder, cursor).limit(page_size(limit))
+        response = await builder.execute()
+        return cast(List[Dict[str, Any]], response.data)
+
+    async def select(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[T]:
+        data = await self.select_rows(
+            query, limit=limit, cursor=cursor, user_id=user_id
+        )
         return [self._validate_model(item) for item in data]
 
-    async def get_by_id(self, id: str) -> Optional[T]:
-        response = await cast(
-            SelectRequestBuilder,
-            self.client.table(self.table_name).select("*").eq("id", id).single(),
-        ).execute()
-        if not response.data:
+    async def get_by_id(self, id: str, *, user_id: Optional[str] = None) -> Optional[T]:
+        builder = self.client.from_(self.table_name).select("*").eq("id", id)
+        response = await self._owned(builder, user_id).maybe_single().execute()
+        if not response or not response.data:
             return None
         return self._validate_model(response.data)
 
-    async def insert(self, data: Dict[str, Any]) -> T:
-        response = await cast(
-            SelectRequestBuilder, self.client.table(self.table_name).insert(data)
-        ).execute()
+    async def insert(self, data: Dict[str, Any], *, user_id: Optional[str] = None) -> T:
+        if user_id and self.owner_column:
+            data = {**data, self.owner_column: user_id}
+        response = await self.client.from_(self.table_name).insert(data).execute()
         return self._validate_model(response.data[0])
 
-    async def update(self, id: str, data: Dict[str, Any]) -> Optional[T]:
-        response = await cast(
-            SelectRequestBuilder,
-            self.client.table(self.table_name).update(data).eq("id", id),
-        ).execute()
+    async def update(
+        self, id: str, data: Dict[str, Any], *, user_id: Optional[str] = None
+    ) -> Optional[T]:
+        builder = self.client.from_(self.table_name).update(data).eq("id", id)
+        response = await self._owned(builder, user_id).execute()
         if not response.data:
             return None
         return self._validate_model(response.data[0])
 
-    async def delete(self, id: str) -> bool:
-        response = await cast(
-            SelectRequestBuilder,
-            self.client.table(self.table_name).delete().eq("id", id),
-        ).execute()
+    async def delete(self, id: str, *, user_id: Optional[str] = None) -> bool:
+        builder = self.client.from_(self.table_name).delete().eq("id", id)
+        response = await self._owned(builder, user_id).execute()
         return bool(response.data)
 
+    def _stamp_owner(
+        self, rows: Sequence[Dict[str, Any]], user_id: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        if user_id and self.owner_column:
+            return [{**row, self.owner_column: user_id} for row in rows]
+        return list(rows)
+
+    async def _upsert_owned(
+        self, rows: Sequence[Dict[str, Any]], key: str, user_id: str
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Upsert que nunca toma posse de linhas de outro usuário.
+
+        Uma chamada à função `upsert_owned` por lote: o `ON CONFLICT DO
+        UPDATE ... WHERE` confere o dono na própria escrita, então não há
+        janela entre conferir e gravar. Linhas de outro dono não voltam.
+        """
+        response = await self.client.rpc(
+            "upsert_owned",
+            {
+                "p_table": self.table_name,
+                "p_key": key,
+                "p_owner_column": self.owner_column,
+                "p_user_id": user_id,
+                "p_rows": list(rows),
+            },
+        ).execute()
+        return _match_rows(rows, response.data or [], key)
+
+    async def _write_rows(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        chunk_size: Optional[int],
+        upsert_on: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        results: List[BatchItemResult] = []
+        offset = 0
+        for chunk in chunked(self._stamp_owner(rows, user_id), chunk_size):
+            table = self.client.from_(self.table_name)
+            key = upsert_on or "id"
+            try:
+                if upsert_on and user_id and self.owner_column:
+                    matched = await self._upsert_owned(chunk, upsert_on, user_id)
+                else:
+                    if upsert_on:
+                        request = table.upsert(list(chunk), on_conflict=upsert_on)
+                    else:
+                        request = table.insert(list(chunk))
+                    response = await request.execute()
+                    matched = _match_rows(chunk, response.data, key)
+            except Exception as e:
+                results.extend(
+                    BatchItemResult(index=offset + i, success=False, error=str(e))
+                    for i in range(len(chunk))
+                )
+            else:
+                for i, (sent, row) in enumerate(zip(chunk, matched)):
+                    if row is not None:
+                        result = BatchItemResult(
+                            index=offset + i, id=str(row["id"]), success=True
+                        )
+                    else:
+                        result = BatchItemResult(
+                            index=offset + i,
+                            id=str(sent[key]) if sent.get(key) is not None else None,
+                            success=False,
+                            error="Registro não encontrado",
+                        )
+                    results.append(result)
+            offset += len(chunk)
+        return results
+
+    async def insert_many(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        *,
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        """Insere várias linhas, uma requisição por lote."""
+        return await self._write_rows(rows, chunk_size, user_id=user_id)
+
+    async def upsert_many(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        *,
+        on_conflict: str = "id",
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        """
+        Insere ou atualiza várias linhas pela coluna `on_conflict`.
+
+        Com `user_id`, linhas existentes de outro dono são recusadas (o dono
+        é conferido na própria escrita).
+        """
+        return await self._write_rows(
+            rows, chunk_size, upsert_on=on_conflict, user_id=user_id
+        )
+
+    async def _filter_by_ids(
+        self,
+        ids: Sequence[str],
+        chunk_size: Optional[int],
+        build: Callable[[Any], Any],
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        results: List[BatchItemResult] = []
+        for chunk in chunked(ids, chunk_size):
+            offset = len(results)
+            try:
+                builder = build(self.client.from_(self.table_name)).in_(
+                    "id", [str(id) for id in chunk]
+                )
+                response = await self._owned(builder, user_id).execute()
+            except Exception as e:
+                results.extend(
+                    BatchItemResult(
+                        index=offset + i, id=str(id), success=False, error=str(e)
+                    )
+                    for i, id in enumerate(chunk)
+                )
+                continue
+            found = {str(row["id"]) for row in response.data}
+            results.extend(
+                BatchItemResult(
+                    index=offset + i,
+                    id=str(id),
+                    success=str(id) in found,
+                    error=None if str(id) in found else "Registro não encontrado",
+                )
+                for i, id in enumerate(chunk)
+            )
+        return results
+
+    async def update_many(
+        self,
+        ids: Sequence[str],
+        data: Dict[str, Any],
+        *,
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        """Aplica os mesmos dados a várias linhas com um filtro `in`."""
+        return await self._filter_by_ids(
+            ids, chunk_size, lambda table: table.update(data), user_id
+        )
+
+    async def delete_many(
+        self,
+        ids: Sequence[str],
+        *,
+        chunk_size: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ) -> List[BatchItemResult]:
+        """Remove várias linhas com um filtro `in`."""
+        return await self._filter_by_ids(
+            ids, chunk_size, lambda table: table.delete(), user_id
+        )
+
 
-supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+def __getattr__(name: str) -> Any:
+    # `supabase` é resolvido sob demanda para não criar o cliente no import
+    if name == "supabase":
+        return registry.get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
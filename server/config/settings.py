@@ -22,9 +22,22 @@ if not SECRET_KEY:
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Pool de conexões HTTP compartilhado com o Supabase (por processo)
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+SUPABASE_POOL_KEEPALIVE = int(os.getenv("SUPABASE_POOL_KEEPALIVE", "10"))
+SUPABASE_POOL_KEEPALIVE_EXPIRY = float(
+    os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", "30")
+)
+SUPABASE_POOL_TIMEOUT = float(os.getenv("SUPABASE_POOL_TIMEOUT", "10"))
+# Pool do cliente assíncrono usado pela API FastAPI (por event loop)
+SUPABASE_ASYNC_POOL_SIZE = int(os.getenv("SUPABASE_ASYNC_POOL_SIZE", "200"))
+
 # Configurações do Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Embeddings do índice vetorial de notas (sem chave, só busca léxica)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
 # Configurações de logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -39,6 +52,68 @@ CORS_HEADERS = ["*"]
 # Configurações de cache
 CACHE_TYPE = os.getenv("CACHE_TYPE", "simple")
 CACHE_REDIS_URL = os.getenv("REDIS_URL")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+# TTL do LRU local de cada worker: curto, porque as invalidações feitas
+# por um worker não chegam à memória dos outros (com ou sem Redis)
+CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL", "5"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+# Índice local de busca de notas (por processo)
+NOTES_INDEX_ENABLED = os.getenv("NOTES_INDEX_ENABLED", "False").lower() == "true"
+NOTES_INDEX_MAX_BYTES = int(os.getenv("NOTES_INDEX_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Índices vetoriais persistentes das notas (um diretório por usuário)
+VECTOR_INDEX_DIR = Path(
+    os.getenv("VECTOR_INDEX_DIR", str(BASE_DIR / "data" / "vectors"))
+)
+# Busca exata em NumPy até este número de notas; acima, FAISS
+VECTOR_INDEX_PROMOTE_AT = int(os.getenv("VECTOR_INDEX_PROMOTE_AT", "20000"))
+# Guarda os vetores da busca exata em int8 (1/4 da memória)
+VECTOR_INDEX_QUANTIZE = os.getenv("VECTOR_INDEX_QUANTIZE", "False").lower() == "true"
+
+# Cache persistente de embeddings (SQLite, float32)
+EMBEDDING_CACHE_PATH = Path(
+    os.getenv("EMBEDDING_CACHE_PATH", str(BASE_DIR / "data" / "embeddings.db"))
+)
+EMBEDDING_CACHE_MAX_BYTES = int(
+    os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+# Lotes de embeddings: itens e tokens (estimados) por chamada, e chamadas
+# simultâneas à API
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "8000"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+
+# Orçamento de tempo (segundos) de cada consulta da busca híbrida e buscas
+# em andamento por lado (por worker), contando as que já estouraram o prazo
+HYBRID_SEARCH_TIMEOUT = float(os.getenv("HYBRID_SEARCH_TIMEOUT", "0.8"))
+HYBRID_SEARCH_MAX_IN_FLIGHT = int(os.getenv("HYBRID_SEARCH_MAX_IN_FLIGHT", "4"))
+
+# Memória de conversa: sessões ativas por worker, orçamento de tokens do
+# histórico enviado ao modelo e validade (s) da cópia local de cada sessão;
+# curta, porque as trocas atendidas por outro worker só chegam pelo banco
+MEMORY_MAX_SESSIONS = int(os.getenv("MEMORY_MAX_SESSIONS", "1000"))
+MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "2000"))
+MEMORY_SESSION_TTL = float(os.getenv("MEMORY_SESSION_TTL", "10"))
+
+# Tokens de trocas ainda não resumidas que disparam um novo resumo
+SUMMARY_TOKEN_THRESHOLD = int(os.getenv("SUMMARY_TOKEN_THRESHOLD", "1000"))
+
+# Cache de respostas do LLM: entradas por worker, validade (s) e cosseno
+# mínimo para reaproveitar prompts parecidos (0 desliga esse nível)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0"))
+
+# Limites do Gemini aplicados no cliente (por worker; 0 desliga o balde),
+# tamanho da fila de cada prioridade e prazo (s) de espera na fila
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "32000"))
+GEMINI_EMBEDDING_RPM = float(os.getenv("GEMINI_EMBEDDING_RPM", "1500"))
+GEMINI_EMBEDDING_TPM = float(os.getenv("GEMINI_EMBEDDING_TPM", "0"))
+RATE_LIMIT_QUEUE_SIZE = int(os.getenv("RATE_LIMIT_QUEUE_SIZE", "100"))
+RATE_LIMIT_TIMEOUT = float(os.getenv("RATE_LIMIT_TIMEOUT", "30"))
 
 # Configurações de rate limit
 RATELIMIT_DEFAULT = "100/hour"
@@ -52,7 +127,13 @@ __all__ = [
     "SECRET_KEY",
     "SUPABASE_URL",
     "SUPABASE_KEY",
+    "SUPABASE_POOL_SIZE",
+    "SUPABASE_POOL_KEEPALIVE",
+    "SUPABASE_POOL_KEEPALIVE_EXPIRY",
+    "SUPABASE_POOL_TIMEOUT",
+    "SUPABASE_ASYNC_POOL_SIZE",
     "GEMINI_API_KEY",
+    "OPENAI_API_KEY",
     "LOG_LEVEL",
     "LOG_FORMAT",
     "LOG_DIR",
@@ -61,6 +142,34 @@ __all__ = [
     "CORS_HEADERS",
     "CACHE_TYPE",
     "CACHE_REDIS_URL",
+    "CACHE_TTL",
+    "CACHE_LOCAL_TTL",
+    "CACHE_MAX_ENTRIES",
+    "NOTES_INDEX_ENABLED",
+    "NOTES_INDEX_MAX_BYTES",
+    "VECTOR_INDEX_DIR",
+    "VECTOR_INDEX_PROMOTE_AT",
+    "VECTOR_INDEX_QUANTIZE",
+    "EMBEDDING_CACHE_PATH",
+    "EMBEDDING_CACHE_MAX_BYTES",
+    "EMBEDDING_BATCH_SIZE",
+    "EMBEDDING_BATCH_TOKENS",
+    "EMBEDDING_CONCURRENCY",
+    "HYBRID_SEARCH_TIMEOUT",
+    "HYBRID_SEARCH_MAX_IN_FLIGHT",
+    "MEMORY_MAX_SESSIONS",
+    "MEMORY_MAX_TOKENS",
+    "MEMORY_SESSION_TTL",
+    "SUMMARY_TOKEN_THRESHOLD",
+    "RESPONSE_CACHE_MAX_ENTRIES",
+    "RESPONSE_CACHE_TTL",
+    "RESPONSE_CACHE_SIMILARITY",
+    "GEMINI_RPM",
+    "GEMINI_TPM",
+    "GEMINI_EMBEDDING_RPM",
+    "GEMINI_EMBEDDING_TPM",
+    "RATE_LIMIT_QUEUE_SIZE",
+    "RATE_LIMIT_TIMEOUT",
     "RATELIMIT_DEFAULT",
     "RATELIMIT_STORAGE_URL",
 ]
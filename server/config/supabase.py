@@ -1,25 +1,376 @@
 """Configuração do cliente Supabase."""
 
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Tuple
+from weakref import WeakKeyDictionary
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
+from postgrest.utils import AsyncClient, SyncClient
 from server.config.settings import settings
+import asyncio
+import httpx
 import logging
+import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class PoolStats:
+    """Estatísticas do pool de conexões HTTP do Supabase."""
+
+    max_connections: int
+    in_use: int
+    idle: int
+    waiting: int
+    acquired: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.acquired if self.acquired else 0.0
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Devolve a vaga do pool quando o corpo da resposta é fechado."""
+
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class _ReleasingAsyncStream(httpx.AsyncByteStream):
+    """Versão assíncrona de `_ReleasingStream`."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class _PoolMeter:
+    """Contadores de uso compartilhados pelos transportes síncrono e assíncrono."""
+
+    def __init__(self, max_connections: int, pool_timeout: float) -> None:
+        self.max_connections = max_connections
+        self.pool_timeout = pool_timeout
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._waiting = 0
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _limits(
+        self, max_keepalive_connections: int, keepalive_expiry: float
+    ) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+
+    def _start_wait(self) -> float:
+        with self._lock:
+            self._waiting += 1
+        return time.perf_counter()
+
+    def _end_wait(self, started: float, acquired: bool) -> float:
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._waiting -= 1
+            if acquired:
+                self._in_use += 1
+                self._acquired += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+        return waited
+
+    @staticmethod
+    def _pool_timeout(waited: float) -> httpx.PoolTimeout:
+        return httpx.PoolTimeout(f"Nenhuma conexão livre no pool após {waited:.2f}s")
+
+    def _stats(self, connections: Any) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                max_connections=self.max_connections,
+                in_use=self._in_use,
+                idle=sum(1 for conn in connections if conn.is_idle()),
+                waiting=self._waiting,
+                acquired=self._acquired,
+                total_wait_seconds=self._total_wait,
+                max_wait_seconds=self._max_wait,
+            )
+
+
+class MeteredTransport(_PoolMeter, httpx.BaseTransport):
+    """
+    Transporte HTTP com keep-alive limitado e métricas de uso.
+
+    Cada requisição ocupa uma vaga até o corpo da resposta ser fechado;
+    quando o pool está cheio, a espera é medida e limitada por `pool_timeout`.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        pool_timeout: float,
+    ) -> None:
+        _PoolMeter.__init__(self, max_connections, pool_timeout)
+        self._transport = httpx.HTTPTransport(
+            limits=self._limits(max_keepalive_connections, keepalive_expiry)
+        )
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = self._start_wait()
+        acquired = False
+        try:
+            acquired = self._slots.acquire(timeout=self.pool_timeout)
+        finally:
+            waited = self._end_wait(started, acquired)
+        if not acquired:
+            raise self._pool_timeout(waited)
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self._release()
+            raise
+        response.stream = _ReleasingStream(
+            response.stream, self._release  # type: ignore[arg-type]
+        )
+        return response
+
+    def stats(self) -> PoolStats:
+        return self._stats(self._transport._pool.connections)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncMeteredTransport(_PoolMeter, httpx.AsyncBaseTransport):
+    """Equivalente assíncrono de `MeteredTransport`, ligado a um event loop."""
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        pool_timeout: float,
+    ) -> None:
+        _PoolMeter.__init__(self, max_connections, pool_timeout)
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=self._limits(max_keepalive_connections, keepalive_expiry)
+        )
+        self._slots = asyncio.BoundedSemaphore(max_connections)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    async def _acquire(self) -> bool:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.pool_timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = self._start_wait()
+        acquired = False
+        try:
+            acquired = await self._acquire()
+        finally:
+            # Também se a tarefa for cancelada durante a espera
+            waited = self._end_wait(started, acquired)
+        if not acquired:
+            raise self._pool_timeout(waited)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+        response.stream = _ReleasingAsyncStream(
+            response.stream, self._release  # type: ignore[arg-type]
+        )
+        return response
+
+    def stats(self) -> PoolStats:
+        return self._stats(self._transport._pool.connections)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# Cliente PostgREST assíncrono e seu transporte, por event loop
+_AsyncPools = WeakKeyDictionary[
+    asyncio.AbstractEventLoop, Tuple[AsyncPostgrestClient, AsyncMeteredTransport]
+]
+
+
+class SupabaseClientRegistry:
+    """
+    Registro por processo do cliente Supabase compartilhado.
+
+    O cliente é criado sob demanda no primeiro uso e descartado após um
+    `fork`, de modo que cada worker do gunicorn abre seu próprio pool.
+    Para a API assíncrona há um cliente PostgREST nativo por event loop.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._client: Optional[Client] = None
+        self._transport: Optional[MeteredTransport] = None
+        self._async_pools: _AsyncPools = WeakKeyDictionary()
+
+    def _create(self) -> None:
+        client = create_client(
+            supabase_url=settings.SUPABASE_URL, supabase_key=settings.SUPABASE_KEY
+        )
+        transport = MeteredTransport(
+            max_connections=settings.SUPABASE_POOL_SIZE,
+            max_keepalive_connections=settings.SUPABASE_POOL_KEEPALIVE,
+            keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+            pool_timeout=settings.SUPABASE_POOL_TIMEOUT,
+        )
+        postgrest = client.postgrest
+        session = postgrest.session
+        postgrest.session = SyncClient(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=session.timeout,
+            transport=transport,
+        )
+        session.close()
+        self._client = client
+        self._transport = transport
+        self._pid = os.getpid()
+
+    def get_client(self) -> Client:
+        """Retorna o cliente do processo atual, criando-o se necessário."""
+        if self._client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    self._create()
+        assert self._client is not None
+        return self._client
+
+    def get_async_client(self) -> AsyncPostgrestClient:
+        """
+        Retorna o cliente PostgREST assíncrono do event loop atual.
+
+        Deve ser chamado de dentro de uma corrotina: conexões e semáforo
+        do pool pertencem ao loop em execução.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._async_pools.get(loop)
+        if pool is None:
+            transport = AsyncMeteredTransport(
+                max_connections=settings.SUPABASE_ASYNC_POOL_SIZE,
+                max_keepalive_connections=settings.SUPABASE_ASYNC_POOL_SIZE,
+                keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+                pool_timeout=settings.SUPABASE_POOL_TIMEOUT,
+            )
+            client = AsyncPostgrestClient(
+                f"{settings.SUPABASE_URL}/rest/v1",
+                headers={
+                    "apiKey": settings.SUPABASE_KEY,
+                    "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+                },
+            )
+            session = client.session
+            client.session = AsyncClient(
+                base_url=session.base_url,
+                headers=session.headers,
+                timeout=session.timeout,
+                transport=transport,
+            )
+            pool = self._async_pools[loop] = (client, transport)
+        return pool[0]
+
+    def reset(self) -> None:
+        """
+        Esquece o cliente atual.
+
+        Usado no processo filho após um `fork`: os sockets herdados
+        pertencem ao processo pai e não são fechados aqui.
+        """
+        self._lock = threading.Lock()
+        self._client = None
+        self._transport = None
+        self._async_pools = WeakKeyDictionary()
+        self._pid = None
+
+    def stats(self) -> Optional[PoolStats]:
+        """Estatísticas do pool, ou None se o cliente ainda não foi criado."""
+        if self._transport is None or self._pid != os.getpid():
+            return None
+        return self._transport.stats()
+
+    def async_stats(self) -> Optional[PoolStats]:
+        """Estatísticas do pool assíncrono do event loop atual."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        pool = self._async_pools.get(loop)
+        return pool[1].stats() if pool else None
+
+
+registry = SupabaseClientRegistry()
+os.register_at_fork(after_in_child=registry.reset)
+
+
 def get_supabase_client() -> Optional[Client]:
     """
-    Cria e retorna um cliente Supabase configurado.
+    Retorna o cliente Supabase compartilhado do processo.
 
     Returns:
         Optional[Client]: Cliente Supabase configurado ou None se houver erro
     """
     try:
-        client = create_client(
-            supabase_url=settings.SUPABASE_URL, supabase_key=settings.SUPABASE_KEY
-        )
-        return client
+        return registry.get_client()
     except Exception as e:
         logger.error(f"Erro ao criar cliente Supabase: {str(e)}")
         return None
+
+
+def get_pool_stats() -> Optional[PoolStats]:
+    """Retorna as estatísticas do pool de conexões do processo atual."""
+    return registry.stats()
@@ -1,21 +1,25 @@
 from typing import Dict, Any, Optional, cast
-from pydantic import SecretStr
+from uuid import uuid4
 from langchain.agents import AgentType, initialize_agent
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.memory import ConversationSummaryMemory
 from langchain.tools import Tool
+from .llm_factory import get_llm, shared
+from .summarizer import ScheduledSummaryMemory, SummaryScheduler, llm_summarizer
 
 
 class AutonomousNotes:
-    def __init__(self, api_key: str) -> None:
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-pro",
-            api_key=SecretStr(api_key),
-            temperature=0.7,
-        )
+    def __init__(self, api_key: str, conversation_id: Optional[str] = None) -> None:
+        self.llm = get_llm(api_key)
 
-        self.memory = ConversationSummaryMemory(
-            llm=self.llm, memory_key="chat_history", return_messages=True
+        # O resumo é refeito em segundo plano, nunca antes da resposta
+        scheduler = shared(
+            ("summary_scheduler", id(self.llm)),
+            lambda: SummaryScheduler(llm_summarizer(self.llm)),
+        )
+        self.memory = ScheduledSummaryMemory(
+            scheduler=scheduler,
+            key=conversation_id or uuid4().hex,
+            memory_key="chat_history",
+            return_messages=True,
         )
 
         self.tools = [
@@ -1,21 +1,14 @@
-from typing import Dict, Any
-from pydantic import SecretStr
+from typing import Dict, Any, Optional
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from .llm_factory import get_llm, shared
+from .response_cache import get_response_cache, llm_params
 
 
-class NoteChain:
-    def __init__(self, api_key: str) -> None:
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-pro",
-            api_key=SecretStr(api_key),
-            temperature=0.7,
-        )
-
-        self.prompt = PromptTemplate(
-            input_variables=["content"],
-            template="""Analise esta nota e sugira melhorias:
+def _note_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        input_variables=["content"],
+        template="""Analise esta nota e sugira melhorias:
 
 Nota: {content}
 
@@ -24,13 +17,31 @@ Por favor, forneça:
 2. Sugestões de melhorias na estrutura
 3. Possíveis tags/categorias
 4. Próximos passos recomendados""",
-        )
+    )
 
-        self.chain = LLMChain(llm=self.llm, prompt=self.prompt, verbose=True)
+
+class NoteChain:
+    def __init__(self, api_key: str, user_id: Optional[str] = None) -> None:
+        self.llm = get_llm(api_key)
+        self.user_id = user_id
+        self.cache = get_response_cache()
+        self.prompt = shared("note_prompt", _note_prompt)
+        # Sem memória: a mesma chain serve todas as instâncias
+        self.chain = shared(
+            ("note_chain", id(self.llm)),
+            lambda: LLMChain(llm=self.llm, prompt=self.prompt, verbose=True),
+        )
 
     def analyze_note(self, content: str) -> Dict[str, Any]:
         try:
-            result = self.chain.predict(content=content)
+            model, params = llm_params(self.llm)
+            result = self.cache.get_or_compute(
+                self.user_id,
+                model,
+                params,
+                self.prompt.format(content=content),
+                lambda: self.chain.predict(content=content),
+            )
             return {"success": True, "analysis": result}
         except Exception as e:
             return {"success": False, "error": str(e)}
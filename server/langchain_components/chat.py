@@ -1,5 +1,5 @@
-from typing import Dict, Any
-from pydantic import SecretStr
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from langchain_core.messages import BaseMessage, get_buffer_string
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.memory import ConversationBufferMemory
 from langchain.chains import ConversationChain
@@ -9,47 +9,106 @@ from langchain.prompts import (
     SystemMessagePromptTemplate,
     MessagesPlaceholder,
 )
+from .llm_factory import get_llm, shared
+from .memory import DEFAULT_SESSION, get_memory
+from .response_cache import get_response_cache, llm_params
+
+
+def _chat_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages(
+        [
+            SystemMessagePromptTemplate.from_template(
+                "Você é um assistente útil e amigável. "
+                "Ajude o usuário com suas notas, tarefas e eventos."
+            ),
+            MessagesPlaceholder(variable_name="chat_history"),
+            HumanMessagePromptTemplate.from_template("{input}"),
+        ]
+    )
 
 
 class ChatAssistant:
-    def __init__(self, api_key: str) -> None:
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-pro",
-            api_key=SecretStr(api_key),
-            temperature=0.7,
-        )
+    def __init__(
+        self,
+        api_key: str,
+        user_id: Optional[str] = None,
+        session_id: str = DEFAULT_SESSION,
+    ) -> None:
+        self.llm = get_llm(api_key)
+        self.user_id = user_id
+        self.cache = get_response_cache()
 
-        self.memory = ConversationBufferMemory(
+        # Com usuário, o histórico vem do store persistente e limitado
+        memory = get_memory(user_id, session_id, output_key=None) if user_id else None
+        self.memory = memory or ConversationBufferMemory(
             memory_key="chat_history", return_messages=True
         )
 
-        self.prompt = ChatPromptTemplate.from_messages(
-            [
-                SystemMessagePromptTemplate.from_template(
-                    "Você é um assistente útil e amigável. "
-                    "Ajude o usuário com suas notas, tarefas e eventos."
-                ),
-                MessagesPlaceholder(variable_name="chat_history"),
-                HumanMessagePromptTemplate.from_template("{input}"),
-            ]
-        )
+        self.prompt = shared("chat_prompt", _chat_prompt)
 
+        # A chain guarda a memória desta conversa: não é compartilhada
         self.chain = ConversationChain(
             llm=self.llm, memory=self.memory, prompt=self.prompt, verbose=True
         )
 
     def process_message(self, message: str) -> Dict[str, Any]:
         try:
-            response = self.chain.predict(input=message)
+            # O histórico faz parte do prompt: só repete a resposta se a
+            # conversa até aqui também for a mesma
+            prompt = get_buffer_string(self._messages(message))
+            model, params = llm_params(self.llm)
+            ran: List[bool] = []
+
+            def compute() -> str:
+                ran.append(True)
+                return self.chain.predict(input=message)
+
+            response = self.cache.get_or_compute(
+                self.user_id, model, params, prompt, compute
+            )
+            if not ran:
+                # Resposta do cache ou de outra chamada: a chain não a salvou
+                self.memory.save_context({"input": message}, {"response": response})
             return {"success": True, "response": response}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def _messages(self, message: str) -> List[BaseMessage]:
+        history = self.memory.load_memory_variables({})["chat_history"]
+        return self.prompt.format_messages(input=message, chat_history=history)
+
+    def stream_message(self, message: str) -> Iterator[str]:
+        """
+        Gera a resposta em pedaços, à medida que o modelo os produz.
+
+        Se o consumidor parar de ler (cliente desconectou), o stream do
+        modelo é fechado e a troca não entra na memória.
+        """
+        parts: List[str] = []
+        stream = self.llm.stream(self._messages(message))
+        try:
+            for chunk in stream:
+                if chunk.content:
+                    parts.append(str(chunk.content))
+                    yield str(chunk.content)
+        finally:
+            stream.close()
+        self.memory.save_context({"input": message}, {"response": "".join(parts)})
+
+    async def astream_message(self, message: str) -> AsyncIterator[str]:
+        """Versão assíncrona de `stream_message`."""
+        parts: List[str] = []
+        stream = self.llm.astream(self._messages(message))
+        try:
+            async for chunk in stream:
+                if chunk.content:
+                    parts.append(str(chunk.content))
+                    yield str(chunk.content)
+        finally:
+            await stream.aclose()
+        self.memory.save_context({"input": message}, {"response": "".join(parts)})
+
 
 def get_chat(api_key: str) -> ChatGoogleGenerativeAI:
-    """Retorna uma instância de ChatGoogleGenerativeAI"""
-    return ChatGoogleGenerativeAI(
-        model="gemini-pro",
-        api_key=SecretStr(api_key),
-        temperature=0.7,
-    )
+    """Retorna a instância compartilhada de ChatGoogleGenerativeAI"""
+    return get_llm(api_key)
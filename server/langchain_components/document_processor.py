@@ -1,6 +1,12 @@
-from typing import Dict, Any
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
 from langchain_community.document_loaders import TextLoader
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from .embedding_pipeline import EmbeddingPipeline
+
+# Caracteres lidos do arquivo por vez no modo streaming
+WINDOW_SIZE = 1024 * 1024
 
 
 class DocumentProcessor:
@@ -24,3 +30,61 @@ class DocumentProcessor:
             return {"success": True, "chunks": chunks}
         except Exception as e:
             return {"success": False, "error": str(e)}
+
+    def iter_file(
+        self,
+        file_path: str,
+        encoding: Optional[str] = None,
+        window_size: int = WINDOW_SIZE,
+    ) -> Iterator[Document]:
+        """
+        Gera os chunks de um arquivo sob demanda, sem carregá-lo inteiro.
+
+        O arquivo é lido em janelas de `window_size` caracteres. O último
+        chunk de cada janela pode ter sido cortado no meio, então ele é
+        guardado e dividido de novo junto com a janela seguinte; a memória
+        fica limitada a uma janela mais um chunk, qualquer que seja o
+        tamanho do arquivo.
+        """
+        index = 0
+        carry = ""
+        with open(file_path, encoding=encoding) as file:
+            while True:
+                window = file.read(window_size)
+                buffer = carry + window
+                chunks = self.text_splitter.split_text(buffer)
+                carry = ""
+                if window and chunks:
+                    # Guarda o trecho bruto (com espaços) a partir do último chunk
+                    carry = buffer[buffer.rfind(chunks.pop()) :]
+                for chunk in chunks:
+                    yield Document(
+                        page_content=chunk,
+                        metadata={"source": file_path, "chunk": index},
+                    )
+                    index += 1
+                if not window:
+                    return
+
+    async def embed_file(
+        self,
+        file_path: str,
+        pipeline: EmbeddingPipeline,
+        encoding: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[Document, List[float]]]:
+        """
+        Gera (chunk, embedding) de um arquivo, com os lotes do pipeline
+        montados direto dos chunks lidos.
+
+        Só os chunks dos lotes em andamento ficam em memória.
+        """
+        pending: Deque[Document] = deque()
+
+        def texts() -> Iterator[str]:
+            for document in self.iter_file(file_path, encoding):
+                pending.append(document)
+                yield document.page_content
+
+        async for _, vectors in pipeline.stream(texts()):
+            for vector in vectors:
+                yield pending.popleft(), vector
@@ -0,0 +1,256 @@
+"""Cache persistente de embeddings, por modelo e hash do texto."""
+
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from langchain_core.embeddings import Embeddings
+from server.config.settings import EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_PATH
+from .single_flight import SingleFlight, get_single_flight
+
+logger = logging.getLogger(__name__)
+
+# Ao passar do limite, o cache é reduzido até esta fração dele
+EVICTION_TARGET = 0.9
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza o texto para que variações irrelevantes usem a mesma chave."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(normalize_text(text).encode()).digest()
+
+
+class EmbeddingCache:
+    """
+    Embeddings em SQLite, como float32 compactos, com limite de tamanho.
+
+    Cada linha é chaveada por (modelo, SHA-256 do texto normalizado). Ao
+    passar de `max_bytes`, as entradas usadas há mais tempo são removidas.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._size = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Conexões SQLite não podem ser herdadas por um fork
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    hash BLOB NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, hash)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used "
+                "ON embeddings(last_used)"
+            )
+            self._size = conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()[0]
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @property
+    def size(self) -> int:
+        """Bytes ocupados pelos vetores."""
+        return self._size
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Embeddings em cache na ordem de `texts` (None quando ausente)."""
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[bytes, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            conn = self.conn
+            # Limite de variáveis por consulta do SQLite
+            for start in range(0, len(unique), 500):
+                chunk = unique[start : start + 500]
+                rows = conn.execute(
+                    "SELECT hash, vector FROM embeddings WHERE model = ? "
+                    f"AND hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                ).fetchall()
+                for hash_, blob in rows:
+                    found[hash_] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(now, model, hash_) for hash_ in found],
+                )
+                conn.commit()
+        results = [found.get(hash_) for hash_ in hashes]
+        hits = sum(result is not None for result in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(
+        self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]
+    ) -> None:
+        now = time.time()
+        rows = {
+            text_hash(text): array("f", vector).tobytes()
+            for text, vector in zip(texts, vectors)
+        }
+        with self._lock:
+            conn = self.conn
+            # Chaves já gravadas são substituídas: o tamanho antigo sai da conta
+            replaced = self._stored_bytes(conn, model, list(rows))
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [(model, hash_, blob, now) for hash_, blob in rows.items()],
+            )
+            conn.commit()
+            self._size += sum(len(blob) for blob in rows.values()) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    @staticmethod
+    def _stored_bytes(
+        conn: sqlite3.Connection, model: str, hashes: Sequence[bytes]
+    ) -> int:
+        total = 0
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start : start + 500]
+            total += conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                f"WHERE model = ? AND hash IN ({','.join('?' * len(chunk))})",
+                [model, *chunk],
+            ).fetchone()[0]
+        return total
+
+    def _evict(self) -> None:
+        conn = self.conn
+        target = int(self.max_bytes * EVICTION_TARGET)
+        # Recalcula: outros processos podem ter gravado no mesmo arquivo
+        self._size = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        while self._size > target:
+            rows = conn.execute(
+                "SELECT model, hash, LENGTH(vector) FROM embeddings "
+                "ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            doomed = []
+            for model, hash_, length in rows:
+                if self._size <= target:
+                    break
+                doomed.append((model, hash_))
+                self._size -= length
+            conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND hash = ?", doomed
+            )
+        conn.commit()
+        logger.info(f"Cache de embeddings reduzido para {self._size} bytes")
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings do LangChain com cache persistente na frente.
+
+    Textos já vistos (inclusive repetidos dentro do mesmo lote) nunca
+    geram uma segunda chamada à API, e pedidos idênticos simultâneos
+    dividem a mesma chamada.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: EmbeddingCache,
+        flight: Optional[SingleFlight] = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.cache = cache
+        self.flight = flight or get_single_flight()
+
+    @property
+    def model(self) -> str:
+        return str(getattr(self.embeddings, "model", type(self.embeddings).__name__))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = self.cache.get_many(self.model, texts)
+        missing: Dict[str, List[int]] = {}
+        for position, (text, vector) in enumerate(zip(texts, cached)):
+            if vector is None:
+                missing.setdefault(normalize_text(text), []).append(position)
+        if missing:
+            # Envia o texto original da primeira ocorrência de cada chave
+            pending = [texts[positions[0]] for positions in missing.values()]
+            vectors = self.flight.do(
+                ("documents", self.model, *missing.keys()),
+                lambda: self._embed_documents(pending),
+            )
+            for positions, vector in zip(missing.values(), vectors):
+                for position in positions:
+                    cached[position] = list(vector)
+        return [vector for vector in cached if vector is not None]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Consultas podem usar outro tipo de tarefa no modelo: chave própria
+        model = f"{self.model}:query"
+        cached = self.cache.get_many(model, [text])[0]
+        if cached is not None:
+            return cached
+        return list(
+            self.flight.do(
+                (model, normalize_text(text)),
+                lambda: self._embed_query(model, text),
+            )
+        )
+
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.embeddings.embed_documents(texts)
+        self.cache.put_many(self.model, texts, vectors)
+        return vectors
+
+    def _embed_query(self, model: str, text: str) -> List[float]:
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(model, [text], [vector])
+        return vector
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Cache de embeddings compartilhado do processo."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_BYTES)
+    return _cache
+
+
+def with_cache(embeddings: Embeddings) -> CachedEmbeddings:
+    """Envolve um modelo de embeddings com o cache compartilhado."""
+    return CachedEmbeddings(embeddings, get_embedding_cache())
@@ -0,0 +1,197 @@
+"""Geração de embeddings em lotes, com concorrência limitada e retentativas."""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    AsyncIterator,
+    Coroutine,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+import asyncio
+import contextvars
+import logging
+import random
+
+from langchain_core.embeddings import Embeddings
+from server.config.settings import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_TOKENS,
+    EMBEDDING_CONCURRENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+Batch = Tuple[int, List[str]]
+
+T = TypeVar("T")
+
+
+def run_sync(coroutine: Coroutine[object, object, T]) -> T:
+    """
+    Executa uma corrotina a partir de código síncrono.
+
+    Fora de um event loop usa `asyncio.run`. Dentro de um (uma rota async
+    que chamou a API síncrona), `asyncio.run` falharia: a corrotina roda
+    num loop próprio, numa thread à parte, com o mesmo contexto (prioridade
+    do limitador). Quem está num event loop deve preferir a API assíncrona.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    context = contextvars.copy_context()
+
+    def run() -> T:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(context.run, run).result()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata de tokens (~4 caracteres por token)."""
+    return len(text) // 4 + 1
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Reconhece erros de limite de taxa dos diferentes provedores."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    name = type(error).__name__.lower()
+    if "ratelimit" in name or "resourceexhausted" in name:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "quota" in message
+
+
+def make_batches(
+    texts: Iterable[str],
+    max_items: int = EMBEDDING_BATCH_SIZE,
+    max_tokens: int = EMBEDDING_BATCH_TOKENS,
+) -> Iterator[Batch]:
+    """
+    Divide os textos em lotes limitados por itens e por tokens estimados.
+
+    Cada lote vem com a posição do seu primeiro texto. Um texto que sozinho
+    passa de `max_tokens` vai num lote próprio.
+    """
+    batch: List[str] = []
+    start, tokens = 0, 0
+    for position, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if batch and (len(batch) >= max_items or tokens + cost > max_tokens):
+            yield start, batch
+            start, batch, tokens = position, [], 0
+        batch.append(text)
+        tokens += cost
+    if batch:
+        yield start, batch
+
+
+class EmbeddingPipeline:
+    """
+    Envia textos para embedding em lotes simultâneos, mantendo a ordem.
+
+    No máximo `concurrency` lotes ficam em voo ao mesmo tempo. Erros de
+    limite de taxa são repetidos com backoff exponencial e jitter; os
+    demais erros interrompem o processamento.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_items: int = EMBEDDING_BATCH_SIZE,
+        max_tokens: int = EMBEDDING_BATCH_TOKENS,
+        concurrency: int = EMBEDDING_CONCURRENCY,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        self.embeddings = embeddings
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = getattr(error, "retry_after", None)
+        if isinstance(retry_after, (int, float)) and retry_after > 0:
+            return float(retry_after)
+        # "Full jitter": espalha as retentativas dos lotes simultâneos
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def _embed_batch(
+        self, texts: List[str], semaphore: asyncio.Semaphore
+    ) -> List[List[float]]:
+        attempt = 0
+        while True:
+            async with semaphore:
+                try:
+                    return await self.embeddings.aembed_documents(texts)
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_rate_limit_error(e):
+                        raise
+                    delay = self._backoff(attempt, e)
+            # A espera acontece fora do semáforo, liberando a vaga
+            attempt += 1
+            self.retries += 1
+            logger.warning(
+                f"Limite de taxa nos embeddings, nova tentativa em {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def stream(
+        self, texts: Iterable[str]
+    ) -> AsyncIterator[Tuple[int, List[List[float]]]]:
+        """
+        Gera (posição inicial, vetores) por lote, na ordem da entrada.
+
+        Só uma janela limitada de lotes é agendada à frente do próximo a
+        ser entregue, então a memória não cresce com o tamanho da entrada;
+        `texts` pode ser um gerador, consumido aos poucos.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batches = make_batches(texts, self.max_items, self.max_tokens)
+        window: Deque[Tuple[int, "asyncio.Task[List[List[float]]]"]] = deque()
+
+        def schedule() -> None:
+            while len(window) < self.concurrency * 2:
+                batch: Optional[Batch] = next(batches, None)
+                if batch is None:
+                    return
+                start, items = batch
+                window.append(
+                    (start, asyncio.ensure_future(self._embed_batch(items, semaphore)))
+                )
+
+        schedule()
+        try:
+            while window:
+                start, task = window.popleft()
+                vectors = await task
+                schedule()
+                yield start, vectors
+        finally:
+            for _, task in window:
+                task.cancel()
+
+    async def aembed(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        async for _, batch in self.stream(texts):
+            vectors.extend(batch)
+        return vectors
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Versão síncrona de `aembed`; em código assíncrono, use `aembed`."""
+        return run_sync(self.aembed(texts))
@@ -1,22 +1,28 @@
 from typing import Dict, Any
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from pydantic import SecretStr
+from .embedding_cache import CachedEmbeddings, with_cache
+from .embedding_pipeline import EmbeddingPipeline
+from .rate_limiter import BATCH, RateLimitedEmbeddings, get_rate_limiter, priority
 
 
-def get_embeddings(api_key: str) -> GoogleGenerativeAIEmbeddings:
-    """Retorna uma instância de GoogleGenerativeAIEmbeddings"""
-    return GoogleGenerativeAIEmbeddings(
-        model="models/embedding-001",
-        google_api_key=SecretStr(api_key),
+def get_embeddings(api_key: str) -> CachedEmbeddings:
+    """Retorna GoogleGenerativeAIEmbeddings com cache e limite de taxa"""
+    return with_cache(
+        RateLimitedEmbeddings(
+            GoogleGenerativeAIEmbeddings(
+                model="models/embedding-001",
+                google_api_key=SecretStr(api_key),
+            ),
+            get_rate_limiter("embeddings"),
+        )
     )
 
 
 class EmbeddingGenerator:
     def __init__(self, api_key: str):
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
-            google_api_key=SecretStr(api_key),
-        )
+        self.embeddings = get_embeddings(api_key)
+        self.pipeline = EmbeddingPipeline(self.embeddings)
 
     def generate_embeddings(self, text: str) -> Dict[str, Any]:
         try:
@@ -27,7 +33,9 @@ class EmbeddingGenerator:
 
     def generate_batch_embeddings(self, texts: list[str]) -> Dict[str, Any]:
         try:
-            embeddings = self.embeddings.embed_documents(texts)
+            # Carga em lote: cede a vez ao chat no limitador
+            with priority(BATCH):
+                embeddings = self.pipeline.embed(texts)
             return {"success": True, "embeddings": embeddings}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -0,0 +1,150 @@
+"""Busca híbrida: índice léxico e vetorial em paralelo, fundidos por RRF."""
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+import logging
+import threading
+
+from server.config.settings import HYBRID_SEARCH_MAX_IN_FLIGHT, HYBRID_SEARCH_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Constante do RRF: amortece a diferença entre as primeiras posições
+RRF_K = 60
+
+# Busca de um lado: (user_id, consulta, limite) -> resultados com "id"
+Search = Callable[[str, str, int], List[Dict[str, Any]]]
+
+
+def _releaser(slot: threading.BoundedSemaphore) -> Callable[[Future], None]:
+    def release(_: Future) -> None:
+        slot.release()
+
+    return release
+
+
+def reciprocal_rank_fusion(
+    rankings: Mapping[str, Sequence[Dict[str, Any]]],
+    limit: int = 10,
+    k: int = RRF_K,
+) -> List[Dict[str, Any]]:
+    """
+    Funde listas ranqueadas somando 1 / (k + posição) de cada uma.
+
+    Só a posição importa, então escores de escalas diferentes (BM25,
+    cosseno) não precisam ser calibrados. Os campos de cada resultado vêm
+    da primeira lista em que ele aparece.
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for source, results in rankings.items():
+        for position, result in enumerate(results, start=1):
+            note_id = str(result["id"])
+            entry = fused.get(note_id)
+            if entry is None:
+                entry = fused[note_id] = {**result, "score": 0.0, "sources": []}
+            entry["score"] += 1.0 / (k + position)
+            entry["sources"].append(source)
+    ranked = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)
+    return ranked[:limit]
+
+
+class HybridRetriever:
+    """
+    Consulta as buscas léxica e semântica ao mesmo tempo.
+
+    Cada consulta tem um orçamento de tempo: o que não responder dentro
+    dele fica de fora da fusão, e o resultado informa o estado de cada
+    lado ("ok", "timeout", "busy" ou "error").
+
+    Uma busca que estoura o prazo continua rodando até terminar (threads
+    não são interrompidas), então cada lado tem no máximo `max_in_flight`
+    buscas em andamento, cada uma com sua thread. Com todas ocupadas, o
+    lado fica de fora da consulta ("busy") em vez de enfileirar: um lado
+    lento não atrasa o outro nem acumula trabalho atrasado.
+    """
+
+    def __init__(
+        self,
+        lexical: Search,
+        semantic: Search,
+        timeout: float = HYBRID_SEARCH_TIMEOUT,
+        candidates: int = 20,
+        max_in_flight: int = HYBRID_SEARCH_MAX_IN_FLIGHT,
+    ) -> None:
+        self.searches: Dict[str, Search] = {"lexical": lexical, "semantic": semantic}
+        self.timeout = timeout
+        self.candidates = candidates
+        self._slots = {
+            name: threading.BoundedSemaphore(max_in_flight) for name in self.searches
+        }
+        # Uma thread por vaga: o que é aceito começa na hora, nunca na fila
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight * len(self.searches),
+            thread_name_prefix="hybrid-search",
+        )
+
+    @classmethod
+    def for_notes(
+        cls, notes_manager: Any, retriever: Any, **kwargs: Any
+    ) -> "HybridRetriever":
+        """
+        Combina `NotesManager.quick_search` e a busca por chunks do
+        `DocumentRetriever` (o índice que o `NotesManager` mantém em dia).
+        """
+
+        def semantic(user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+            response = retriever.search_note_chunks(user_id, query, k=limit)
+            if not response["success"]:
+                raise RuntimeError(response["error"])
+            return response["results"]
+
+        return cls(notes_manager.quick_search, semantic, **kwargs)
+
+    def search(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 10,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Busca nas notas do usuário pelos dois caminhos de uma só vez."""
+        if not query.strip():
+            return {"success": True, "results": [], "sources": {}}
+        budget = self.timeout if timeout is None else timeout
+        futures: Dict[str, Future] = {}
+        sources: Dict[str, str] = {}
+        for name, search in self.searches.items():
+            slot = self._slots[name]
+            if not slot.acquire(blocking=False):
+                sources[name] = "busy"
+                logger.warning(f"Busca {name} sem vagas: consulta sem esse lado")
+                continue
+            future = self._executor.submit(search, user_id, query, self.candidates)
+            # A vaga só volta quando a busca termina, mesmo depois do prazo
+            future.add_done_callback(_releaser(slot))
+            futures[name] = future
+        wait(futures.values(), timeout=budget)
+
+        rankings: Dict[str, List[Dict[str, Any]]] = {}
+        for name, future in futures.items():
+            if not future.done():
+                sources[name] = "timeout"
+                logger.warning(f"Busca {name} excedeu {budget:.2f}s")
+            elif future.exception() is not None:
+                sources[name] = "error"
+                logger.error(f"Erro na busca {name}: {future.exception()}")
+            else:
+                sources[name] = "ok"
+                rankings[name] = future.result()
+
+        if not rankings:
+            return {
+                "success": False,
+                "error": "Nenhuma busca respondeu a tempo",
+                "sources": sources,
+            }
+        return {
+            "success": True,
+            "results": reciprocal_rank_fusion(rankings, limit),
+            "sources": sources,
+        }
@@ -0,0 +1,311 @@
+"""
+Ingestão de documentos em lote: descoberta, leitura, chunks, embeddings e
+indexação.
+
+Leitura e divisão em chunks (CPU) rodam num pool de processos; os
+embeddings (I/O) rodam no event loop. As etapas se comunicam por filas
+limitadas, então uma etapa lenta segura as anteriores em vez de acumular
+memória.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+import asyncio
+import hashlib
+import logging
+import os
+import time
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from .embedding_cache import normalize_text
+from .embedding_pipeline import EmbeddingPipeline, run_sync
+from .rate_limiter import BATCH, priority
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = frozenset({".txt", ".md", ".pdf", ".docx"})
+
+# Recebe os chunks de um lote e os seus vetores, na mesma ordem
+Sink = Callable[[List[Document], List[List[float]]], None]
+
+_DONE = object()
+
+
+def vector_index_sink(index: Any) -> Sink:
+    """
+    Grava os chunks num `UserVectorIndex`, usando o hash como ID e versão.
+
+    O índice não é salvo a cada lote: chame `index.save()` ao final.
+    """
+
+    def sink(batch: List[Document], vectors: List[List[float]]) -> None:
+        hashes = [document.metadata["hash"] for document in batch]
+        index.upsert_many([(hash_, hash_) for hash_ in hashes], vectors)
+
+    return sink
+
+
+def discover(
+    root: Path, extensions: Sequence[str] = tuple(SUPPORTED_EXTENSIONS)
+) -> Iterator[Path]:
+    """Arquivos suportados sob `root` (ou o próprio `root`, se for arquivo)."""
+    root = Path(root)
+    if root.is_file():
+        yield root
+        return
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            path = Path(directory) / name
+            if path.suffix.lower() in extensions:
+                yield path
+
+
+def load_text(path: Path) -> str:
+    """Extrai o texto de um arquivo .txt, .md, .pdf ou .docx."""
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise RuntimeError("Instale pypdf para ler arquivos PDF")
+        return "\n\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    if suffix == ".docx":
+        try:
+            import docx
+        except ImportError:
+            raise RuntimeError("Instale python-docx para ler arquivos .docx")
+        return "\n\n".join(p.text for p in docx.Document(str(path)).paragraphs)
+    return path.read_text(encoding="utf-8", errors="replace")
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+def parse_file(
+    path: str, chunk_size: int, chunk_overlap: int
+) -> List[Tuple[str, str, int]]:
+    """
+    Lê e divide um arquivo em chunks: (hash, texto, posição).
+
+    Roda nos processos do pool, por isso recebe e devolve só tipos simples.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    chunks = splitter.split_text(load_text(Path(path)))
+    return [(chunk_hash(chunk), chunk, index) for index, chunk in enumerate(chunks)]
+
+
+@dataclass
+class StageMetrics:
+    """Contadores de uma etapa da ingestão."""
+
+    items: int = 0
+    skipped: int = 0
+    errors: int = 0
+    busy: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    def record(self, items: int, seconds: float) -> None:
+        self.items += items
+        self.busy += seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "items": self.items,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy, 3),
+            "items_per_second": round(self.items / elapsed, 2) if elapsed else 0.0,
+        }
+
+
+class IngestionPipeline:
+    """
+    Pipeline de ingestão de vários documentos.
+
+    Etapas: discover -> parse (pool de processos: leitura e chunks) ->
+    dedupe (por hash do texto normalizado) -> embed (assíncrono, em lotes)
+    -> index (`sink`, numa thread). `metrics` traz itens, erros e vazão de
+    cada etapa, também durante a execução.
+    """
+
+    STAGES = ("discover", "parse", "dedupe", "embed", "index")
+
+    def __init__(
+        self,
+        pipeline: EmbeddingPipeline,
+        sink: Sink,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        workers: Optional[int] = None,
+        queue_size: int = 64,
+        batch_size: int = 64,
+    ) -> None:
+        self.pipeline = pipeline
+        self.sink = sink
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.metrics: Dict[str, StageMetrics] = {}
+        self._seen: Set[str] = set()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: stage.snapshot() for name, stage in self.metrics.items()}
+
+    async def _parse(
+        self,
+        paths: Iterator[Path],
+        executor: ProcessPoolExecutor,
+        chunks: "asyncio.Queue[Any]",
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        # No máximo dois arquivos por processo em andamento
+        slots = asyncio.Semaphore(self.workers * 2)
+        discover, parse = self.metrics["discover"], self.metrics["parse"]
+
+        async def handle(path: Path) -> None:
+            started = time.perf_counter()
+            try:
+                parsed = await loop.run_in_executor(
+                    executor,
+                    parse_file,
+                    str(path),
+                    self.chunk_size,
+                    self.chunk_overlap,
+                )
+                parse.record(1, time.perf_counter() - started)
+                for hash_, text, index in parsed:
+                    await chunks.put(
+                        (hash_, text, {"source": str(path), "chunk": index})
+                    )
+            except Exception as e:
+                parse.errors += 1
+                logger.error(f"Erro ao processar {path}: {str(e)}")
+            finally:
+                slots.release()
+
+        tasks = []
+        for path in paths:
+            await slots.acquire()
+            discover.record(1, 0.0)
+            tasks.append(asyncio.ensure_future(handle(path)))
+        await asyncio.gather(*tasks)
+        await chunks.put(_DONE)
+
+    async def _batch(
+        self, chunks: "asyncio.Queue[Any]", batches: "asyncio.Queue[Any]"
+    ) -> None:
+        dedupe = self.metrics["dedupe"]
+        batch: List[Document] = []
+        while True:
+            item = await chunks.get()
+            if item is _DONE:
+                break
+            hash_, text, metadata = item
+            if hash_ in self._seen:
+                dedupe.skipped += 1
+                continue
+            self._seen.add(hash_)
+            dedupe.record(1, 0.0)
+            batch.append(
+                Document(page_content=text, metadata={**metadata, "hash": hash_})
+            )
+            if len(batch) >= self.batch_size:
+                await batches.put(batch)
+                batch = []
+        if batch:
+            await batches.put(batch)
+        for _ in range(self.pipeline.concurrency):
+            await batches.put(_DONE)
+
+    async def _embed(
+        self, batches: "asyncio.Queue[Any]", embedded: "asyncio.Queue[Any]"
+    ) -> None:
+        embed = self.metrics["embed"]
+        while True:
+            batch = await batches.get()
+            if batch is _DONE:
+                break
+            started = time.perf_counter()
+            try:
+                vectors = await self.pipeline.aembed(
+                    [document.page_content for document in batch]
+                )
+            except Exception as e:
+                embed.errors += len(batch)
+                logger.error(f"Erro ao gerar embeddings: {str(e)}")
+                continue
+            embed.record(len(batch), time.perf_counter() - started)
+            await embedded.put((batch, vectors))
+
+    async def _index(self, embedded: "asyncio.Queue[Any]") -> None:
+        index = self.metrics["index"]
+        while True:
+            item = await embedded.get()
+            if item is _DONE:
+                break
+            batch, vectors = item
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.sink, batch, vectors)
+                index.record(len(batch), time.perf_counter() - started)
+            except Exception as e:
+                index.errors += len(batch)
+                logger.error(f"Erro ao indexar chunks: {str(e)}")
+
+    async def run(self, root: Path, known: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Ingere todos os arquivos suportados sob `root`.
+
+        Chunks cujo hash está em `known` (já indexados) são pulados.
+        """
+        self.metrics = {name: StageMetrics() for name in self.STAGES}
+        self._seen = set(known)
+        chunks: "asyncio.Queue[Any]" = asyncio.Queue(self.queue_size)
+        batches: "asyncio.Queue[Any]" = asyncio.Queue(self.pipeline.concurrency)
+        embedded: "asyncio.Queue[Any]" = asyncio.Queue(self.pipeline.concurrency)
+
+        # Carga em lote: cede a vez às chamadas interativas no limitador
+        with priority(BATCH), ProcessPoolExecutor(max_workers=self.workers) as executor:
+            embedders = [
+                asyncio.ensure_future(self._embed(batches, embedded))
+                for _ in range(self.pipeline.concurrency)
+            ]
+            indexer = asyncio.ensure_future(self._index(embedded))
+            await asyncio.gather(
+                self._parse(discover(root), executor, chunks),
+                self._batch(chunks, batches),
+                *embedders,
+            )
+            await embedded.put(_DONE)
+            await indexer
+
+        metrics = self.snapshot()
+        logger.info(f"Ingestão de {root} concluída: {metrics}")
+        return {"success": True, "metrics": metrics}
+
+    def ingest(self, root: Path, known: Iterable[str] = ()) -> Dict[str, Any]:
+        """Versão síncrona de `run`; em código assíncrono, use `run`."""
+        try:
+            return run_sync(self.run(root, known))
+        except Exception as e:
+            return {"success": False, "error": str(e)}
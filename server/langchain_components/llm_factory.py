@@ -0,0 +1,114 @@
+"""
+Fábrica de LLMs, prompts e agentes compartilhados pelo processo.
+
+Criar um `ChatGoogleGenerativeAI` (e os clientes gRPC por trás dele) a cada
+requisição soma latência sem necessidade: os clientes são reaproveitados
+por (chave de API, modelo, temperatura, segurança, opções). Prompts e
+agentes sem estado também são montados uma única vez.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+import hashlib
+import threading
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import SecretStr
+from .rate_limiter import RateLimitCallback, get_rate_limiter
+
+DEFAULT_MODEL = "gemini-pro"
+DEFAULT_TEMPERATURE = 0.7
+
+# Pares (categoria, limite) no formato da API do Gemini
+SafetySettings = Tuple[Tuple[str, str], ...]
+
+SAFETY_SETTINGS: SafetySettings = (
+    ("HARM_CATEGORY_HARASSMENT", "BLOCK_MEDIUM_AND_ABOVE"),
+    ("HARM_CATEGORY_HATE_SPEECH", "BLOCK_MEDIUM_AND_ABOVE"),
+    ("HARM_CATEGORY_SEXUALLY_EXPLICIT", "BLOCK_MEDIUM_AND_ABOVE"),
+    ("HARM_CATEGORY_DANGEROUS_CONTENT", "BLOCK_MEDIUM_AND_ABOVE"),
+)
+
+T = TypeVar("T")
+
+_lock = threading.RLock()
+_llms: Dict[Hashable, ChatGoogleGenerativeAI] = {}
+_objects: Dict[Hashable, Any] = {}
+
+
+def _safety_settings(safety: SafetySettings) -> Dict[Any, Any]:
+    from google.generativeai.types import HarmBlockThreshold, HarmCategory
+
+    return {
+        HarmCategory[category]: HarmBlockThreshold[threshold]
+        for category, threshold in safety
+    }
+
+
+def _fingerprint(api_key: str) -> str:
+    # A chave em si não fica guardada nas chaves do cache
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def get_llm(
+    api_key: str,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    safety: Optional[SafetySettings] = None,
+    **options: Any,
+) -> ChatGoogleGenerativeAI:
+    """
+    Cliente de chat compartilhado para a configuração pedida.
+
+    O cliente não guarda estado entre chamadas, então pode ser usado ao
+    mesmo tempo por várias threads e tarefas assíncronas.
+    """
+    key = (
+        _fingerprint(api_key),
+        model,
+        temperature,
+        safety,
+        tuple(sorted(options.items())),
+    )
+    llm = _llms.get(key)
+    if llm is not None:
+        return llm
+    with _lock:
+        llm = _llms.get(key)
+        if llm is None:
+            if safety:
+                options["safety_settings"] = _safety_settings(safety)
+            # Toda chamada passa pelo limitador de taxa do processo
+            options.setdefault(
+                "callbacks", [RateLimitCallback(get_rate_limiter("chat"))]
+            )
+            llm = _llms[key] = ChatGoogleGenerativeAI(
+                model=model,
+                api_key=SecretStr(api_key),
+                temperature=temperature,
+                **options,
+            )
+        return llm
+
+
+def shared(key: Hashable, build: Callable[[], T]) -> T:
+    """
+    Objeto montado uma única vez por processo (prompt, chain, agente).
+
+    Use só para objetos sem estado por usuário: nada de memória de
+    conversa em agentes compartilhados.
+    """
+    try:
+        return _objects[key]
+    except KeyError:
+        pass
+    with _lock:
+        if key not in _objects:
+            _objects[key] = build()
+        return _objects[key]
+
+
+def clear() -> None:
+    """Descarta os objetos em cache (por exemplo, após trocar a chave)."""
+    with _lock:
+        _llms.clear()
+        _objects.clear()
@@ -0,0 +1,152 @@
+"""Busca vetorial exata com NumPy, para coleções pequenas."""
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+# Escala da quantização int8 de vetores normalizados (componentes em [-1, 1])
+INT8_SCALE = 127.0
+
+# Linhas convertidas de int8 para float32 por vez na busca quantizada
+QUANTIZED_BLOCK = 4096
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normaliza as linhas (norma L2), para que produto interno = cosseno."""
+    matrix = np.array(vectors, dtype="float32", ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms)
+
+
+class MatrixIndex:
+    """
+    Vetores normalizados numa matriz contígua, com busca por força bruta.
+
+    Segue a parte da API do FAISS usada pelo índice vetorial (IDs
+    explícitos, `add_with_ids`, `remove_ids`, `search`). Com `quantize`,
+    cada componente é guardado em int8, reduzindo a memória a um quarto
+    com perda pequena de precisão no ranking.
+    """
+
+    def __init__(self, dim: int, quantize: bool = False) -> None:
+        self.d = dim
+        self.quantize = quantize
+        self._data = np.empty((0, dim), dtype=self.dtype)
+        self._ids = np.empty(0, dtype="int64")
+        self._count = 0
+
+    @property
+    def dtype(self) -> str:
+        return "int8" if self.quantize else "float32"
+
+    @property
+    def ntotal(self) -> int:
+        return self._count
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[: self._count]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self._ids.nbytes
+
+    def vectors(self) -> np.ndarray:
+        """Vetores armazenados, em float32 e contíguos (como o FAISS exige)."""
+        data = self._data[: self._count]
+        if self.quantize:
+            return data.astype("float32") / INT8_SCALE
+        return np.ascontiguousarray(data)
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        if not self.quantize:
+            return vectors
+        codes = np.rint(vectors * INT8_SCALE)
+        return np.clip(codes, -INT8_SCALE, INT8_SCALE).astype("int8")
+
+    def _reserve(self, count: int) -> None:
+        capacity = len(self._data)
+        if count <= capacity and self._data.flags.writeable:
+            return
+        # Cresce em dobro para que inserções de uma nota sejam O(1) amortizado
+        capacity = max(count, capacity * 2, 64)
+        data = np.empty((capacity, self.d), dtype=self.dtype)
+        ids = np.empty(capacity, dtype="int64")
+        data[: self._count] = self._data[: self._count]
+        ids[: self._count] = self._ids[: self._count]
+        self._data, self._ids = data, ids
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        vectors = normalize(vectors)
+        if vectors.shape[1] != self.d:
+            raise ValueError(f"Dimensão {vectors.shape[1]} difere do índice ({self.d})")
+        end = self._count + len(vectors)
+        self._reserve(end)
+        self._data[self._count : end] = self._encode(vectors)
+        self._ids[self._count : end] = ids
+        self._count = end
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        keep = ~np.isin(self.ids, ids)
+        removed = self._count - int(keep.sum())
+        if removed:
+            self._reserve(self._count)
+            kept = int(keep.sum())
+            self._data[:kept] = self._data[: self._count][keep]
+            self._ids[:kept] = self._ids[: self._count][keep]
+            self._count = kept
+        return removed
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Os `k` vizinhos de cada consulta: (similaridades, IDs), como no FAISS."""
+        queries = normalize(queries)
+        k = min(k, self._count)
+        if k <= 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype("float32"), empty.astype("int64")
+        data = self._data[: self._count]
+        if self.quantize:
+            # Converte em blocos, sem materializar a matriz inteira em float32
+            scores = np.empty((len(queries), self._count), dtype="float32")
+            for start in range(0, self._count, QUANTIZED_BLOCK):
+                block = data[start : start + QUANTIZED_BLOCK].astype("float32")
+                scores[:, start : start + len(block)] = queries @ block.T
+            scores /= INT8_SCALE
+        else:
+            scores = queries @ data.T
+        # argpartition separa os k maiores em O(n); só eles são ordenados
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return np.take_along_axis(top_scores, order, axis=1), self.ids[top]
+
+    def write(self, path: str) -> None:
+        """Grava IDs e vetores num único arquivo .npy."""
+        record = np.empty(
+            self._count,
+            dtype=[("id", "int64"), ("vector", self.dtype, (self.d,))],
+        )
+        record["id"] = self.ids
+        record["vector"] = self._data[: self._count]
+        with open(path, "wb") as file:
+            np.save(file, record)
+
+    @classmethod
+    def read(cls, path: Path, mmap: bool = False) -> "MatrixIndex":
+        """Lê um índice gravado; com `mmap`, os vetores ficam só leitura."""
+        record = np.load(path, mmap_mode="r" if mmap else None)
+        dim = record.dtype["vector"].shape[0]
+        index = cls(dim, quantize=record.dtype["vector"].base == np.int8)
+        if mmap:
+            # Visões do registro (id, vetor): linhas com passo maior que o
+            # vetor, não contíguas. O produto com as consultas lida com esse
+            # passo; quem precisa de memória contígua (o FAISS) usa `vectors`
+            index._data, index._ids = record["vector"], record["id"]
+        else:
+            index._data = np.ascontiguousarray(record["vector"])
+            index._ids = np.ascontiguousarray(record["id"])
+        index._count = len(record)
+        return index
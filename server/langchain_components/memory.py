@@ -1,14 +1,252 @@
-from typing import Optional
+"""Memória de conversa por usuário e sessão, limitada e persistida."""
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+import logging
+import threading
+
 from langchain.memory import ConversationBufferMemory
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from server.config.settings import (
+    MEMORY_MAX_SESSIONS,
+    MEMORY_MAX_TOKENS,
+    MEMORY_SESSION_TTL,
+)
+from server.config.supabase import get_supabase_client
+from server.utils.cache import LRUCache
+from .embedding_pipeline import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+# Trocas carregadas do banco ao abrir uma sessão (antes do corte por tokens)
+HISTORY_LOAD_LIMIT = 50
+
+Turn = Tuple[str, str]
+
+
+class Session:
+    """Janela deslizante das últimas trocas, limitada por tokens."""
+
+    def __init__(self, max_tokens: int, turns: Sequence[Turn] = ()) -> None:
+        self.max_tokens = max_tokens
+        self.turns: Deque[Turn] = deque()
+        self.tokens = 0
+        self._lock = threading.Lock()
+        for message, response in turns:
+            self.add(message, response)
+
+    @staticmethod
+    def _cost(turn: Turn) -> int:
+        return estimate_tokens(turn[0]) + estimate_tokens(turn[1])
+
+    def add(self, message: str, response: str) -> None:
+        with self._lock:
+            turn = (message, response)
+            self.turns.append(turn)
+            self.tokens += self._cost(turn)
+            # Sempre mantém a última troca, mesmo que passe do orçamento
+            while self.tokens > self.max_tokens and len(self.turns) > 1:
+                self.tokens -= self._cost(self.turns.popleft())
+
+    def messages(self) -> List[BaseMessage]:
+        with self._lock:
+            turns = list(self.turns)
+        messages: List[BaseMessage] = []
+        for message, response in turns:
+            messages.append(HumanMessage(content=message))
+            messages.append(AIMessage(content=response))
+        return messages
+
+
+class ConversationStore:
+    """
+    Sessões de conversa por (usuário, sessão).
+
+    As sessões ativas ficam num LRU em memória, limitado em quantidade e
+    com TTL curto: as mensagens de uma conversa podem cair em workers
+    diferentes, e a cópia local não vê as trocas gravadas pelos outros,
+    então ela serve às leituras repetidas de uma mesma requisição e é
+    relida do banco logo depois. Cada troca é gravada na tabela
+    `conversations` em segundo plano, com o ID da sessão em
+    `metadata.session_id`; antes de reler uma sessão, as gravações dela
+    ainda na fila são concluídas, para que a releitura não perca trocas.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = MEMORY_MAX_SESSIONS,
+        max_tokens: int = MEMORY_MAX_TOKENS,
+        ttl: float = MEMORY_SESSION_TTL,
+        client: Callable[[], Any] = get_supabase_client,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.client = client
+        self._sessions = LRUCache(max_entries=max_sessions, ttl=ttl)
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="conversation-writer"
+        )
+        self._pending: Dict[Tuple[str, str], Set["Future[None]"]] = {}
+
+    def _load(self, user_id: str, session_id: str) -> List[Turn]:
+        client = self.client()
+        if not client:
+            return []
+        try:
+            response = (
+                client.table("conversations")
+                .select("message,response")
+                .eq("user_id", user_id)
+                .eq("metadata->>session_id", session_id)
+                .order("created_at", desc=True)
+                .limit(HISTORY_LOAD_LIMIT)
+                .execute()
+            )
+        except Exception as e:
+            logger.error(f"Erro ao carregar histórico da conversa: {str(e)}")
+            return []
+        return [
+            (row["message"], row.get("response") or "")
+            for row in reversed(response.data)
+        ]
+
+    def get(self, user_id: str, session_id: str = DEFAULT_SESSION) -> Session:
+        key = (user_id, session_id)
+        session = self._sessions.get(key)
+        if session is None:
+            self._flush(key)
+            # Carrega fora do lock: a consulta ao banco não trava os demais
+            loaded = Session(self.max_tokens, self._load(user_id, session_id))
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = loaded
+                    self._sessions.set(key, session)
+        return session
+
+    def _flush(self, key: Tuple[str, str]) -> None:
+        """Espera as gravações pendentes da sessão chegarem ao banco."""
+        with self._lock:
+            pending = list(self._pending.get(key, ()))
+        if pending:
+            wait(pending)
+
+    def _written(self, key: Tuple[str, str], future: "Future[None]") -> None:
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending.discard(future)
+                if not pending:
+                    del self._pending[key]
+
+    def _persist(
+        self, user_id: str, session_id: str, message: str, response: str
+    ) -> None:
+        client = self.client()
+        if not client:
+            return
+        try:
+            client.table("conversations").insert(
+                {
+                    "user_id": user_id,
+                    "message": message,
+                    "response": response,
+                    "metadata": {"session_id": session_id},
+                }
+            ).execute()
+        except Exception as e:
+            logger.error(f"Erro ao salvar troca da conversa: {str(e)}")
+
+    def append(
+        self, user_id: str, session_id: str, message: str, response: str
+    ) -> None:
+        """Registra uma troca na sessão e a grava no banco em segundo plano."""
+        key = (user_id, session_id)
+        self.get(user_id, session_id).add(message, response)
+        future = self._writer.submit(
+            self._persist, user_id, session_id, message, response
+        )
+        with self._lock:
+            self._pending.setdefault(key, set()).add(future)
+        future.add_done_callback(partial(self._written, key))
+
+    def clear(self, user_id: str, session_id: str = DEFAULT_SESSION) -> None:
+        """Descarta a sessão da memória local (o histórico no banco fica)."""
+        self._sessions.delete((user_id, session_id))
+
+    def history(
+        self, user_id: str, session_id: str = DEFAULT_SESSION
+    ) -> "SessionHistory":
+        return SessionHistory(self, user_id, session_id)
+
+
+class SessionHistory(BaseChatMessageHistory):
+    """Histórico do LangChain apoiado numa sessão do `ConversationStore`."""
+
+    def __init__(self, store: ConversationStore, user_id: str, session_id: str):
+        self.store = store
+        self.user_id = user_id
+        self.session_id = session_id
+        self._pending: Optional[str] = None
+
+    @property
+    def messages(self) -> List[BaseMessage]:  # type: ignore[override]
+        return self.store.get(self.user_id, self.session_id).messages()
+
+    def add_message(self, message: BaseMessage) -> None:
+        # A memória grava pergunta e resposta em sequência: vira uma linha
+        if isinstance(message, HumanMessage):
+            self._pending = str(message.content)
+        elif isinstance(message, AIMessage) and self._pending is not None:
+            self.store.append(
+                self.user_id, self.session_id, self._pending, str(message.content)
+            )
+            self._pending = None
+
+    def clear(self) -> None:
+        self.store.clear(self.user_id, self.session_id)
+
+
+_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ConversationStore:
+    """Store de conversas compartilhado do processo."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConversationStore()
+        return _store
 
 
-def get_memory(user_id: str) -> Optional[ConversationBufferMemory]:
-    """Retorna a memória de conversação para um usuário"""
+def get_memory(
+    user_id: str,
+    session_id: str = DEFAULT_SESSION,
+    memory_key: str = "chat_history",
+    output_key: Optional[str] = "output",
+) -> Optional[ConversationBufferMemory]:
+    """Retorna a memória de conversação de um usuário e sessão"""
     try:
         return ConversationBufferMemory(
-            memory_key="chat_history",
+            chat_memory=get_store().history(user_id, session_id),
+            memory_key=memory_key,
             return_messages=True,
-            output_key="output",
+            output_key=output_key,
             input_key="input",
         )
     except Exception:
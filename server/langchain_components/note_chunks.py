@@ -0,0 +1,63 @@
+"""Chunks de notas ancorados em parágrafos, para reindexação incremental."""
+
+from typing import Dict, Iterable, List, Tuple
+import re
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from .vector_index import content_version
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def split_note(
+    text: str, chunk_size: int = 1000, chunk_overlap: int = 100
+) -> List[str]:
+    """
+    Divide uma nota em chunks que nunca atravessam parágrafos.
+
+    Parágrafos não são agrupados: assim, editar um parágrafo muda só os
+    chunks dele, e os demais mantêm o mesmo hash. Parágrafos maiores que
+    `chunk_size` são divididos pelo splitter recursivo.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    chunks: List[str] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= chunk_size:
+            chunks.append(paragraph)
+        else:
+            chunks.extend(splitter.split_text(paragraph))
+    return chunks
+
+
+def chunk_prefix(note_id: str) -> str:
+    return f"{note_id}#"
+
+
+def chunk_key(note_id: str, text: str) -> str:
+    """Chave de um chunk no índice: nota + hash do texto."""
+    return f"{chunk_prefix(note_id)}{content_version(text)}"
+
+
+def note_of(key: str) -> str:
+    return key.rsplit("#", 1)[0]
+
+
+def plan_update(
+    note_id: str, chunks: Iterable[str], existing: Iterable[str]
+) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Compara os chunks novos com as chaves já indexadas da nota.
+
+    Returns:
+        Tuple: chunks a gerar embedding ({chave: texto}) e chaves a remover.
+    """
+    current = {chunk_key(note_id, chunk): chunk for chunk in chunks}
+    existing = set(existing)
+    added = {key: text for key, text in current.items() if key not in existing}
+    removed = sorted(existing - current.keys())
+    return added, removed
@@ -0,0 +1,312 @@
+"""
+Limite de taxa do lado do cliente para as chamadas ao Gemini.
+
+Cada limitador tem dois baldes de tokens (requisições e tokens por
+minuto) e uma fila com prioridades: chat interativo passa na frente de
+resumos em segundo plano, que passam na frente de cargas em lote. A fila
+é limitada por classe e cada pedido tem um prazo; pedidos que não caberiam
+no prazo são recusados na hora, em vez de serem enviados para levar um 429.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+import heapq
+import itertools
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import BaseMessage, get_buffer_string
+from langchain_core.outputs import LLMResult
+from server.config.settings import (
+    GEMINI_EMBEDDING_RPM,
+    GEMINI_EMBEDDING_TPM,
+    GEMINI_RPM,
+    GEMINI_TPM,
+    RATE_LIMIT_QUEUE_SIZE,
+    RATE_LIMIT_TIMEOUT,
+)
+from .embedding_pipeline import estimate_tokens
+
+# Classes de prioridade (menor passa primeiro)
+INTERACTIVE = 0
+BACKGROUND = 1
+BATCH = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", BATCH: "batch"}
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """Define a prioridade das chamadas feitas dentro do bloco."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimitExceeded(Exception):
+    """Pedido recusado pelo limitador local (fila cheia ou prazo esgotado)."""
+
+
+class TokenBucket:
+    """Balde que se enche a `rate` unidades por minuto, até `capacity`."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.clock = clock
+        self.level = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self.level = min(self.capacity, self.level + elapsed * self.rate / 60)
+
+    def wait_time(self, amount: float) -> float:
+        """Segundos até haver `amount` no balde (0 se já há)."""
+        self._refill()
+        # Pedidos maiores que o balde esperam apenas que ele encha
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) * 60 / self.rate
+
+    def consume(self, amount: float) -> None:
+        # Pode ficar negativo: o consumo real acima do estimado vira dívida
+        self._refill()
+        self.level -= amount
+
+
+@dataclass
+class QueueMetrics:
+    """Métricas de uma classe de prioridade."""
+
+    depth: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "depth": self.depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait": (
+                round(self.wait_total / self.admitted, 4) if self.admitted else 0.0
+            ),
+            "max_wait": round(self.wait_max, 4),
+        }
+
+
+class RateLimiter:
+    """
+    Limita requisições e tokens por minuto, com fila por prioridade.
+
+    Só o primeiro da fila (menor prioridade, depois ordem de chegada) pode
+    consumir dos baldes, então um lote nunca passa na frente do chat. Cada
+    classe aceita até `max_queue` pedidos esperando; um pedido cujo tempo de
+    espera passaria de `timeout` segundos é recusado com
+    `RateLimitExceeded`. Limites <= 0 desligam o balde correspondente.
+    """
+
+    def __init__(
+        self,
+        rpm: float,
+        tpm: float = 0,
+        max_queue: int = RATE_LIMIT_QUEUE_SIZE,
+        timeout: float = RATE_LIMIT_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.requests = TokenBucket(rpm, clock=clock) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, clock=clock) if tpm > 0 else None
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.clock = clock
+        self.metrics = {level: QueueMetrics() for level in PRIORITY_NAMES}
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.wait_time(1)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def acquire(
+        self,
+        tokens: int = 0,
+        level: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """
+        Espera a vez e reserva uma requisição e `tokens` tokens.
+
+        Returns:
+            float: segundos esperados na fila.
+
+        Raises:
+            RateLimitExceeded: se a fila da classe está cheia ou se o pedido
+                não seria atendido dentro do prazo.
+        """
+        level = current_priority() if level is None else level
+        metrics = self.metrics.setdefault(level, QueueMetrics())
+        started = self.clock()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        with self._cond:
+            if metrics.depth >= self.max_queue:
+                metrics.rejected += 1
+                raise RateLimitExceeded(
+                    f"Fila de chamadas ao modelo cheia ({PRIORITY_NAMES.get(level)})"
+                )
+            ticket = (level, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            metrics.depth += 1
+            try:
+                while True:
+                    now = self.clock()
+                    if self._waiting[0] == ticket:
+                        wait = self._wait_time(tokens)
+                        if wait <= 0:
+                            break
+                        expired = now + wait > deadline
+                    else:
+                        # Fora da frente: espera a vez até o prazo
+                        wait = deadline - now
+                        expired = wait <= 0
+                    if expired:
+                        metrics.timed_out += 1
+                        raise RateLimitExceeded(
+                            "Limite de uso do modelo: pedido não seria atendido "
+                            "dentro do prazo"
+                        )
+                    self._cond.wait(wait)
+                if self.requests is not None:
+                    self.requests.consume(1)
+                if self.tokens is not None:
+                    self.tokens.consume(tokens)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                metrics.depth -= 1
+                self._cond.notify_all()
+            waited = self.clock() - started
+            metrics.admitted += 1
+            metrics.wait_total += waited
+            metrics.wait_max = max(metrics.wait_max, waited)
+            return waited
+
+    def charge(self, tokens: int) -> None:
+        """Desconta tokens consumidos além da reserva (ex.: a resposta)."""
+        if self.tokens is not None and tokens > 0:
+            with self._cond:
+                self.tokens.consume(tokens)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._cond:
+            return {
+                PRIORITY_NAMES.get(level, str(level)): metrics.snapshot()
+                for level, metrics in self.metrics.items()
+            }
+
+
+class RateLimitCallback(BaseCallbackHandler):
+    """
+    Passa cada chamada de um chat model do LangChain pelo limitador.
+
+    O prompt é reservado antes da chamada; os tokens da resposta são
+    descontados quando ela termina.
+    """
+
+    raise_error = True
+
+    def __init__(self, limiter: RateLimiter) -> None:
+        self.limiter = limiter
+
+    def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any
+    ) -> None:
+        self.limiter.acquire(sum(estimate_tokens(prompt) for prompt in prompts))
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        self.limiter.acquire(
+            sum(estimate_tokens(get_buffer_string(batch)) for batch in messages)
+        )
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.limiter.charge(
+            sum(
+                estimate_tokens(generation.text)
+                for generations in response.generations
+                for generation in generations
+            )
+        )
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """Embeddings que passam pelo limitador antes de cada chamada."""
+
+    def __init__(self, embeddings: Embeddings, limiter: RateLimiter) -> None:
+        self.embeddings = embeddings
+        self.limiter = limiter
+
+    @property
+    def model(self) -> str:
+        return str(getattr(self.embeddings, "model", type(self.embeddings).__name__))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.limiter.acquire(sum(estimate_tokens(text) for text in texts))
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self.limiter.acquire(estimate_tokens(text))
+        return self.embeddings.embed_query(text)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+_LIMITS = {
+    "chat": (GEMINI_RPM, GEMINI_TPM),
+    "embeddings": (GEMINI_EMBEDDING_RPM, GEMINI_EMBEDDING_TPM),
+}
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """Limitador compartilhado do processo para `chat` ou `embeddings`."""
+    with _limiters_lock:
+        if name not in _limiters:
+            rpm, tpm = _LIMITS[name]
+            _limiters[name] = RateLimiter(rpm, tpm)
+        return _limiters[name]
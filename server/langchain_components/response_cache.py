@@ -0,0 +1,263 @@
+"""
+Cache de respostas do LLM, por usuário.
+
+A chave é (modelo, parâmetros, hash do prompt normalizado): prompts
+idênticos a menos de espaços voltam do cache sem chamar o modelo. Com
+`similarity`, prompts quase idênticos também voltam do cache, comparando
+o embedding do prompt com os já respondidos no mesmo escopo.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import threading
+
+import numpy as np
+
+from server.config.settings import (
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_SIMILARITY,
+    RESPONSE_CACHE_TTL,
+)
+from server.utils.cache import LRUCache
+from .embedding_cache import normalize_text
+from .matrix_index import normalize
+from .single_flight import SingleFlight, get_single_flight
+
+logger = logging.getLogger(__name__)
+
+# Escopo das respostas sem usuário (prompts que não dependem de dados dele)
+GLOBAL_SCOPE = "*"
+
+# Prompts comparados por similaridade em cada (escopo, modelo, parâmetros)
+SEMANTIC_MAX_ENTRIES = 256
+
+Embed = Callable[[str], List[float]]
+
+
+@dataclass
+class ResponseCacheStats:
+    """Contadores do cache de respostas."""
+
+    hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    sets: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.semantic_hits + self.misses
+        return (self.hits + self.semantic_hits) / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+def llm_params(llm: Any) -> Tuple[str, Dict[str, Any]]:
+    """Modelo e parâmetros de um chat model que afetam a resposta."""
+    model = str(getattr(llm, "model", type(llm).__name__))
+    return model, {"temperature": getattr(llm, "temperature", None)}
+
+
+class _SemanticBucket:
+    """Embeddings dos prompts respondidos num escopo, em ordem de chegada."""
+
+    def __init__(self) -> None:
+        self.keys: List[str] = []
+        self.vectors: Optional[np.ndarray] = None
+
+    def add(self, key: str, vector: np.ndarray) -> None:
+        if key in self.keys:
+            return
+        self.keys.append(key)
+        row = normalize(vector)
+        self.vectors = row if self.vectors is None else np.vstack([self.vectors, row])
+        if len(self.keys) > SEMANTIC_MAX_ENTRIES:
+            self.keys.pop(0)
+            self.vectors = self.vectors[1:]
+
+    def discard(self, key: str) -> None:
+        if key in self.keys:
+            position = self.keys.index(key)
+            self.keys.pop(position)
+            assert self.vectors is not None
+            self.vectors = np.delete(self.vectors, position, axis=0)
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if self.vectors is None or not self.keys:
+            return None, 0.0
+        scores = self.vectors @ normalize(vector)[0]
+        best = int(np.argmax(scores))
+        return self.keys[best], float(scores[best])
+
+
+class ResponseCache:
+    """
+    Respostas do LLM em LRU com TTL, isoladas por escopo (usuário).
+
+    O nível semântico é opcional: precisa de `embed` e de `similarity` > 0
+    (cosseno mínimo para considerar dois prompts equivalentes). Ele só
+    aponta para entradas do nível exato, então herda o TTL e o limite de
+    tamanho delas.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttl: Optional[float] = RESPONSE_CACHE_TTL,
+        embed: Optional[Embed] = None,
+        similarity: float = RESPONSE_CACHE_SIMILARITY,
+        flight: Optional[SingleFlight] = None,
+    ) -> None:
+        self.embed = embed
+        self.flight = flight or get_single_flight()
+        self.similarity = similarity
+        self.stats = ResponseCacheStats()
+        self._entries = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._buckets = LRUCache(max_entries=max_entries)
+        self._lock = threading.Lock()
+
+    @property
+    def semantic(self) -> bool:
+        return self.embed is not None and self.similarity > 0
+
+    @staticmethod
+    def key(
+        scope: Optional[str], model: str, params: Dict[str, Any], prompt: str
+    ) -> str:
+        payload = json.dumps(
+            [scope or GLOBAL_SCOPE, model, params, normalize_text(prompt)],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _bucket_key(
+        scope: Optional[str], model: str, params: Dict[str, Any]
+    ) -> Hashable:
+        return (scope or GLOBAL_SCOPE, model, json.dumps(params, sort_keys=True))
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        assert self.embed is not None
+        try:
+            return np.asarray(self.embed(normalize_text(prompt)), dtype="float32")
+        except Exception as e:
+            # Sem embedding, o nível semântico só é pulado
+            logger.warning(f"Erro ao gerar embedding do prompt: {str(e)}")
+            return None
+
+    def get(
+        self,
+        scope: Optional[str],
+        model: str,
+        params: Dict[str, Any],
+        prompt: str,
+    ) -> Optional[str]:
+        key = self.key(scope, model, params, prompt)
+        response = self._entries.get(key)
+        if response is not None:
+            self.stats.hits += 1
+            return response
+        if self.semantic:
+            bucket = self._buckets.get(self._bucket_key(scope, model, params))
+            vector = self._embed(prompt) if bucket is not None else None
+            if vector is not None:
+                with self._lock:
+                    nearest, score = bucket.nearest(vector)
+                if nearest is not None and score >= self.similarity:
+                    response = self._entries.get(nearest)
+                    if response is not None:
+                        self.stats.semantic_hits += 1
+                        return response
+                    # Entrada expirada ou descartada do nível exato
+                    with self._lock:
+                        bucket.discard(nearest)
+        self.stats.misses += 1
+        return None
+
+    def set(
+        self,
+        scope: Optional[str],
+        model: str,
+        params: Dict[str, Any],
+        prompt: str,
+        response: str,
+    ) -> None:
+        key = self.key(scope, model, params, prompt)
+        self._entries.set(key, response)
+        self.stats.sets += 1
+        if not self.semantic:
+            return
+        vector = self._embed(prompt)
+        if vector is None:
+            return
+        bucket_key = self._bucket_key(scope, model, params)
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                bucket = _SemanticBucket()
+                self._buckets.set(bucket_key, bucket)
+            bucket.add(key, vector)
+
+    def get_or_compute(
+        self,
+        scope: Optional[str],
+        model: str,
+        params: Dict[str, Any],
+        prompt: str,
+        compute: Callable[[], str],
+    ) -> str:
+        """
+        Resposta do cache ou de `compute()` (que entra no cache).
+
+        Chamadas simultâneas com a mesma chave dividem um único `compute()`.
+        """
+        response = self.get(scope, model, params, prompt)
+        if response is not None:
+            return response
+
+        def lead() -> str:
+            result = compute()
+            self.set(scope, model, params, prompt, result)
+            return result
+
+        return self.flight.do(
+            ("response", self.key(scope, model, params, prompt)), lead
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def _default_embed() -> Optional[Embed]:
+    if RESPONSE_CACHE_SIMILARITY <= 0:
+        return None
+    from server.config.settings import GEMINI_API_KEY
+    from .embeddings import get_embeddings
+
+    if not GEMINI_API_KEY:
+        return None
+    return get_embeddings(GEMINI_API_KEY).embed_query
+
+
+def get_response_cache() -> ResponseCache:
+    """Cache de respostas compartilhado do processo."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(embed=_default_embed())
+        return _cache
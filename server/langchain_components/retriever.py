@@ -1,26 +1,210 @@
-from typing import Dict, Any, Optional
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import numpy as np
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import OpenAIEmbeddings
+from langchain_core.documents import Document
+from server.config.settings import (
+    VECTOR_INDEX_DIR,
+    VECTOR_INDEX_PROMOTE_AT,
+    VECTOR_INDEX_QUANTIZE,
+)
+from .embedding_cache import with_cache
+from .embedding_pipeline import EmbeddingPipeline, run_sync
+from .ingestion import IngestionPipeline, vector_index_sink
+from .matrix_index import MatrixIndex
+from .note_chunks import chunk_prefix, note_of, plan_update, split_note
+from .rate_limiter import BATCH, priority
+from .vector_index import VectorIndexStore, content_version
 
 
 class DocumentRetriever:
     def __init__(self, api_key: str) -> None:
-        self.embeddings = OpenAIEmbeddings(api_key=api_key)
+        self.embeddings = with_cache(OpenAIEmbeddings(api_key=api_key))
         self.vectorstore: Optional[FAISS] = None
+        # Coleções pequenas: matriz NumPy com os textos, sem o FAISS
+        self.matrix: Optional[MatrixIndex] = None
+        self.texts: List[str] = []
+        # Índices persistentes por usuário, atualizados nota a nota
+        self.indexes = VectorIndexStore(
+            VECTOR_INDEX_DIR,
+            self.embeddings.model,
+            promote_at=VECTOR_INDEX_PROMOTE_AT,
+            quantize=VECTOR_INDEX_QUANTIZE,
+        )
+        self.pipeline = EmbeddingPipeline(self.embeddings)
 
     def create_vectorstore(self, texts: list[str]) -> Dict[str, Any]:
         try:
-            self.vectorstore = FAISS.from_texts(texts, self.embeddings)
+            with priority(BATCH):
+                vectors = self.pipeline.embed(texts)
+            self.vectorstore, self.matrix, self.texts = None, None, []
+            if len(texts) > VECTOR_INDEX_PROMOTE_AT:
+                self.vectorstore = FAISS.from_embeddings(
+                    list(zip(texts, vectors)), self.embeddings
+                )
+            elif texts:
+                self.matrix = MatrixIndex(
+                    len(vectors[0]), quantize=VECTOR_INDEX_QUANTIZE
+                )
+                self.matrix.add_with_ids(
+                    np.asarray(vectors), np.arange(len(texts), dtype="int64")
+                )
+                self.texts = list(texts)
             return {"success": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
     def search(self, query: str, k: int = 4) -> Dict[str, Any]:
-        if not self.vectorstore:
-            return {"success": False, "error": "Vectorstore não inicializado"}
+        try:
+            if self.matrix is not None:
+                vector = self.embeddings.embed_query(query)
+                _, ids = self.matrix.search(np.asarray(vector), k)
+                results = [Document(page_content=self.texts[i]) for i in ids[0]]
+                return {"success": True, "results": results}
+            store = self.vectorstore
+            if store is None:
+                return {"success": False, "error": "Vectorstore não inicializado"}
+            results = store.similarity_search(query, k=k)
+            return {"success": True, "results": results}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def sync_notes(self, user_id: str, notes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Sincroniza o índice do usuário com a lista completa de notas.
+
+        Só notas novas ou com texto alterado são enviadas para embedding;
+        notas que sumiram da lista saem do índice.
+        """
+        try:
+            index = self.indexes.get(user_id)
+            texts = {str(note["id"]): note.get("content") or "" for note in notes}
+            versions = {
+                note_id: content_version(text) for note_id, text in texts.items()
+            }
+            stale = index.stale(versions)
+            if stale:
+                # Sincronização completa: cede a vez ao chat no limitador
+                with priority(BATCH):
+                    vectors = self.pipeline.embed([texts[note_id] for note_id in stale])
+                index.upsert_many(
+                    [(note_id, versions[note_id]) for note_id in stale], vectors
+                )
+            removed = index.prune(texts)
+            index.save()
+            return {"success": True, "embedded": len(stale), "removed": removed}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def index_note(self, user_id: str, note_id: str, content: str) -> Dict[str, Any]:
+        """Indexa uma nota criada ou alterada: um embedding e uma gravação."""
+        try:
+            index = self.indexes.get(user_id)
+            version = content_version(content)
+            if index.is_current(note_id, version):
+                return {"success": True, "embedded": 0}
+            vector = self.embeddings.embed_documents([content])[0]
+            index.upsert(note_id, version, vector)
+            index.save()
+            return {"success": True, "embedded": 1}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def remove_note(self, user_id: str, note_id: str) -> Dict[str, Any]:
+        try:
+            index = self.indexes.get(user_id)
+            if index.delete(note_id):
+                index.save()
+            return {"success": True}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def index_note_chunks(
+        self, user_id: str, note_id: str, content: str
+    ) -> Dict[str, Any]:
+        """
+        Reindexa os chunks de uma nota criada ou alterada.
+
+        A nota é dividida de novo e comparada, por hash, com os chunks já
+        indexados: só os chunks novos ou alterados vão para embedding, e os
+        que sumiram são removidos.
+        """
+        try:
+            index = self.indexes.get(f"{user_id}:chunks")
+            prefix = chunk_prefix(note_id)
+            existing = [key for key in index.entries if key.startswith(prefix)]
+            added, removed = plan_update(note_id, split_note(content), existing)
+            if added:
+                vectors = self.pipeline.embed(list(added.values()))
+                index.upsert_many([(key, key) for key in added], vectors)
+            index.delete_many(removed)
+            index.save()
+            return {"success": True, "embedded": len(added), "removed": len(removed)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def remove_note_chunks(self, user_id: str, note_id: str) -> Dict[str, Any]:
+        try:
+            index = self.indexes.get(f"{user_id}:chunks")
+            prefix = chunk_prefix(note_id)
+            if index.delete_many(
+                [key for key in index.entries if key.startswith(prefix)]
+            ):
+                index.save()
+            return {"success": True}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def search_note_chunks(
+        self, user_id: str, query: str, k: int = 4
+    ) -> Dict[str, Any]:
+        """Busca semântica por chunks, agrupada por nota (melhor chunk)."""
+        try:
+            index = self.indexes.get(f"{user_id}:chunks")
+            if not len(index):
+                return {"success": True, "results": []}
+            vector = self.embeddings.embed_query(query)
+            best: Dict[str, Dict[str, Any]] = {}
+            # Busca mais chunks que k: vários podem ser da mesma nota
+            for key, score in index.search(vector, k * 4):
+                note_id = note_of(key)
+                if note_id not in best:
+                    best[note_id] = {"id": note_id, "score": score, "chunk": key}
+            return {"success": True, "results": list(best.values())[:k]}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def aingest_documents(self, user_id: str, root: str) -> Dict[str, Any]:
+        """
+        Ingere os documentos de um diretório no índice de documentos do
+        usuário (separado do índice de notas). Chunks já indexados são
+        pulados; o resultado traz as métricas de cada etapa.
+        """
+        try:
+            index = self.indexes.get(f"{user_id}:documents")
+            pipeline = IngestionPipeline(self.pipeline, vector_index_sink(index))
+            result = await pipeline.run(Path(root), known=index.entries)
+            index.save()
+            return result
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def ingest_documents(self, user_id: str, root: str) -> Dict[str, Any]:
+        """Versão síncrona de `aingest_documents`."""
+        return run_sync(self.aingest_documents(user_id, root))
 
+    def search_notes(self, user_id: str, query: str, k: int = 4) -> Dict[str, Any]:
+        """Busca semântica nas notas indexadas do usuário."""
         try:
-            results = self.vectorstore.similarity_search(query, k=k)
+            index = self.indexes.get(user_id)
+            if not len(index):
+                return {"success": True, "results": []}
+            vector = self.embeddings.embed_query(query)
+            results = [
+                {"id": note_id, "score": score}
+                for note_id, score in index.search(vector, k)
+            ]
             return {"success": True, "results": results}
         except Exception as e:
             return {"success": False, "error": str(e)}
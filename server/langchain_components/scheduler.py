@@ -1,18 +1,17 @@
 from langchain.agents import AgentType, AgentExecutor, initialize_agent
 from langchain.tools import Tool
 from langchain_google_genai import ChatGoogleGenerativeAI
-from pydantic import SecretStr
 from server.config.settings import settings
+from .llm_factory import get_llm, shared
 
 
 def get_scheduler_agent() -> AgentExecutor:
-    """Retorna um agente para agendamento de tarefas"""
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-pro",
-        api_key=SecretStr(settings.GEMINI_API_KEY or ""),
-        temperature=0.7,
-    )
+    """Retorna o agente (compartilhado) para agendamento de tarefas"""
+    llm = get_llm(settings.GEMINI_API_KEY or "")
+    return shared(("scheduler_agent", id(llm)), lambda: _build_agent(llm))
+
 
+def _build_agent(llm: ChatGoogleGenerativeAI) -> AgentExecutor:
     tools = [
         Tool(
             name="calendar",
@@ -0,0 +1,78 @@
+"""
+Agrupamento de chamadas idênticas em andamento (single-flight).
+
+Quando várias requisições pedem a mesma coisa ao mesmo tempo (a mesma
+nota analisada por toda a equipe, o mesmo texto a embeddar), só a
+primeira chama o modelo; as demais esperam e recebem o mesmo resultado
+(ou o mesmo erro). Nada fica guardado depois que a chamada termina: isso
+é papel dos caches.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+import threading
+
+T = TypeVar("T")
+
+
+@dataclass
+class FlightStats:
+    """Chamadas feitas de fato (`leaders`) e chamadas poupadas (`shared`)."""
+
+    leaders: int = 0
+    shared: int = 0
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Executa no máximo uma chamada por chave ao mesmo tempo, por processo.
+
+    Os pontos de entrada do LLM e dos embeddings são síncronos (rotas
+    assíncronas os chamam via threads), então o grupo é coordenado por
+    threads; chamadas `aembed_*` do LangChain também passam por aqui.
+    """
+
+    def __init__(self) -> None:
+        self.stats = FlightStats()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.stats.leaders += 1
+            else:
+                self.stats.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Grupo de chamadas compartilhado do processo."""
+    return _flight
@@ -0,0 +1,190 @@
+"""Resumo de conversas em segundo plano, fora do caminho da resposta."""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+
+from langchain_core.memory import BaseMemory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from server.config.settings import SUMMARY_TOKEN_THRESHOLD
+from server.utils.cache import LRUCache
+from .embedding_pipeline import estimate_tokens
+from .rate_limiter import BACKGROUND, priority
+
+logger = logging.getLogger(__name__)
+
+Turn = Tuple[str, str]
+
+# (resumo atual, trocas ainda não resumidas) -> novo resumo
+Summarize = Callable[[str, List[Turn]], str]
+
+
+SUMMARY_PROMPT = """Atualize o resumo da conversa com as novas trocas.
+
+Resumo atual:
+{summary}
+
+Novas trocas:
+{turns}
+
+Escreva apenas o novo resumo, curto e em português."""
+
+
+def llm_summarizer(llm: Any) -> Summarize:
+    """Função de resumo que usa um chat model do LangChain."""
+
+    def summarize(summary: str, turns: List[Turn]) -> str:
+        lines = "\n".join(
+            f"Usuário: {message}\nAssistente: {response}" for message, response in turns
+        )
+        prompt = SUMMARY_PROMPT.format(summary=summary or "(vazio)", turns=lines)
+        return str(llm.invoke(prompt).content)
+
+    return summarize
+
+
+def _cost(turn: Turn) -> int:
+    return estimate_tokens(turn[0]) + estimate_tokens(turn[1])
+
+
+class SummaryState:
+    """Resumo acumulado de uma conversa e as trocas que ele ainda não cobre."""
+
+    def __init__(self) -> None:
+        self.summary = ""
+        self.tail: List[Turn] = []
+        self.tail_tokens = 0
+        self.running = False
+        self.rerun = False
+
+
+class SummaryScheduler:
+    """
+    Mantém um resumo por conversa, recalculado em segundo plano.
+
+    As respostas usam o resumo atual mais as trocas recentes; quando as
+    trocas ainda não resumidas passam de `threshold` tokens, um único
+    trabalho de resumo é agendado para a conversa. Gatilhos que chegam
+    enquanto ele roda são agrupados numa nova rodada ao final.
+    """
+
+    def __init__(
+        self,
+        summarize: Summarize,
+        threshold: int = SUMMARY_TOKEN_THRESHOLD,
+        max_conversations: int = 10000,
+        max_workers: int = 2,
+    ) -> None:
+        self.summarize = summarize
+        self.threshold = threshold
+        self.runs = 0
+        self._states = LRUCache(max_entries=max_conversations)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="summarizer"
+        )
+
+    def _state(self, key: str) -> SummaryState:
+        state = self._states.get(key)
+        if state is None:
+            state = SummaryState()
+            self._states.set(key, state)
+        return state
+
+    def context(self, key: str) -> Tuple[str, List[Turn]]:
+        """Resumo atual e trocas recentes, sem esperar por nenhum resumo."""
+        with self._lock:
+            state = self._state(key)
+            return state.summary, list(state.tail)
+
+    def record(self, key: str, message: str, response: str) -> Optional[Future]:
+        """Registra uma troca; agenda um resumo se a cauda passou do limite."""
+        with self._lock:
+            state = self._state(key)
+            state.tail.append((message, response))
+            state.tail_tokens += _cost((message, response))
+            if state.tail_tokens <= self.threshold:
+                return None
+            return self._trigger(key, state)
+
+    def _trigger(self, key: str, state: SummaryState) -> Optional[Future]:
+        if state.running:
+            state.rerun = True
+            return None
+        state.running = True
+        return self._executor.submit(self._run, key, state)
+
+    def _run(self, key: str, state: SummaryState) -> None:
+        with self._lock:
+            summary, turns = state.summary, list(state.tail)
+        try:
+            # O chat interativo passa na frente dos resumos no limitador
+            with priority(BACKGROUND):
+                updated = self.summarize(summary, turns)
+        except Exception as e:
+            logger.error(f"Erro ao resumir a conversa {key}: {str(e)}")
+            updated = None
+        with self._lock:
+            self.runs += 1
+            if updated is not None:
+                # Trocas que chegaram durante o resumo continuam na cauda
+                state.summary = updated
+                state.tail = state.tail[len(turns) :]
+                state.tail_tokens = sum(_cost(turn) for turn in state.tail)
+            state.running = False
+            if state.rerun and state.tail_tokens > self.threshold:
+                state.rerun = False
+                self._trigger(key, state)
+            state.rerun = False
+
+    def clear(self, key: str) -> None:
+        self._states.delete(key)
+
+
+class ScheduledSummaryMemory(BaseMemory):
+    """
+    Memória do LangChain servida por um `SummaryScheduler`.
+
+    Ao contrário de `ConversationSummaryMemory`, salvar uma troca nunca
+    chama o LLM no caminho da resposta.
+    """
+
+    scheduler: Any
+    key: str
+    memory_key: str = "chat_history"
+    return_messages: bool = True
+
+    @property
+    def memory_variables(self) -> List[str]:
+        return [self.memory_key]
+
+    def _messages(self) -> List[BaseMessage]:
+        summary, turns = self.scheduler.context(self.key)
+        messages: List[BaseMessage] = []
+        if summary:
+            messages.append(
+                SystemMessage(content=f"Resumo da conversa até aqui: {summary}")
+            )
+        for message, response in turns:
+            messages.append(HumanMessage(content=message))
+            messages.append(AIMessage(content=response))
+        return messages
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        messages = self._messages()
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {
+            self.memory_key: "\n".join(
+                f"{message.type}: {message.content}" for message in messages
+            )
+        }
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        message = str(inputs.get("input", next(iter(inputs.values()), "")))
+        response = str(outputs.get("output", next(iter(outputs.values()), "")))
+        self.scheduler.record(self.key, message, response)
+
+    def clear(self) -> None:
+        self.scheduler.clear(self.key)
@@ -1,11 +1,9 @@
 from typing import List
 from langchain.tools import Tool
 from langchain.agents import AgentType, AgentExecutor, initialize_agent
-from langchain_google_genai import ChatGoogleGenerativeAI
 from server.config.settings import settings
 import logging
-from google.generativeai import configure, GenerativeModel
-from google.ai import generativelanguage as glm
+from .llm_factory import SAFETY_SETTINGS, get_llm, shared
 
 logger = logging.getLogger(__name__)
 
@@ -36,50 +34,30 @@ def get_agent() -> AgentExecutor:
         if not settings.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY não está configurada")
 
-        configure(api_key=settings.GEMINI_API_KEY)
-        model = GenerativeModel(
-            model_name="gemini-pro",
-            generation_config=glm.GenerationConfig(
-                temperature=0.7,
-                top_p=0.8,
-                top_k=40,
-                max_output_tokens=2048,
-            ),
-            safety_settings=[
-                {
-                    "category": "HARM_CATEGORY_HARASSMENT",
-                    "threshold": "BLOCK_MEDIUM_AND_ABOVE",
-                },
-                {
-                    "category": "HARM_CATEGORY_HATE_SPEECH",
-                    "threshold": "BLOCK_MEDIUM_AND_ABOVE",
-                },
-                {
-                    "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                    "threshold": "BLOCK_MEDIUM_AND_ABOVE",
-                },
-                {
-                    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                    "threshold": "BLOCK_MEDIUM_AND_ABOVE",
-                },
-            ],
-        )
-
-        llm = ChatGoogleGenerativeAI(
-            model=model,
+        llm = get_llm(
+            settings.GEMINI_API_KEY,
+            temperature=0.7,
+            safety=SAFETY_SETTINGS,
+            top_p=0.8,
+            top_k=40,
+            max_output_tokens=2048,
             convert_system_message_to_human=True,
         )
 
-        tools = get_tools()
-
-        return initialize_agent(
-            tools,
-            llm,
-            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-            verbose=True,
-            handle_parsing_errors=True,
-            max_iterations=5,
-            early_stopping_method="generate",
+        # O agente não tem memória: um por processo basta
+        return shared(
+            ("tools_agent", id(llm)),
+            lambda: initialize_agent(
+                get_tools(),
+                llm,
+                agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+                verbose=True,
+                handle_parsing_errors=True,
+                max_iterations=5,
+                early_stopping_method="generate",
+                # Permite saber se a execução chamou ferramentas (cache)
+                return_intermediate_steps=True,
+            ),
         )
     except Exception as e:
         logger.error(f"Erro ao inicializar o agente: {str(e)}")
@@ -0,0 +1,473 @@
+"""Índice vetorial persistente por usuário, atualizado nota a nota."""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import faiss
+import numpy as np
+
+from .matrix_index import MatrixIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.faiss"
+MATRIX_FILE = "index.npy"
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+
+# Até este número de notas a busca é exata, numa matriz NumPy; acima dele
+# o índice é promovido para um IVF do FAISS (busca aproximada)
+PROMOTE_AT = 20000
+
+# Listas do IVF visitadas por consulta: mais listas, mais recall e latência
+IVF_NPROBE = 16
+
+
+def content_version(text: str) -> str:
+    """Versão de uma nota para o índice: muda só quando o texto muda."""
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+AnyIndex = Union[faiss.Index, MatrixIndex]
+
+Vectors = Union[Sequence[Sequence[float]], np.ndarray]
+
+# Operação pendente por nota: (versão, vetor normalizado) ou None (remoção)
+PendingOp = Optional[Tuple[str, np.ndarray]]
+
+
+def _stored_ids(index: AnyIndex) -> List[int]:
+    if isinstance(index, MatrixIndex):
+        return index.ids.tolist()
+    id_map = cast(faiss.IndexIDMap2, faiss.downcast_index(index)).id_map
+    return faiss.vector_to_array(id_map).tolist()
+
+
+def _remove_ids(index: AnyIndex, ids: Iterable[int]) -> None:
+    array = np.array(sorted(ids), dtype="int64")
+    if isinstance(index, MatrixIndex):
+        index.remove_ids(array)
+    else:
+        index.remove_ids(faiss.IDSelectorBatch(array))
+
+
+def _promote(index: MatrixIndex) -> faiss.Index:
+    """
+    IVF treinado com os vetores da matriz: cada consulta compara só com as
+    notas das `IVF_NPROBE` listas mais próximas, em vez de com todas.
+
+    O IVF (e não o HNSW) porque aceita remoção de IDs, usada a cada nota
+    alterada ou apagada. As listas ficam fixas após a promoção.
+    """
+    vectors = index.vectors()
+    nlist = max(1, int(np.sqrt(len(vectors))))
+    promoted = faiss.index_factory(
+        index.d, f"IDMap2,IVF{nlist},Flat", faiss.METRIC_INNER_PRODUCT
+    )
+    promoted.train(vectors)
+    faiss.extract_index_ivf(promoted).nprobe = min(IVF_NPROBE, nlist)
+    promoted.add_with_ids(vectors, np.ascontiguousarray(index.ids))
+    return promoted
+
+
+def _as_matrix(vectors: Union[Sequence[float], Vectors]) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype="float32")
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    matrix = np.ascontiguousarray(matrix)
+    # Vetores normalizados: produto interno = similaridade de cosseno
+    faiss.normalize_L2(matrix)
+    return matrix
+
+
+def _write_atomic(path: Path, write: Callable[[str], Any]) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(str(tmp))
+    os.replace(tmp, path)
+
+
+class UserVectorIndex:
+    """
+    Índice FAISS das notas de um usuário, salvo em disco.
+
+    O manifesto guarda, para cada nota, o ID no FAISS e a versão do texto
+    indexado, de modo que só notas novas ou alteradas precisam de um novo
+    embedding. O índice é aberto com mmap e só é copiado para a memória
+    na primeira alteração.
+
+    Coleções pequenas ficam numa matriz NumPy (`MatrixIndex`, opcionalmente
+    quantizada em int8), com busca exata, mais leve de montar e carregar; ao
+    passar de `promote_at` notas o índice passa para um IVF do FAISS, com
+    busca aproximada.
+
+    Vários workers podem alterar o mesmo índice: cada um guarda as suas
+    alterações desde a última carga e, ao salvar, com o lock do arquivo,
+    recarrega o que outro worker gravou e reaplica as suas por cima, em
+    vez de sobrescrever o disco com o seu estado em memória.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        model: str,
+        promote_at: int = PROMOTE_AT,
+        quantize: bool = False,
+    ) -> None:
+        self.directory = directory
+        self.model = model
+        self.promote_at = promote_at
+        self.quantize = quantize
+        self.dim: Optional[int] = None
+        self.entries: Dict[str, Tuple[int, str]] = {}
+        self._next_id = 0
+        self._index: Optional[AnyIndex] = None
+        self._mmapped = False
+        self._dirty = False
+        self._pending: Dict[str, PendingOp] = {}
+        self._revision = 0
+        self._loaded_mtime = 0
+        self._lock = threading.RLock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_FILE
+
+    @property
+    def matrix_path(self) -> Path:
+        return self.directory / MATRIX_FILE
+
+    @property
+    def backend(self) -> Optional[str]:
+        if self._index is None:
+            return None
+        return "matrix" if isinstance(self._index, MatrixIndex) else "faiss"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_FILE
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        # Vários workers podem gravar o índice do mesmo usuário
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_FILE, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def load(self) -> None:
+        """Carrega o índice do disco, se existir e for do mesmo modelo."""
+        with self._lock, self._file_lock():
+            self._load()
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return None
+        manifest: Dict[str, Any] = json.loads(self.manifest_path.read_text())
+        return manifest
+
+    def _load(self) -> None:
+        self.entries, self._next_id, self.dim = {}, 0, None
+        self._index, self._mmapped, self._dirty = None, False, False
+        self._pending, self._revision = {}, 0
+        manifest = self._read_manifest()
+        if manifest is None:
+            return
+        self._revision = manifest.get("revision", 0)
+        self._loaded_mtime = self.manifest_path.stat().st_mtime_ns
+        if manifest.get("model") != self.model:
+            logger.info(f"Índice vetorial de outro modelo em {self.directory}")
+            return
+        backend = manifest.get("backend", "faiss")
+        path = self.matrix_path if backend == "matrix" else self.index_path
+        if not path.exists():
+            return
+        self.dim = manifest["dim"]
+        self._next_id = manifest["next_id"]
+        self.entries = {
+            note_id: (faiss_id, version)
+            for note_id, (faiss_id, version) in manifest["entries"].items()
+        }
+        if backend == "matrix":
+            self._index = MatrixIndex.read(path, mmap=True)
+        else:
+            self._index = faiss.read_index(str(path), faiss.IO_FLAG_MMAP)
+        self._mmapped = True
+        self._reconcile()
+
+    def _reconcile(self) -> None:
+        """Alinha manifesto e índice após uma gravação interrompida."""
+        assert self._index is not None
+        stored = set(_stored_ids(self._index))
+        listed = {faiss_id for faiss_id, _ in self.entries.values()}
+        missing = [
+            note_id
+            for note_id, (faiss_id, _) in self.entries.items()
+            if faiss_id not in stored
+        ]
+        orphans = stored - listed
+        if not missing and not orphans:
+            return
+        logger.warning(f"Reconciliando índice vetorial em {self.directory}")
+        for note_id in missing:
+            del self.entries[note_id]
+        if orphans:
+            _remove_ids(self._writable(), orphans)
+        self._dirty = True
+
+    def refresh(self) -> None:
+        """
+        Recarrega o índice se outro processo o gravou depois.
+
+        Com alterações ainda não salvas não recarrega: `save` junta as duas.
+        """
+        with self._lock:
+            if self._dirty or not self.manifest_path.exists():
+                return
+            if self.manifest_path.stat().st_mtime_ns != self._loaded_mtime:
+                with self._file_lock():
+                    self._load()
+
+    def _writable(self, dim: Optional[int] = None) -> AnyIndex:
+        index = self._index
+        if index is None:
+            if dim is None:
+                raise ValueError("Dimensão do índice desconhecida")
+            self.dim = dim
+            index = MatrixIndex(dim, quantize=self.quantize)
+        elif self._mmapped:
+            # Um índice mapeado é só leitura: copia para a memória
+            if isinstance(index, MatrixIndex):
+                index = MatrixIndex.read(self.matrix_path)
+            else:
+                index = faiss.read_index(str(self.index_path))
+            self._mmapped = False
+        self._index = index
+        return index
+
+    def is_current(self, note_id: str, version: str) -> bool:
+        entry = self.entries.get(note_id)
+        return entry is not None and entry[1] == version
+
+    def stale(self, versions: Mapping[str, str]) -> List[str]:
+        """Notas cuja versão atual ainda não está indexada."""
+        return [
+            note_id
+            for note_id, version in versions.items()
+            if not self.is_current(note_id, version)
+        ]
+
+    def upsert_many(
+        self,
+        items: Sequence[Tuple[str, str]],
+        vectors: Vectors,
+    ) -> int:
+        """Indexa vetores para pares (note_id, versão), substituindo os antigos."""
+        if not items:
+            return 0
+        matrix = _as_matrix(vectors)
+        with self._lock:
+            self._upsert(items, matrix)
+            for (note_id, version), row in zip(items, matrix):
+                self._pending[note_id] = (version, row)
+        return len(items)
+
+    def _upsert(self, items: Sequence[Tuple[str, str]], matrix: np.ndarray) -> None:
+        if self.dim is not None and matrix.shape[1] != self.dim:
+            raise ValueError(
+                f"Dimensão {matrix.shape[1]} difere do índice ({self.dim})"
+            )
+        index = self._writable(matrix.shape[1])
+        replaced = [
+            self.entries[note_id][0] for note_id, _ in items if note_id in self.entries
+        ]
+        if replaced:
+            _remove_ids(index, replaced)
+        ids = np.arange(self._next_id, self._next_id + len(items), dtype="int64")
+        index.add_with_ids(matrix, ids)
+        if isinstance(index, MatrixIndex) and index.ntotal > self.promote_at:
+            logger.info(f"Promovendo índice vetorial para FAISS: {self.directory}")
+            self._index = _promote(index)
+        self._next_id += len(items)
+        for (note_id, version), faiss_id in zip(items, ids.tolist()):
+            self.entries[note_id] = (faiss_id, version)
+        self._dirty = True
+
+    def upsert(self, note_id: str, version: str, vector: Sequence[float]) -> bool:
+        """Indexa uma nota; não faz nada se essa versão já estiver indexada."""
+        if self.is_current(note_id, version):
+            return False
+        self.upsert_many([(note_id, version)], [vector])
+        return True
+
+    def delete_many(self, note_ids: Iterable[str]) -> int:
+        with self._lock:
+            note_ids = list(note_ids)
+            removed = self._delete(note_ids)
+            # A nota pode ter sido indexada por outro worker: remove ao salvar
+            for note_id in note_ids:
+                self._pending[note_id] = None
+            self._dirty = self._dirty or bool(note_ids)
+            return removed
+
+    def _delete(self, note_ids: Iterable[str]) -> int:
+        removed = [
+            self.entries.pop(note_id)[0]
+            for note_id in note_ids
+            if note_id in self.entries
+        ]
+        if removed:
+            _remove_ids(self._writable(), removed)
+            self._dirty = True
+        return len(removed)
+
+    def _replay(self, pending: Mapping[str, PendingOp]) -> None:
+        """Reaplica alterações locais sobre o estado recarregado do disco."""
+        deleted = [note_id for note_id, op in pending.items() if op is None]
+        upserts = [(note_id, op) for note_id, op in pending.items() if op is not None]
+        self._delete(deleted)
+        if upserts:
+            self._upsert(
+                [(note_id, version) for note_id, (version, _) in upserts],
+                np.vstack([row for _, (_, row) in upserts]),
+            )
+
+    def delete(self, note_id: str) -> bool:
+        return self.delete_many([note_id]) > 0
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """Remove as notas que não estão mais em `keep`."""
+        keep = set(keep)
+        return self.delete_many(
+            [note_id for note_id in self.entries if note_id not in keep]
+        )
+
+    def search(self, vector: Sequence[float], k: int = 4) -> List[Tuple[str, float]]:
+        """Notas mais similares ao vetor, com a similaridade de cosseno."""
+        with self._lock:
+            if self._index is None or not self.entries:
+                return []
+            by_faiss_id = {
+                faiss_id: note_id for note_id, (faiss_id, _) in self.entries.items()
+            }
+            scores, ids = self._index.search(_as_matrix(vector), min(k, len(self)))
+        return [
+            (by_faiss_id[faiss_id], float(score))
+            for score, faiss_id in zip(scores[0].tolist(), ids[0].tolist())
+            if faiss_id in by_faiss_id
+        ]
+
+    def save(self) -> None:
+        """
+        Grava índice e manifesto de forma atômica, se houve alterações.
+
+        Se outro worker gravou desde a última carga, o índice é recarregado
+        e as alterações locais reaplicadas antes de gravar, tudo com o lock
+        do arquivo: nenhuma das duas gravações se perde.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            with self._file_lock():
+                on_disk = self._read_manifest()
+                if on_disk is not None and on_disk.get("revision", 0) != self._revision:
+                    pending = self._pending
+                    self._load()
+                    self._replay(pending)
+                if self._index is None:
+                    self._pending, self._dirty = {}, False
+                    return
+                index = self._index
+                backend = self.backend
+                self._revision += 1
+                manifest = {
+                    "model": self.model,
+                    "backend": backend,
+                    "revision": self._revision,
+                    "dim": self.dim,
+                    "next_id": self._next_id,
+                    "entries": {
+                        note_id: [faiss_id, version]
+                        for note_id, (faiss_id, version) in self.entries.items()
+                    },
+                }
+                # O índice vai antes: um manifesto nunca aponta para vetores
+                # que ainda não estão em disco
+                if isinstance(index, MatrixIndex):
+                    _write_atomic(self.matrix_path, index.write)
+                else:
+                    _write_atomic(
+                        self.index_path, lambda path: faiss.write_index(index, path)
+                    )
+                _write_atomic(
+                    self.manifest_path,
+                    lambda path: Path(path).write_text(json.dumps(manifest)),
+                )
+                # Arquivo do outro formato, deixado por uma promoção
+                stale = self.index_path if backend == "matrix" else self.matrix_path
+                stale.unlink(missing_ok=True)
+                self._loaded_mtime = self.manifest_path.stat().st_mtime_ns
+            self._pending, self._dirty = {}, False
+
+
+class VectorIndexStore:
+    """Índices vetoriais por usuário sob um mesmo diretório base."""
+
+    def __init__(
+        self,
+        base_dir: Path,
+        model: str,
+        promote_at: int = PROMOTE_AT,
+        quantize: bool = False,
+    ) -> None:
+        self.base_dir = Path(base_dir)
+        self.model = model
+        self.promote_at = promote_at
+        self.quantize = quantize
+        self._indexes: Dict[str, UserVectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def _directory(self, user_id: str) -> Path:
+        # O hash evita caracteres problemáticos do ID em nomes de diretório
+        return self.base_dir / hashlib.sha256(user_id.encode()).hexdigest()[:32]
+
+    def get(self, user_id: str) -> UserVectorIndex:
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = UserVectorIndex(
+                    self._directory(user_id),
+                    self.model,
+                    promote_at=self.promote_at,
+                    quantize=self.quantize,
+                )
+                index.load()
+                self._indexes[user_id] = index
+                return index
+        index.refresh()
+        return index
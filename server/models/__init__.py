@@ -1,18 +1,30 @@
 from server.models.user import UserProfile
-from server.models.note import Note, NoteCreate, NoteUpdate
-from server.models.task import Task, TaskCreate, TaskUpdate, TaskStatus, TaskPriority
+from server.models.note import Note, NoteCreate, NoteUpdate, NoteBatch
+from server.models.task import (
+    Task,
+    TaskCreate,
+    TaskUpdate,
+    TaskBatch,
+    TaskStatus,
+    TaskPriority,
+)
 from server.models.conversation import Conversation, ConversationCreate
+from server.models.batch import BatchItemResult, BatchResponse
 
 __all__ = [
     "UserProfile",
     "Note",
     "NoteCreate",
     "NoteUpdate",
+    "NoteBatch",
     "Task",
     "TaskCreate",
     "TaskUpdate",
+    "TaskBatch",
     "TaskStatus",
     "TaskPriority",
     "Conversation",
     "ConversationCreate",
+    "BatchItemResult",
+    "BatchResponse",
 ]
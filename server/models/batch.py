@@ -0,0 +1,49 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+# Limite de itens por requisição de lote
+MAX_BATCH_ITEMS = 5000
+
+
+class BatchItemResult(BaseModel):
+    """Resultado de um item de uma operação em lote."""
+
+    index: int
+    id: Optional[str] = None
+    success: bool
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Resultados por item de uma requisição de lote."""
+
+    created: List[BatchItemResult] = Field(default_factory=list)
+    upserted: List[BatchItemResult] = Field(default_factory=list)
+    updated: List[BatchItemResult] = Field(default_factory=list)
+    deleted: List[BatchItemResult] = Field(default_factory=list)
+
+    class Config:
+        """Configurações do modelo."""
+
+        json_schema_extra = {
+            "example": {
+                "created": [
+                    {
+                        "index": 0,
+                        "id": "123e4567-e89b-12d3-a456-426614174000",
+                        "success": True,
+                        "error": None,
+                    }
+                ],
+                "upserted": [],
+                "updated": [],
+                "deleted": [
+                    {
+                        "index": 0,
+                        "id": "123e4567-e89b-12d3-a456-426614174001",
+                        "success": False,
+                        "error": "Registro não encontrado",
+                    }
+                ],
+            }
+        }
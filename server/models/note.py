@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from server.models.batch import MAX_BATCH_ITEMS
 
 
 class Note(BaseModel):
@@ -42,3 +44,28 @@ class NoteUpdate(BaseModel):
 
     title: Optional[str] = None
     content: Optional[str] = None
+
+
+class NoteBatchUpsert(NoteCreate):
+    """Nota com ID para upsert em lote."""
+
+    id: UUID
+
+
+class NoteBatchUpdate(NoteUpdate):
+    """Atualização parcial de nota identificada pelo ID."""
+
+    id: UUID
+
+
+class NoteBatch(BaseModel):
+    """Operações em lote sobre notas."""
+
+    create: List[NoteCreate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    upsert: List[NoteBatchUpsert] = Field(
+        default_factory=list, max_length=MAX_BATCH_ITEMS
+    )
+    update: List[NoteBatchUpdate] = Field(
+        default_factory=list, max_length=MAX_BATCH_ITEMS
+    )
+    delete: List[UUID] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from server.models.batch import MAX_BATCH_ITEMS
 from enum import Enum
 
 
@@ -71,3 +73,28 @@ class TaskUpdate(BaseModel):
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
     due_date: Optional[datetime] = None
+
+
+class TaskBatchUpsert(TaskCreate):
+    """Tarefa com ID para upsert em lote."""
+
+    id: UUID
+
+
+class TaskBatchUpdate(TaskUpdate):
+    """Atualização parcial de tarefa identificada pelo ID."""
+
+    id: UUID
+
+
+class TaskBatch(BaseModel):
+    """Operações em lote sobre tarefas."""
+
+    create: List[TaskCreate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    upsert: List[TaskBatchUpsert] = Field(
+        default_factory=list, max_length=MAX_BATCH_ITEMS
+    )
+    update: List[TaskBatchUpdate] = Field(
+        default_factory=list, max_length=MAX_BATCH_ITEMS
+    )
+    delete: List[UUID] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
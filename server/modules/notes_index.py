@@ -0,0 +1,356 @@
+"""Índice invertido em memória, por usuário, para busca instantânea de notas."""
+
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import bisect
+import heapq
+import math
+import re
+import sys
+import threading
+import unicodedata
+
+# Palavras muito comuns em português, ignoradas na indexação e na busca
+STOPWORDS = frozenset(
+    """
+    a ao aos as ate com como da das de dela dele deles do dos e ela elas ele
+    eles em entre era essa esse esta este eu foi ha isso isto ja la lhe mais
+    mas me mesmo meu minha muito na nao nas nem no nos nossa nosso num numa o
+    os ou para pela pelas pelo pelos por qual quando que quem se sem ser seu
+    sua suas seus so sao tambem te tem tu um uma umas uns voce voces
+    """.split()
+)
+
+SNIPPET_LENGTH = 160
+
+# Um prefixo curto pode casar com milhares de termos: só os mais
+# frequentes entram na busca, mantendo a latência do type-ahead estável
+MAX_PREFIX_EXPANSIONS = 16
+
+# Parâmetros do BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Remove acentos e converte para minúsculas ("Reunião" -> "reuniao")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Quebra o texto em termos normalizados, sem stopwords."""
+    return [token for token in _WORD.findall(fold(text)) if token not in STOPWORDS]
+
+
+@dataclass
+class IndexedNote:
+    """Dados mínimos de uma nota guardados no índice."""
+
+    id: str
+    title: str
+    snippet: str
+    length: int
+    terms: Counter
+
+    @property
+    def size(self) -> int:
+        """Estimativa do espaço ocupado, em bytes."""
+        return (
+            sys.getsizeof(self.title)
+            + sys.getsizeof(self.snippet)
+            + sum(sys.getsizeof(term) + 64 for term in self.terms)
+        )
+
+
+class UserNotesIndex:
+    """Índice invertido das notas de um único usuário."""
+
+    def __init__(self) -> None:
+        self.notes: Dict[str, IndexedNote] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.size = 0
+        self._total_length = 0
+        self._lengths: Dict[str, int] = {}
+        self._vocabulary: Optional[List[str]] = None
+        # Expansões de prefixo já calculadas, válidas enquanto o vocabulário
+        # não muda
+        self._expansions: Dict[str, List[str]] = {}
+
+    def add(self, note_id: str, title: str, content: str) -> None:
+        self.remove(note_id)
+        terms = Counter(tokenize(f"{title} {content}"))
+        note = IndexedNote(
+            id=note_id,
+            title=title,
+            snippet=content[:SNIPPET_LENGTH],
+            length=sum(terms.values()),
+            terms=terms,
+        )
+        for term, count in terms.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self._vocabulary = None
+            self.postings[term][note_id] = count
+        self.notes[note_id] = note
+        self._lengths[note_id] = note.length
+        self.size += note.size
+        self._total_length += note.length
+
+    def remove(self, note_id: str) -> bool:
+        note = self.notes.pop(note_id, None)
+        if note is None:
+            return False
+        del self._lengths[note_id]
+        for term in note.terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(note_id, None)
+            if not postings:
+                del self.postings[term]
+                self._vocabulary = None
+        self.size -= note.size
+        self._total_length -= note.length
+        return True
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Termos do vocabulário que começam com `prefix`."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+            self._expansions.clear()
+        terms = self._expansions.get(prefix)
+        if terms is None:
+            start = bisect.bisect_left(self._vocabulary, prefix)
+            end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+            terms = heapq.nlargest(
+                MAX_PREFIX_EXPANSIONS,
+                self._vocabulary[start:end],
+                key=lambda term: len(self.postings[term]),
+            )
+            if len(self._expansions) >= 1024:
+                self._expansions.clear()
+            self._expansions[prefix] = terms
+        return terms
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[IndexedNote, float]]:
+        """
+        Busca as notas que contêm todos os termos da consulta.
+
+        O último termo é tratado como prefixo, para a busca enquanto se
+        digita. O ranking é BM25 sobre título e conteúdo.
+        """
+        terms = tokenize(query)
+        if not terms or not self.notes:
+            return []
+
+        total = len(self.notes)
+        average_length = self._total_length / total or 1.0
+        lengths = self._lengths
+        scores: Optional[Dict[str, float]] = None
+        for position, term in enumerate(terms):
+            is_prefix = position == len(terms) - 1
+            expansions = self._expand(term) if is_prefix else [term]
+            term_scores: Dict[str, float] = {}
+            for expansion in expansions:
+                postings = self.postings.get(expansion, {})
+                idf = math.log(
+                    1 + (total - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for note_id, frequency in postings.items():
+                    norm = BM25_K1 * (
+                        1 - BM25_B + BM25_B * lengths[note_id] / average_length
+                    )
+                    score = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                    if score > term_scores.get(note_id, 0.0):
+                        term_scores[note_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    note_id: score + term_scores[note_id]
+                    for note_id, score in scores.items()
+                    if note_id in term_scores
+                }
+            if not scores:
+                return []
+
+        ranked = heapq.nlargest(limit, (scores or {}).items(), key=lambda item: item[1])
+        return [(self.notes[note_id], score) for note_id, score in ranked]
+
+
+Loader = Callable[[str], Iterable[Dict[str, str]]]
+
+# Alteração recebida durante a construção de um índice:
+# ("upsert", nota), ("remove", note_id) ou ("invalidate", None)
+Change = Tuple[str, Any]
+
+
+class NotesIndex:
+    """
+    Índices de notas por usuário, com limite de memória.
+
+    O índice de um usuário é construído na primeira busca a partir de
+    `loader` e mantido em dia por `upsert`/`remove`. Ao passar de
+    `max_bytes`, os índices usados há mais tempo são descartados inteiros
+    e reconstruídos quando o usuário voltar a buscar.
+
+    A construção roda fora do lock; as alterações que chegam enquanto ela
+    acontece ficam numa fila do usuário e são reaplicadas ao índice
+    construído antes de ele entrar em uso.
+    """
+
+    def __init__(self, loader: Loader, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self._users: "OrderedDict[str, UserNotesIndex]" = OrderedDict()
+        self._owners: Dict[str, str] = {}
+        # Construções em andamento por usuário e alterações recebidas nelas
+        self._builders: Dict[str, int] = {}
+        self._changes: Dict[str, List[Change]] = {}
+        self._size = 0
+        self._lock = threading.RLock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._users
+
+    def _build(self, user_id: str) -> UserNotesIndex:
+        index = UserNotesIndex()
+        for note in self.loader(user_id):
+            index.add(
+                str(note["id"]), note.get("title") or "", note.get("content") or ""
+            )
+        return index
+
+    def _evict(self, keep: str) -> None:
+        while self._size > self.max_bytes and len(self._users) > 1:
+            user_id, index = next(iter(self._users.items()))
+            if user_id == keep:
+                self._users.move_to_end(user_id)
+                continue
+            self._drop(user_id, index)
+
+    def _drop(self, user_id: str, index: UserNotesIndex) -> None:
+        del self._users[user_id]
+        self._size -= index.size
+        for note_id in index.notes:
+            self._owners.pop(note_id, None)
+
+    def _begin_build(self, user_id: str) -> None:
+        self._builders[user_id] = self._builders.get(user_id, 0) + 1
+        self._changes.setdefault(user_id, [])
+
+    def _end_build(self, user_id: str) -> List[Change]:
+        changes = self._changes.get(user_id, [])
+        self._builders[user_id] -= 1
+        if not self._builders[user_id]:
+            del self._builders[user_id]
+            del self._changes[user_id]
+        return changes
+
+    @staticmethod
+    def _replay(index: UserNotesIndex, changes: List[Change]) -> bool:
+        """Reaplica as alterações; False se o índice foi invalidado."""
+        for kind, value in changes:
+            if kind == "invalidate":
+                return False
+            if kind == "upsert":
+                index.add(
+                    str(value["id"]),
+                    value.get("title") or "",
+                    value.get("content") or "",
+                )
+            else:
+                index.remove(value)
+        return True
+
+    def _install(self, user_id: str, index: UserNotesIndex) -> None:
+        self._users[user_id] = index
+        self._size += index.size
+        for note_id in index.notes:
+            self._owners[note_id] = user_id
+        self._evict(keep=user_id)
+
+    def search(
+        self, user_id: str, query: str, limit: int = 20
+    ) -> List[Dict[str, object]]:
+        """Busca nas notas do usuário, construindo o índice se preciso."""
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is not None:
+                self._users.move_to_end(user_id)
+                results = index.search(query, limit)
+            else:
+                self._begin_build(user_id)
+        if index is None:
+            # A carga vai ao banco: feita fora do lock para não travar os demais
+            try:
+                built = self._build(user_id)
+            finally:
+                with self._lock:
+                    changes = list(self._end_build(user_id))
+            with self._lock:
+                index = self._users.get(user_id)
+                if index is None:
+                    index = built
+                    # Invalidado durante a carga: responde, mas não guarda
+                    if self._replay(built, changes):
+                        self._install(user_id, built)
+                results = index.search(query, limit)
+        return [
+            {
+                "id": note.id,
+                "title": note.title,
+                "snippet": note.snippet,
+                "score": score,
+            }
+            for note, score in results
+        ]
+
+    def upsert(self, user_id: str, note: Dict[str, str]) -> None:
+        """Atualiza uma nota, se o índice do usuário estiver carregado."""
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                if user_id in self._changes:
+                    self._changes[user_id].append(("upsert", dict(note)))
+                return
+            note_id = str(note["id"])
+            before = index.size
+            index.add(note_id, note.get("title") or "", note.get("content") or "")
+            self._owners[note_id] = user_id
+            self._size += index.size - before
+            self._evict(keep=user_id)
+
+    def remove(self, note_id: str) -> None:
+        """Remove uma nota do índice do seu dono, se carregado."""
+        with self._lock:
+            # O dono não é conhecido: vale para todo índice em construção
+            for changes in self._changes.values():
+                changes.append(("remove", note_id))
+            user_id = self._owners.pop(note_id, None)
+            index = self._users.get(user_id) if user_id else None
+            if index is None:
+                return
+            before = index.size
+            index.remove(note_id)
+            self._size += index.size - before
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Descarta o índice de um usuário, ou de todos."""
+        with self._lock:
+            for user in [user_id] if user_id else list(self._changes):
+                if user in self._changes:
+                    self._changes[user].append(("invalidate", None))
+            users: Set[str] = {user_id} if user_id else set(self._users)
+            for user in users:
+                index = self._users.get(user)
+                if index is not None:
+                    self._drop(user, index)
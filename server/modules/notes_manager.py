@@ -1,23 +1,56 @@
 """Gerenciador de notas usando Supabase."""
 
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 from supabase import Client
 from server.config.supabase import get_supabase_client
+from server.config.settings import NOTES_INDEX_ENABLED, NOTES_INDEX_MAX_BYTES
+from server.modules.notes_index import NotesIndex
 import logging
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from server.langchain_components.retriever import DocumentRetriever
+
 logger = logging.getLogger(__name__)
 
+# Configuração de texto usada pela coluna `search_vector` (migração 05)
+SEARCH_CONFIG = "portuguese"
+SEARCH_PAGE_SIZE = 20
+# Linhas por requisição ao carregar as notas de um usuário para o índice local
+INDEX_LOAD_PAGE_SIZE = 1000
+
 
 class NotesManager:
     """Gerencia operações de notas usando Supabase."""
 
-    def __init__(self) -> None:
-        """Inicializa o gerenciador de notas."""
+    def __init__(
+        self,
+        index: Optional[NotesIndex] = None,
+        chunks: Optional["DocumentRetriever"] = None,
+    ) -> None:
+        # Índice local opcional para a busca enquanto se digita
+        if index is None and NOTES_INDEX_ENABLED:
+            index = NotesIndex(self._load_user_notes, max_bytes=NOTES_INDEX_MAX_BYTES)
+        self.index = index
+        # Índice vetorial opcional por chunks
+        self.chunks = chunks
+
+    def _sync_chunks(self, note: Dict[str, Any]) -> None:
+        if self.chunks is None:
+            return
+        result = self.chunks.index_note_chunks(
+            note["user_id"], str(note["id"]), note.get("content") or ""
+        )
+        if not result["success"]:
+            logger.error(f"Erro ao indexar chunks da nota: {result['error']}")
+
+    @property
+    def client(self) -> Client:
+        """Cliente Supabase compartilhado do processo."""
         client = get_supabase_client()
         if not client:
             raise RuntimeError("Não foi possível inicializar o cliente Supabase")
-        self.client: Client = client
+        return client
 
     def create_note(
         self, user_id: str, content: str, title: Optional[str] = None
@@ -40,6 +73,9 @@ class NotesManager:
                 "title": title if title else "",
             }
             response = self.client.table("notes").insert(data).execute()
+            if self.index:
+                self.index.upsert(user_id, response.data[0])
+            self._sync_chunks(response.data[0])
             return {"success": True, "note": response.data[0]}
         except Exception as e:
             logger.error(f"Erro ao criar nota: {str(e)}")
@@ -61,7 +97,11 @@ class NotesManager:
             response = (
                 self.client.table("notes").update(data).eq("id", note_id).execute()
             )
-            return {"success": True, "note": response.data[0]}
+            note = response.data[0]
+            if self.index:
+                self.index.upsert(note["user_id"], note)
+            self._sync_chunks(note)
+            return {"success": True, "note": note}
         except Exception as e:
             logger.error(f"Erro ao atualizar nota: {str(e)}")
             return {"success": False, "error": str(e)}
@@ -77,7 +117,11 @@ class NotesManager:
             Dict[str, Any]: Status da operação
         """
         try:
-            self.client.table("notes").delete().eq("id", note_id).execute()
+            response = self.client.table("notes").delete().eq("id", note_id).execute()
+            if self.index:
+                self.index.remove(note_id)
+            if self.chunks is not None and response.data:
+                self.chunks.remove_note_chunks(response.data[0]["user_id"], note_id)
             return {"success": True, "message": "Nota deletada com sucesso"}
         except Exception as e:
             logger.error(f"Erro ao deletar nota: {str(e)}")
@@ -96,19 +140,100 @@ class NotesManager:
         """
         try:
             if query:
-                # Usando ilike para busca case-insensitive
+                # Busca textual servida pelo índice GIN de `search_vector`
                 response = (
                     self.client.table("notes")
                     .select("*")
-                    .ilike("content", f"%{query}%")
+                    .text_search(
+                        "search_vector",
+                        query,
+                        options={"config": SEARCH_CONFIG, "type": "web_search"},
+                    )
                     .execute()
                 )
             else:
                 response = self.client.table("notes").select("*").execute()
 
             # Converte os resultados para dicionários
-            notes = [dict(note) for note in response.data]  # type: ignore
+            notes = [dict(note) for note in response.data]
             return notes
         except Exception as e:
             logger.error(f"Erro ao buscar notas: {str(e)}")
             return []
+
+    def search_notes(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = SEARCH_PAGE_SIZE,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca textual ranqueada nas notas do usuário.
+
+        Args:
+            user_id: ID do usuário
+            query: Termos de busca (aceita "frase", OR e -exclusão)
+            limit: Tamanho da página
+            offset: Quantidade de resultados a pular
+
+        Returns:
+            List[Dict[str, Any]]: Notas ordenadas por relevância, com `rank` e
+                                 `snippet` (trecho com os termos em <mark>).
+                                 Retorna lista vazia em caso de erro.
+        """
+        if not query.strip():
+            return []
+        try:
+            response = self.client.rpc(
+                "search_notes",
+                {
+                    "p_user_id": user_id,
+                    "p_query": query,
+                    "p_limit": limit,
+                    "p_offset": offset,
+                },
+            ).execute()
+            return [dict(note) for note in response.data]
+        except Exception as e:
+            logger.error(f"Erro ao buscar notas: {str(e)}")
+            return []
+
+    def _load_user_notes(self, user_id: str) -> List[Dict[str, Any]]:
+        """Carrega todas as notas do usuário para o índice local."""
+        notes: List[Dict[str, Any]] = []
+        while True:
+            response = (
+                self.client.table("notes")
+                .select("id,title,content")
+                .eq("user_id", user_id)
+                .order("id")
+                .range(len(notes), len(notes) + INDEX_LOAD_PAGE_SIZE - 1)
+                .execute()
+            )
+            notes.extend(response.data)
+            if len(response.data) < INDEX_LOAD_PAGE_SIZE:
+                return notes
+
+    def quick_search(
+        self, user_id: str, query: str, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca instantânea para o type-ahead, pelo índice local.
+
+        Args:
+            user_id: ID do usuário
+            query: Texto digitado até agora (o último termo vale como prefixo)
+            limit: Quantidade máxima de resultados
+
+        Returns:
+            List[Dict[str, Any]]: Notas com `id`, `title`, `snippet` e `score`.
+                                 Sem índice local, usa `search_notes`.
+        """
+        if not self.index:
+            return self.search_notes(user_id, query, limit=limit)
+        try:
+            return self.index.search(user_id, query, limit)
+        except Exception as e:
+            logger.error(f"Erro na busca local de notas: {str(e)}")
+            return []
@@ -1,28 +1,49 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
+from contextlib import aclosing
+from typing import Any, AsyncIterator, List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from models.conversation import Conversation, ConversationCreate
+from services.ai import astream_chat_message
 from services.ai_service import AIService
+from routes.api.pagination import PageParams, paginate
+from routes.auth.dependencies import get_current_user_id
 
 router = APIRouter()
 service = AIService()
 
 
 @router.get("/conversations", response_model=List[Conversation])
-async def list_conversations() -> List[Conversation]:
-    return await service.list_conversations()
+async def list_conversations(
+    response: Response,
+    page: PageParams = Depends(),
+    user_id: str = Depends(get_current_user_id),
+) -> Any:
+    return await paginate(
+        response,
+        page,
+        service.list_conversations,
+        service.list_conversation_fields,
+        user_id=user_id,
+    )
 
 
 @router.get("/conversations/{conversation_id}", response_model=Conversation)
-async def get_conversation(conversation_id: str) -> Conversation:
-    conversation = await service.get_conversation(conversation_id)
+async def get_conversation(
+    conversation_id: str, user_id: str = Depends(get_current_user_id)
+) -> Conversation:
+    conversation = await service.get_conversation(conversation_id, user_id=user_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return conversation
 
 
 @router.post("/conversations", response_model=Conversation)
-async def create_conversation(conversation: ConversationCreate) -> Conversation:
-    result = await service.create_conversation(conversation.model_dump())
+async def create_conversation(
+    conversation: ConversationCreate, user_id: str = Depends(get_current_user_id)
+) -> Conversation:
+    result = await service.create_conversation(
+        conversation.model_dump(), user_id=user_id
+    )
     if not result:
         raise HTTPException(status_code=400, detail="Could not create conversation")
     return result
@@ -30,10 +51,12 @@ async def create_conversation(conversation: ConversationCreate) -> Conversation:
 
 @router.put("/conversations/{conversation_id}", response_model=Conversation)
 async def update_conversation(
-    conversation_id: str, conversation: ConversationCreate
+    conversation_id: str,
+    conversation: ConversationCreate,
+    user_id: str = Depends(get_current_user_id),
 ) -> Conversation:
     result = await service.update_conversation(
-        conversation_id, conversation.model_dump()
+        conversation_id, conversation.model_dump(), user_id=user_id
     )
     if not result:
         raise HTTPException(status_code=404, detail="Conversation not found")
@@ -41,7 +64,37 @@ async def update_conversation(
 
 
 @router.delete("/conversations/{conversation_id}")
-async def delete_conversation(conversation_id: str) -> bool:
-    if not await service.delete_conversation(conversation_id):
+async def delete_conversation(
+    conversation_id: str, user_id: str = Depends(get_current_user_id)
+) -> bool:
+    if not await service.delete_conversation(conversation_id, user_id=user_id):
         raise HTTPException(status_code=404, detail="Conversation not found")
     return True
+
+
+@router.post("/chat/stream")
+async def stream_chat(
+    conversation: ConversationCreate,
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+) -> StreamingResponse:
+    """Resposta do chat em Server-Sent Events, pedaço a pedaço."""
+
+    async def events() -> AsyncIterator[str]:
+        # aclosing fecha o stream do modelo assim que o cliente sai
+        stream = astream_chat_message(
+            conversation.message,
+            user_id=user_id,
+            session_id=conversation.metadata.get("session_id"),
+        )
+        async with aclosing(stream):
+            async for event in stream:
+                if await request.is_disconnected():
+                    break
+                yield event
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
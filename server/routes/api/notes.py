@@ -1,43 +1,67 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
-from models.note import Note, NoteCreate, NoteUpdate
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from models.note import Note, NoteBatch, NoteCreate, NoteUpdate
+from models.batch import BatchResponse
 from services.note_service import NoteService
+from routes.api.pagination import PageParams, paginate
+from routes.auth.dependencies import get_current_user_id
 
 router = APIRouter()
 service = NoteService()
 
 
 @router.get("/notes", response_model=List[Note])
-async def list_notes() -> List[Note]:
-    return await service.list_notes()
+async def list_notes(
+    response: Response,
+    page: PageParams = Depends(),
+    user_id: str = Depends(get_current_user_id),
+) -> Any:
+    return await paginate(
+        response, page, service.list_notes, service.list_note_fields, user_id=user_id
+    )
 
 
 @router.get("/notes/{note_id}", response_model=Note)
-async def get_note(note_id: str) -> Note:
-    note = await service.get_note(note_id)
+async def get_note(note_id: str, user_id: str = Depends(get_current_user_id)) -> Note:
+    note = await service.get_note(note_id, user_id=user_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
 
 @router.post("/notes", response_model=Note)
-async def create_note(note: NoteCreate) -> Note:
-    result = await service.create_note(note.model_dump())
+async def create_note(
+    note: NoteCreate, user_id: str = Depends(get_current_user_id)
+) -> Note:
+    result = await service.create_note(note.model_dump(), user_id=user_id)
     if not result:
         raise HTTPException(status_code=400, detail="Could not create note")
     return result
 
 
+@router.post("/notes:batch", response_model=BatchResponse)
+async def batch_notes(
+    batch: NoteBatch, user_id: str = Depends(get_current_user_id)
+) -> BatchResponse:
+    return await service.batch_notes(batch, user_id=user_id)
+
+
 @router.put("/notes/{note_id}", response_model=Note)
-async def update_note(note_id: str, note: NoteUpdate) -> Note:
-    result = await service.update_note(note_id, note.model_dump(exclude_unset=True))
+async def update_note(
+    note_id: str, note: NoteUpdate, user_id: str = Depends(get_current_user_id)
+) -> Note:
+    result = await service.update_note(
+        note_id, note.model_dump(exclude_unset=True), user_id=user_id
+    )
     if not result:
         raise HTTPException(status_code=404, detail="Note not found")
     return result
 
 
 @router.delete("/notes/{note_id}")
-async def delete_note(note_id: str) -> bool:
-    if not await service.delete_note(note_id):
+async def delete_note(
+    note_id: str, user_id: str = Depends(get_current_user_id)
+) -> bool:
+    if not await service.delete_note(note_id, user_id=user_id):
         raise HTTPException(status_code=404, detail="Note not found")
     return True
@@ -0,0 +1,73 @@
+"""Utilitários de paginação por cursor para as rotas da API."""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from config.database import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, next_cursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Parâmetros `limit`/`cursor`/`fields` comuns às listagens."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None),
+        fields: Optional[str] = Query(
+            None, description="Colunas separadas por vírgula, ex.: id,title"
+        ),
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = (
+            [field.strip() for field in fields.split(",") if field.strip()]
+            if fields
+            else None
+        )
+
+
+async def paginate(
+    response: Response,
+    page: PageParams,
+    fetch: Callable[..., Awaitable[Sequence[Any]]],
+    fetch_fields: Callable[..., Awaitable[List[Dict[str, Any]]]],
+    query: Optional[Dict[str, Any]] = None,
+    user_id: Optional[str] = None,
+) -> Any:
+    """
+    Executa a listagem paginada e expõe o próximo cursor no cabeçalho.
+
+    Com `fields`, as linhas projetadas são devolvidas diretamente, sem
+    validação pelo `response_model` completo. Com `user_id`, só as linhas
+    do usuário são listadas.
+    """
+    try:
+        if page.fields:
+            rows = await fetch_fields(
+                page.fields,
+                query,
+                limit=page.limit,
+                cursor=page.cursor,
+                user_id=user_id,
+            )
+            headers: Dict[str, str] = {}
+            cursor = next_cursor(rows, page.limit)
+            if cursor:
+                headers[NEXT_CURSOR_HEADER] = cursor
+            return JSONResponse(content=jsonable_encoder(rows), headers=headers)
+
+        items = await fetch(
+            query, limit=page.limit, cursor=page.cursor, user_id=user_id
+        )
+    except ValueError as e:
+        # Inclui InvalidCursorError e campos/filtros inválidos
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cursor = next_cursor(items, page.limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return items
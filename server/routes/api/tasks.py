@@ -1,43 +1,86 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
-from models.task import Task, TaskCreate, TaskUpdate
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from models.task import (
+    Task,
+    TaskBatch,
+    TaskCreate,
+    TaskUpdate,
+    TaskStatus,
+    TaskPriority,
+)
+from models.batch import BatchResponse
 from services.task_service import TaskService
+from routes.api.pagination import PageParams, paginate
+from routes.auth.dependencies import get_current_user_id
 
 router = APIRouter()
 service = TaskService()
 
 
 @router.get("/tasks", response_model=List[Task])
-async def list_tasks() -> List[Task]:
-    return await service.list_tasks()
+async def list_tasks(
+    response: Response,
+    page: PageParams = Depends(),
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    user_id: str = Depends(get_current_user_id),
+) -> Any:
+    query = {
+        key: value.value
+        for key, value in {"status": status, "priority": priority}.items()
+        if value is not None
+    }
+    return await paginate(
+        response,
+        page,
+        service.list_tasks,
+        service.list_task_fields,
+        query,
+        user_id=user_id,
+    )
 
 
 @router.get("/tasks/{task_id}", response_model=Task)
-async def get_task(task_id: str) -> Task:
-    task = await service.get_task(task_id)
+async def get_task(task_id: str, user_id: str = Depends(get_current_user_id)) -> Task:
+    task = await service.get_task(task_id, user_id=user_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
 @router.post("/tasks", response_model=Task)
-async def create_task(task: TaskCreate) -> Task:
-    result = await service.create_task(task.model_dump())
+async def create_task(
+    task: TaskCreate, user_id: str = Depends(get_current_user_id)
+) -> Task:
+    result = await service.create_task(task.model_dump(), user_id=user_id)
     if not result:
         raise HTTPException(status_code=400, detail="Could not create task")
     return result
 
 
+@router.post("/tasks:batch", response_model=BatchResponse)
+async def batch_tasks(
+    batch: TaskBatch, user_id: str = Depends(get_current_user_id)
+) -> BatchResponse:
+    return await service.batch_tasks(batch, user_id=user_id)
+
+
 @router.put("/tasks/{task_id}", response_model=Task)
-async def update_task(task_id: str, task: TaskUpdate) -> Task:
-    result = await service.update_task(task_id, task.model_dump(exclude_unset=True))
+async def update_task(
+    task_id: str, task: TaskUpdate, user_id: str = Depends(get_current_user_id)
+) -> Task:
+    result = await service.update_task(
+        task_id, task.model_dump(exclude_unset=True), user_id=user_id
+    )
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
     return result
 
 
 @router.delete("/tasks/{task_id}")
-async def delete_task(task_id: str) -> bool:
-    if not await service.delete_task(task_id):
+async def delete_task(
+    task_id: str, user_id: str = Depends(get_current_user_id)
+) -> bool:
+    if not await service.delete_task(task_id, user_id=user_id):
         raise HTTPException(status_code=404, detail="Task not found")
     return True
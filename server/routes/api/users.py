@@ -1,19 +1,27 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Response
 from models.user import UserProfile, UserProfileCreate, UserProfileUpdate
 from services.user_service import UserService
+from routes.api.pagination import PageParams, paginate
+from routes.auth.dependencies import get_current_user_id
 
 router = APIRouter()
 service = UserService()
 
 
 @router.get("/profiles", response_model=List[UserProfile])
-async def list_profiles() -> List[UserProfile]:
-    return await service.list_users()
+async def list_profiles(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user_id: str = Depends(get_current_user_id),
+) -> Any:
+    return await paginate(response, page, service.list_users, service.list_user_fields)
 
 
 @router.get("/profiles/{user_id}", response_model=UserProfile)
-async def get_profile(user_id: str) -> UserProfile:
+async def get_profile(
+    user_id: str, current_user_id: str = Depends(get_current_user_id)
+) -> UserProfile:
     profile = await service.get_user(user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -21,7 +29,9 @@ async def get_profile(user_id: str) -> UserProfile:
 
 
 @router.post("/profiles", response_model=UserProfile)
-async def create_profile(profile: UserProfileCreate) -> UserProfile:
+async def create_profile(
+    profile: UserProfileCreate, current_user_id: str = Depends(get_current_user_id)
+) -> UserProfile:
     result = await service.create_user(profile.model_dump())
     if not result:
         raise HTTPException(status_code=400, detail="Could not create profile")
@@ -29,7 +39,13 @@ async def create_profile(profile: UserProfileCreate) -> UserProfile:
 
 
 @router.put("/profiles/{user_id}", response_model=UserProfile)
-async def update_profile(user_id: str, profile: UserProfileUpdate) -> UserProfile:
+async def update_profile(
+    user_id: str,
+    profile: UserProfileUpdate,
+    current_user_id: str = Depends(get_current_user_id),
+) -> UserProfile:
+    if user_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Cannot modify another profile")
     result = await service.update_user(user_id, profile.model_dump(exclude_unset=True))
     if not result:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -37,7 +53,11 @@ async def update_profile(user_id: str, profile: UserProfileUpdate) -> UserProfil
 
 
 @router.delete("/profiles/{user_id}")
-async def delete_profile(user_id: str) -> bool:
+async def delete_profile(
+    user_id: str, current_user_id: str = Depends(get_current_user_id)
+) -> bool:
+    if user_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Cannot delete another profile")
     if not await service.delete_user(user_id):
         raise HTTPException(status_code=404, detail="Profile not found")
     return True
@@ -1,8 +1,20 @@
+from dataclasses import asdict
 from flask import Blueprint, jsonify, Response
+from server.config.supabase import get_pool_stats
 
 api_v1_bp = Blueprint("api_v1", __name__)
 
 
 @api_v1_bp.route("/status")
 def status() -> tuple[Response, int]:
-    return jsonify({"status": "online", "version": "1.0.0"}), 200
+    pool = get_pool_stats()
+    return (
+        jsonify(
+            {
+                "status": "online",
+                "version": "1.0.0",
+                "supabase_pool": asdict(pool) if pool else None,
+            }
+        ),
+        200,
+    )
@@ -0,0 +1,29 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from server.routes.auth import require_auth
+from server.services.ai import stream_chat_message
+
+chat_bp = Blueprint("chat", __name__)
+
+
+@chat_bp.route("/chat/stream", methods=["POST"])
+@require_auth
+def stream_chat() -> Response | tuple[Response, int]:
+    """Resposta do chat em Server-Sent Events, pedaço a pedaço"""
+    data = request.get_json(silent=True) or {}
+    message = data.get("message")
+
+    if not message:
+        return jsonify({"error": "Mensagem não fornecida"}), 400
+
+    # Ao desconectar, o servidor fecha o gerador e a geração no modelo para
+    return Response(
+        stream_with_context(
+            stream_chat_message(
+                message,
+                user_id=request.user_id,  # type: ignore
+                session_id=data.get("session_id"),
+            )
+        ),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,19 @@
+from typing import Optional
 from flask import Blueprint, request, jsonify, Response
+from server.config.settings import OPENAI_API_KEY
 from server.routes.auth import require_auth
+from server.langchain_components.hybrid_retriever import HybridRetriever
+from server.langchain_components.retriever import DocumentRetriever
 from server.modules.notes_manager import NotesManager
 
 notes_bp = Blueprint("notes", __name__)
-notes_manager = NotesManager()
+# Índice vetorial por chunks, mantido em dia pelo NotesManager; só com
+# chave de embeddings configurada
+retriever = DocumentRetriever(OPENAI_API_KEY) if OPENAI_API_KEY else None
+notes_manager = NotesManager(chunks=retriever)
+hybrid: Optional[HybridRetriever] = (
+    HybridRetriever.for_notes(notes_manager, retriever) if retriever else None
+)
 
 
 @notes_bp.route("/notes", methods=["POST"])
@@ -22,6 +32,70 @@ def create_note() -> tuple[Response, int]:
     return jsonify(result), 500
 
 
+@notes_bp.route("/notes/search", methods=["GET"])
+@require_auth
+def search_notes() -> tuple[Response, int]:
+    """Busca notas do usuário por relevância"""
+    query = request.args.get("q", "")
+    if not query.strip():
+        return jsonify({"error": "Termo de busca não fornecido"}), 400
+
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    notes = notes_manager.search_notes(
+        request.user_id, query, limit=limit, offset=offset  # type: ignore
+    )
+    return (
+        jsonify(
+            {
+                "success": True,
+                "data": notes,
+                "next_offset": offset + limit if len(notes) == limit else None,
+            }
+        ),
+        200,
+    )
+
+
+@notes_bp.route("/notes/search/hybrid", methods=["GET"])
+@require_auth
+def hybrid_search_notes() -> tuple[Response, int]:
+    """Busca notas do usuário por texto e por significado ao mesmo tempo"""
+    query = request.args.get("q", "")
+    if not query.strip():
+        return jsonify({"error": "Termo de busca não fornecido"}), 400
+
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    if hybrid is None:
+        notes = notes_manager.quick_search(
+            request.user_id, query, limit  # type: ignore
+        )
+        return (
+            jsonify({"success": True, "data": notes, "sources": {"lexical": "ok"}}),
+            200,
+        )
+
+    result = hybrid.search(request.user_id, query, limit=limit)  # type: ignore
+    if not result["success"]:
+        return jsonify(result), 503
+    return (
+        jsonify(
+            {"success": True, "data": result["results"], "sources": result["sources"]}
+        ),
+        200,
+    )
+
+
+@notes_bp.route("/notes/suggest", methods=["GET"])
+@require_auth
+def suggest_notes() -> tuple[Response, int]:
+    """Sugestões de notas enquanto o usuário digita"""
+    query = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    notes = notes_manager.quick_search(request.user_id, query, limit)  # type: ignore
+    return jsonify({"success": True, "data": notes}), 200
+
+
 @notes_bp.route("/notes/<note_id>", methods=["GET"])
 @require_auth
 def get_note(note_id: str) -> tuple[Response, int]:
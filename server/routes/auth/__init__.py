@@ -1,5 +1,6 @@
 from .clerk import auth_bp
 from .decorators import require_auth
+from .dependencies import get_current_user_id
 from flask import request
 from typing import Optional
 
@@ -9,4 +10,4 @@ def get_current_user() -> Optional[str]:
     return getattr(request, "user_id", None)
 
 
-__all__ = ["auth_bp", "require_auth", "get_current_user"]
+__all__ = ["auth_bp", "require_auth", "get_current_user", "get_current_user_id"]
@@ -1,25 +1,47 @@
 from flask import Blueprint, jsonify, request, Response
-from server.database import supabase
+from server.config.supabase import registry
 from datetime import datetime
 from typing import Dict, Any
 import os
 import jwt
-import requests
+from postgrest.types import ReturnMethod
+from server.utils.cache import LRUCache
+from .jwks import key_store
+from .tokens import decode_token, extract_token
 
 auth_bp = Blueprint("auth", __name__)
 
 # Configuração do Clerk
-CLERK_JWT_KEY = os.getenv("CLERK_JWT_KEY")
 CLERK_API_KEY = os.getenv("CLERK_API_KEY")
-CLERK_FRONTEND_API = os.getenv("CLERK_FRONTEND_API")
+
+# Usuários já gravados no Supabase por este processo
+KNOWN_USERS_TTL = float(os.getenv("CLERK_KNOWN_USERS_TTL", "3600"))
+KNOWN_USERS_MAX_ENTRIES = int(os.getenv("CLERK_KNOWN_USERS_MAX_ENTRIES", "10000"))
+_known_users = LRUCache(max_entries=KNOWN_USERS_MAX_ENTRIES, ttl=KNOWN_USERS_TTL)
 
 
 def get_jwks() -> Dict[str, Any]:
-    """Busca as chaves públicas do Clerk"""
-    url = f"https://{CLERK_FRONTEND_API}/.well-known/jwks.json"
-    response = requests.get(url)
-    result: Dict[str, Any] = response.json()
-    return result
+    """Retorna as chaves públicas do Clerk, mantidas em cache"""
+    return key_store.jwks
+
+
+def ensure_user(claims: Dict[str, Any]) -> None:
+    """Cria o usuário no Supabase se ainda não existir, em uma só requisição"""
+    user_data = {
+        "id": claims.get("sub"),
+        "email": claims.get("email"),
+        "name": claims.get("name", ""),
+        "created_at": datetime.utcnow().isoformat(),
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    # Com ignore_duplicates, um usuário existente não é alterado
+    registry.get_client().table("users").upsert(
+        user_data,
+        on_conflict="id",
+        ignore_duplicates=True,
+        returning=ReturnMethod.minimal,
+    ).execute()
+    _known_users.set(user_data["id"], True)
 
 
 @auth_bp.route("/verify", methods=["POST"])
@@ -30,35 +52,13 @@ def verify_token() -> tuple[Response, int] | Response:
         return jsonify({"message": "Token não fornecido"}), 401
 
     try:
-        # Remover o prefixo 'Bearer ' se presente
-        if auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-        else:
-            token = auth_header
-
         # Verificar o token com a chave pública do Clerk
-        decoded = jwt.decode(
-            token,
-            CLERK_JWT_KEY,
-            algorithms=["RS256"],
-            audience="your-audience",  # Configure conforme sua aplicação Clerk
-            issuer=f"https://{CLERK_FRONTEND_API}",
-        )
+        decoded = decode_token(extract_token(auth_header))
 
-        # Buscar ou criar usuário no Supabase
+        # Criar o usuário no Supabase apenas na primeira verificação
         user_id = decoded.get("sub")
-        response = supabase.table("users").select("*").eq("id", user_id).execute()
-
-        if not response.data:
-            # Criar novo usuário
-            user_data = {
-                "id": user_id,
-                "email": decoded.get("email"),
-                "name": decoded.get("name", ""),
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
-            }
-            supabase.table("users").insert(user_data).execute()
+        if user_id not in _known_users:
+            ensure_user(decoded)
 
         return jsonify({"message": "Token válido", "user_id": user_id})
     except jwt.ExpiredSignatureError:
@@ -75,24 +75,14 @@ def get_user() -> tuple[Response, int] | Response:
         return jsonify({"message": "Token não fornecido"}), 401
 
     try:
-        # Remover o prefixo 'Bearer ' se presente
-        if auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-        else:
-            token = auth_header
-
         # Verificar o token com a chave pública do Clerk
-        decoded = jwt.decode(
-            token,
-            CLERK_JWT_KEY,
-            algorithms=["RS256"],
-            audience="your-audience",  # Configure conforme sua aplicação Clerk
-            issuer=f"https://{CLERK_FRONTEND_API}",
-        )
+        decoded = decode_token(extract_token(auth_header))
 
         # Buscar usuário no Supabase
         user_id = decoded.get("sub")
-        response = supabase.table("users").select("*").eq("id", user_id).execute()
+        response = (
+            registry.get_client().table("users").select("*").eq("id", user_id).execute()
+        )
 
         if not response.data:
             return jsonify({"message": "Usuário não encontrado"}), 404
@@ -2,12 +2,8 @@ from functools import wraps
 from typing import Any, Union, cast
 from flask import request, jsonify, Response
 from .types import AuthenticatedFunction
+from .tokens import decode_token, extract_token
 import jwt
-import os
-
-# Configuração do Clerk
-CLERK_JWT_KEY = os.getenv("CLERK_JWT_KEY")
-CLERK_FRONTEND_API = os.getenv("CLERK_FRONTEND_API")
 
 
 def require_auth(f: AuthenticatedFunction) -> AuthenticatedFunction:
@@ -20,20 +16,8 @@ def require_auth(f: AuthenticatedFunction) -> AuthenticatedFunction:
             return jsonify({"message": "Token não fornecido"}), 401
 
         try:
-            # Remover o prefixo 'Bearer ' se presente
-            if auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-            else:
-                token = auth_header
-
             # Verificar o token com a chave pública do Clerk
-            decoded = jwt.decode(
-                token,
-                CLERK_JWT_KEY,
-                algorithms=["RS256"],
-                audience="your-audience",  # Configure conforme sua aplicação Clerk
-                issuer=f"https://{CLERK_FRONTEND_API}",
-            )
+            decoded = decode_token(extract_token(auth_header))
 
             # Adicionar o user_id ao request para uso nas rotas
             request.user_id = decoded.get("sub")  # type: ignore
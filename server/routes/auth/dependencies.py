@@ -0,0 +1,35 @@
+"""Autenticação do Clerk como dependência das rotas FastAPI."""
+
+from typing import Optional
+
+import jwt
+from fastapi import Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from .tokens import cached_claims, decode_token, extract_token
+
+
+async def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """
+    Valida o token do cabeçalho Authorization e retorna o `sub` do usuário.
+
+    Tokens já verificados saem do cache sem sair do event loop; a primeira
+    verificação (RS256 e, se preciso, busca do JWKS) roda no threadpool.
+    """
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Token not provided")
+
+    token = extract_token(authorization)
+    try:
+        claims = cached_claims(token)
+        if claims is None:
+            claims = await run_in_threadpool(decode_token, token)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user_id = claims.get("sub")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return str(user_id)
@@ -0,0 +1,143 @@
+"""Armazenamento das chaves públicas (JWKS) do Clerk."""
+
+from typing import Any, Callable, Dict, Optional
+import logging
+import os
+import threading
+import time
+
+import jwt
+import requests
+
+logger = logging.getLogger(__name__)
+
+CLERK_FRONTEND_API = os.getenv("CLERK_FRONTEND_API")
+JWKS_REFRESH_INTERVAL = float(os.getenv("CLERK_JWKS_REFRESH_INTERVAL", "3600"))
+JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("CLERK_JWKS_MIN_REFRESH_INTERVAL", "30"))
+JWKS_TIMEOUT = float(os.getenv("CLERK_JWKS_TIMEOUT", "5"))
+
+
+def _fetch_jwks(url: str) -> Dict[str, Any]:
+    response = requests.get(url, timeout=JWKS_TIMEOUT)
+    response.raise_for_status()
+    result: Dict[str, Any] = response.json()
+    return result
+
+
+class JWKSKeyStore:
+    """
+    Chaves públicas do Clerk indexadas por `kid`.
+
+    As chaves são atualizadas em segundo plano a cada `refresh_interval`.
+    Um `kid` desconhecido força uma atualização imediata (limitada a uma a
+    cada `min_refresh_interval`), cobrindo a rotação de chaves. Se a busca
+    falhar, as chaves já conhecidas continuam valendo.
+
+    A busca roda fora do lock e só a troca das chaves é feita com ele; uma
+    atualização pedida durante outra espera o resultado da que já está em
+    andamento, em vez de buscar de novo.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_interval: float = JWKS_REFRESH_INTERVAL,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL,
+        fetch: Callable[[str], Dict[str, Any]] = _fetch_jwks,
+    ) -> None:
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self._fetch = fetch
+        self._keys: Dict[str, Any] = {}
+        self._jwks: Dict[str, Any] = {"keys": []}
+        self._last_attempt = 0.0
+        self._in_flight: Optional[threading.Event] = None
+        self._last_result = False
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def jwks(self) -> Dict[str, Any]:
+        """Último documento JWKS obtido com sucesso."""
+        self._ensure_started()
+        return self._jwks
+
+    def refresh(self) -> bool:
+        """Busca o JWKS; mantém as chaves atuais em caso de falha."""
+        with self._lock:
+            running = self._in_flight
+            if running is None:
+                done = self._in_flight = threading.Event()
+                self._last_attempt = time.monotonic()
+        if running is not None:
+            running.wait(JWKS_TIMEOUT)
+            return self._last_result
+        result = False
+        try:
+            result = self._refresh()
+            return result
+        finally:
+            with self._lock:
+                self._last_result = result
+                self._in_flight = None
+            done.set()
+
+    def _refresh(self) -> bool:
+        try:
+            jwks = self._fetch(self.url)
+            keys = {
+                jwk["kid"]: jwt.PyJWK(jwk).key
+                for jwk in jwks.get("keys", [])
+                if jwk.get("kid")
+            }
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar JWKS do Clerk: {str(e)}")
+            return False
+        if not keys:
+            logger.warning("JWKS do Clerk sem chaves; mantendo as anteriores")
+            return False
+        with self._lock:
+            self._keys = keys
+            self._jwks = jwks
+        return True
+
+    def get_key(self, kid: Optional[str]) -> Any:
+        """Retorna a chave pública para o `kid` do cabeçalho do token."""
+        self._ensure_started()
+        if not kid:
+            raise jwt.InvalidTokenError("Token sem 'kid'")
+        key = self._keys.get(kid)
+        if key is None and (
+            self._in_flight is not None
+            or time.monotonic() - self._last_attempt >= self.min_refresh_interval
+        ):
+            self.refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Chave de assinatura desconhecida: {kid}")
+        return key
+
+    def _ensure_started(self) -> None:
+        # A thread não sobrevive a um fork: cada worker inicia a sua
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="clerk-jwks-refresh", daemon=True
+            )
+        if not self._keys:
+            self.refresh()
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.refresh_interval)
+            self.refresh()
+
+
+key_store = JWKSKeyStore(f"https://{CLERK_FRONTEND_API}/.well-known/jwks.json")
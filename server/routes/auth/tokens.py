@@ -0,0 +1,86 @@
+"""Verificação dos tokens JWT do Clerk, com cache dos já verificados."""
+
+from typing import Any, Dict, Optional
+import hashlib
+import os
+import time
+
+import jwt
+
+from server.utils.cache import LRUCache
+from .jwks import key_store
+
+# Configuração do Clerk
+CLERK_JWT_KEY = os.getenv("CLERK_JWT_KEY")
+CLERK_FRONTEND_API = os.getenv("CLERK_FRONTEND_API")
+CLERK_AUDIENCE = os.getenv("CLERK_AUDIENCE", "your-audience")
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("CLERK_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# Tokens já verificados, por hash, mantidos até o `exp`
+_verified = LRUCache(max_entries=TOKEN_CACHE_MAX_ENTRIES)
+
+
+def extract_token(auth_header: str) -> str:
+    """Remove o prefixo 'Bearer ' do cabeçalho Authorization, se presente."""
+    if auth_header.startswith("Bearer "):
+        return auth_header.split(" ")[1]
+    return auth_header
+
+
+def _signing_key(token: str) -> Any:
+    # Uma chave fixa configurada dispensa a busca do JWKS
+    if CLERK_JWT_KEY:
+        return CLERK_JWT_KEY
+    return key_store.get_key(jwt.get_unverified_header(token).get("kid"))
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def cached_claims(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Retorna as claims de um token já verificado, sem checar a assinatura.
+
+    Devolve None se o token ainda não foi verificado. Levanta
+    `jwt.ExpiredSignatureError` se ele expirou desde a verificação.
+    """
+    key = _token_key(token)
+    claims: Optional[Dict[str, Any]] = _verified.get(key)
+    if claims is None:
+        return None
+    if claims.get("exp", 0) > time.time():
+        return claims
+    _verified.delete(key)
+    raise jwt.ExpiredSignatureError("Signature has expired")
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Valida o token do Clerk e retorna as claims.
+
+    A verificação RS256 só acontece na primeira vez que o token é visto;
+    depois as claims vêm do cache até o `exp`. Levanta as mesmas exceções
+    de `jwt.decode`.
+    """
+    claims = cached_claims(token)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(
+        token,
+        _signing_key(token),
+        algorithms=["RS256"],
+        audience=CLERK_AUDIENCE,  # Configure conforme sua aplicação Clerk
+        issuer=f"https://{CLERK_FRONTEND_API}",
+        options={"require": ["exp", "sub"]},
+    )
+    ttl = claims["exp"] - time.time()
+    if ttl > 0:
+        _verified.set(_token_key(token), claims, ttl=ttl)
+    return claims
+
+
+def clear_token_cache() -> None:
+    """Descarta os tokens verificados (ex.: após revogar uma chave)."""
+    _verified.clear()
@@ -1,47 +1,153 @@
+from typing import Any, AsyncIterator, Dict, Generator, Optional
+import asyncio
+import json
+import logging
+
+from server.config.settings import GEMINI_API_KEY
+from server.langchain_components.rate_limiter import RateLimitExceeded
+from server.langchain_components.response_cache import get_response_cache
 from server.modules.agent import KeepAIAgent
 
+logger = logging.getLogger(__name__)
+
 # Instância global do agente
 agent = KeepAIAgent()
+# Identifica as respostas do agente no cache de respostas
+AGENT_MODEL = "keepai-agent"
+
+
+def _error_message(error: Exception) -> str:
+    """Mensagem amigável para um erro do modelo."""
+    error_msg = str(error)
+    if "safety" in error_msg.lower():
+        return (
+            "Desculpe, não posso processar esse tipo de conteúdo "
+            "por questões de segurança. 🚫"
+        )
+    elif (
+        # Recusado pelo limitador local, antes de chegar à API
+        isinstance(error, RateLimitExceeded)
+        or "quota" in error_msg.lower()
+        or "rate" in error_msg.lower()
+    ):
+        return (
+            "Desculpe, estou temporariamente indisponível devido a limites de uso. "
+            "Por favor, tente novamente em alguns minutos. ⏳"
+        )
+    else:
+        return (
+            "Desculpe, ocorreu um erro ao processar sua mensagem. "
+            "Por favor, tente novamente ou reformule sua pergunta. 🔄"
+        )
+
+
+def _used_tools(response: Any) -> bool:
+    """
+    Indica se a execução do agente pode ter chamado alguma ferramenta.
+
+    Sem `intermediate_steps` no resultado não há como saber: conta como sim.
+    """
+    if not isinstance(response, dict) or "intermediate_steps" not in response:
+        return True
+    return bool(response["intermediate_steps"])
 
 
-def process_chat_message(message: str) -> str:
+def process_chat_message(message: str, user_id: str) -> str:
     """
     Processa uma mensagem do usuário usando o agente do LangChain.
 
+    Só entram no cache de respostas (por usuário) execuções que não
+    chamaram ferramentas: as ferramentas leem e alteram dados do usuário,
+    então repetir a resposta sem executá-las seria errado.
+
     Args:
         message: A mensagem do usuário.
+        user_id: ID do usuário (escopo do cache).
 
     Returns:
         A resposta do agente.
     """
+    cache = get_response_cache()
+    cached = cache.get(user_id, AGENT_MODEL, {}, message)
+    if cached is not None:
+        return cached
+
     try:
         # Usa o agente para processar a mensagem
-        response = agent.get_agent().invoke({"input": message})
+        response: Any = agent.get_agent().invoke({"input": message})
 
         # Verifica se a resposta é válida
         if not response or not isinstance(response, (str, dict)):
             raise ValueError("Resposta inválida do agente")
 
+        used_tools = _used_tools(response)
+
         # Extrai a resposta do resultado
         if isinstance(response, dict):
             response = response.get("output", "")
 
+        if not used_tools:
+            cache.set(user_id, AGENT_MODEL, {}, message, str(response))
         return str(response)
 
     except Exception as error:
-        error_msg = str(error)
-        if "safety" in error_msg.lower():
-            return (
-                "Desculpe, não posso processar esse tipo de conteúdo "
-                "por questões de segurança. 🚫"
-            )
-        elif "quota" in error_msg.lower() or "rate" in error_msg.lower():
-            return (
-                "Desculpe, estou temporariamente indisponível devido a limites de uso. "
-                "Por favor, tente novamente em alguns minutos. ⏳"
-            )
-        else:
-            return (
-                "Desculpe, ocorreu um erro ao processar sua mensagem. "
-                "Por favor, tente novamente ou reformule sua pergunta. 🔄"
-            )
+        return _error_message(error)
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Formata um evento Server-Sent Events."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _assistant(
+    assistant: Optional[Any], user_id: Optional[str], session_id: Optional[str]
+) -> Any:
+    if assistant is not None:
+        return assistant
+    from server.langchain_components.chat import ChatAssistant
+    from server.langchain_components.memory import DEFAULT_SESSION
+
+    return ChatAssistant(GEMINI_API_KEY or "", user_id, session_id or DEFAULT_SESSION)
+
+
+def stream_chat_message(
+    message: str,
+    assistant: Optional[Any] = None,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> Generator[str, None, None]:
+    """
+    Gera a resposta do chat como eventos SSE: um evento por pedaço de
+    texto e um evento `done` ao final (ou `error`, com a mensagem amigável).
+
+    Fechar o gerador (cliente desconectado) interrompe a geração no modelo.
+    """
+    try:
+        chat = _assistant(assistant, user_id, session_id)
+        for token in chat.stream_message(message):
+            yield sse_event({"token": token})
+    except Exception as error:
+        logger.error(f"Erro no streaming do chat: {str(error)}")
+        yield sse_event({"error": _error_message(error)}, event="error")
+        return
+    yield sse_event({}, event="done")
+
+
+async def astream_chat_message(
+    message: str,
+    assistant: Optional[Any] = None,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Versão assíncrona de `stream_chat_message`."""
+    try:
+        # Abrir a sessão pode ir ao banco: fora do event loop
+        chat = await asyncio.to_thread(_assistant, assistant, user_id, session_id)
+        async for token in chat.astream_message(message):
+            yield sse_event({"token": token})
+    except Exception as error:
+        logger.error(f"Erro no streaming do chat: {str(error)}")
+        yield sse_event({"error": _error_message(error)}, event="error")
+        return
+    yield sse_event({}, event="done")
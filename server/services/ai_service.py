@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from models.conversation import Conversation
 from config.database import SupabaseWrapper
 
@@ -7,21 +7,48 @@ class AIService:
     def __init__(self) -> None:
         self.db = SupabaseWrapper[Conversation](Conversation, "conversations")
 
-    async def list_conversations(self) -> List[Conversation]:
-        return await self.db.select()
+    async def list_conversations(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Conversation]:
+        return await self.db.select(query, limit=limit, cursor=cursor, user_id=user_id)
 
-    async def get_conversation(self, conversation_id: str) -> Optional[Conversation]:
-        return await self.db.get_by_id(conversation_id)
+    async def list_conversation_fields(
+        self,
+        fields: Sequence[str],
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.db.select_rows(
+            query, fields=fields, limit=limit, cursor=cursor, user_id=user_id
+        )
+
+    async def get_conversation(
+        self, conversation_id: str, user_id: Optional[str] = None
+    ) -> Optional[Conversation]:
+        return await self.db.get_by_id(conversation_id, user_id=user_id)
 
     async def create_conversation(
-        self, conversation_data: Dict[str, Any]
+        self, conversation_data: Dict[str, Any], user_id: Optional[str] = None
     ) -> Optional[Conversation]:
-        return await self.db.insert(conversation_data)
+        return await self.db.insert(conversation_data, user_id=user_id)
 
     async def update_conversation(
-        self, conversation_id: str, conversation_data: Dict[str, Any]
+        self,
+        conversation_id: str,
+        conversation_data: Dict[str, Any],
+        user_id: Optional[str] = None,
     ) -> Optional[Conversation]:
-        return await self.db.update(conversation_id, conversation_data)
+        return await self.db.update(conversation_id, conversation_data, user_id=user_id)
 
-    async def delete_conversation(self, conversation_id: str) -> bool:
-        return await self.db.delete(conversation_id)
+    async def delete_conversation(
+        self, conversation_id: str, user_id: Optional[str] = None
+    ) -> bool:
+        return await self.db.delete(conversation_id, user_id=user_id)
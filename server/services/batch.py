@@ -0,0 +1,66 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from pydantic import BaseModel
+from models.batch import BatchItemResult, BatchResponse
+from config.database import SupabaseWrapper
+
+
+def _group_updates(
+    updates: Sequence[BaseModel],
+) -> Tuple[List[Tuple[Dict[str, Any], List[int]]], List[BatchItemResult]]:
+    """Agrupa atualizações com os mesmos dados para um único `update ... in`."""
+    groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+    empty: List[BatchItemResult] = []
+    for index, item in enumerate(updates):
+        data = item.model_dump(mode="json", exclude_unset=True, exclude={"id"})
+        if not data:
+            empty.append(
+                BatchItemResult(
+                    index=index,
+                    id=str(getattr(item, "id")),
+                    success=False,
+                    error="Nenhum campo para atualizar",
+                )
+            )
+            continue
+        key = json.dumps(data, sort_keys=True)
+        groups.setdefault(key, (data, []))[1].append(index)
+    return list(groups.values()), empty
+
+
+async def apply_batch(
+    db: SupabaseWrapper[Any],
+    create: Sequence[BaseModel],
+    upsert: Sequence[BaseModel],
+    update: Sequence[BaseModel],
+    delete: Sequence[Any],
+    user_id: Optional[str] = None,
+) -> BatchResponse:
+    """
+    Executa as operações de um lote e devolve o resultado de cada item.
+
+    Com `user_id`, os itens criados pertencem ao usuário e as demais
+    operações só alcançam linhas dele.
+    """
+    response = BatchResponse()
+    if create:
+        response.created = await db.insert_many(
+            [item.model_dump(mode="json") for item in create], user_id=user_id
+        )
+    if upsert:
+        response.upserted = await db.upsert_many(
+            [item.model_dump(mode="json") for item in upsert], user_id=user_id
+        )
+    if update:
+        groups, updated = _group_updates(update)
+        for data, indexes in groups:
+            ids = [str(getattr(update[index], "id")) for index in indexes]
+            for result in await db.update_many(ids, data, user_id=user_id):
+                result.index = indexes[result.index]
+                updated.append(result)
+        response.updated = sorted(updated, key=lambda result: result.index)
+    if delete:
+        response.deleted = await db.delete_many(
+            [str(id) for id in delete], user_id=user_id
+        )
+    return response
@@ -1,25 +1,63 @@
-from typing import List, Optional, Dict, Any
-from models.note import Note
-from config.database import SupabaseWrapper
+from typing import List, Optional, Dict, Any, Sequence
+from models.note import Note, NoteBatch
+from models.batch import BatchResponse
+from config.cache import CachedSupabaseWrapper
+from services.batch import apply_batch
 
 
 class NoteService:
     def __init__(self) -> None:
-        self.db = SupabaseWrapper[Note](Note, "notes")
+        self.db = CachedSupabaseWrapper[Note](Note, "notes")
 
-    async def list_notes(self) -> List[Note]:
-        return await self.db.select()
+    async def list_notes(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Note]:
+        return await self.db.select(query, limit=limit, cursor=cursor, user_id=user_id)
 
-    async def get_note(self, note_id: str) -> Optional[Note]:
-        return await self.db.get_by_id(note_id)
+    async def list_note_fields(
+        self,
+        fields: Sequence[str],
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.db.select_rows(
+            query, fields=fields, limit=limit, cursor=cursor, user_id=user_id
+        )
 
-    async def create_note(self, note_data: Dict[str, Any]) -> Optional[Note]:
-        return await self.db.insert(note_data)
+    async def get_note(
+        self, note_id: str, user_id: Optional[str] = None
+    ) -> Optional[Note]:
+        return await self.db.get_by_id(note_id, user_id=user_id)
+
+    async def create_note(
+        self, note_data: Dict[str, Any], user_id: Optional[str] = None
+    ) -> Optional[Note]:
+        return await self.db.insert(note_data, user_id=user_id)
 
     async def update_note(
-        self, note_id: str, note_data: Dict[str, Any]
+        self, note_id: str, note_data: Dict[str, Any], user_id: Optional[str] = None
     ) -> Optional[Note]:
-        return await self.db.update(note_id, note_data)
+        return await self.db.update(note_id, note_data, user_id=user_id)
+
+    async def delete_note(self, note_id: str, user_id: Optional[str] = None) -> bool:
+        return await self.db.delete(note_id, user_id=user_id)
 
-    async def delete_note(self, note_id: str) -> bool:
-        return await self.db.delete(note_id)
+    async def batch_notes(
+        self, batch: NoteBatch, user_id: Optional[str] = None
+    ) -> BatchResponse:
+        return await apply_batch(
+            self.db,
+            batch.create,
+            batch.upsert,
+            batch.update,
+            batch.delete,
+            user_id=user_id,
+        )
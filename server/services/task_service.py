@@ -1,25 +1,63 @@
-from typing import List, Optional, Dict, Any
-from models.task import Task
-from config.database import SupabaseWrapper
+from typing import List, Optional, Dict, Any, Sequence
+from models.task import Task, TaskBatch
+from models.batch import BatchResponse
+from config.cache import CachedSupabaseWrapper
+from services.batch import apply_batch
 
 
 class TaskService:
     def __init__(self) -> None:
-        self.db = SupabaseWrapper[Task](Task, "tasks")
+        self.db = CachedSupabaseWrapper[Task](Task, "tasks")
 
-    async def list_tasks(self) -> List[Task]:
-        return await self.db.select()
+    async def list_tasks(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Task]:
+        return await self.db.select(query, limit=limit, cursor=cursor, user_id=user_id)
 
-    async def get_task(self, task_id: str) -> Optional[Task]:
-        return await self.db.get_by_id(task_id)
+    async def list_task_fields(
+        self,
+        fields: Sequence[str],
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.db.select_rows(
+            query, fields=fields, limit=limit, cursor=cursor, user_id=user_id
+        )
 
-    async def create_task(self, task_data: Dict[str, Any]) -> Optional[Task]:
-        return await self.db.insert(task_data)
+    async def get_task(
+        self, task_id: str, user_id: Optional[str] = None
+    ) -> Optional[Task]:
+        return await self.db.get_by_id(task_id, user_id=user_id)
+
+    async def create_task(
+        self, task_data: Dict[str, Any], user_id: Optional[str] = None
+    ) -> Optional[Task]:
+        return await self.db.insert(task_data, user_id=user_id)
 
     async def update_task(
-        self, task_id: str, task_data: Dict[str, Any]
+        self, task_id: str, task_data: Dict[str, Any], user_id: Optional[str] = None
     ) -> Optional[Task]:
-        return await self.db.update(task_id, task_data)
+        return await self.db.update(task_id, task_data, user_id=user_id)
+
+    async def delete_task(self, task_id: str, user_id: Optional[str] = None) -> bool:
+        return await self.db.delete(task_id, user_id=user_id)
 
-    async def delete_task(self, task_id: str) -> bool:
-        return await self.db.delete(task_id)
+    async def batch_tasks(
+        self, batch: TaskBatch, user_id: Optional[str] = None
+    ) -> BatchResponse:
+        return await apply_batch(
+            self.db,
+            batch.create,
+            batch.upsert,
+            batch.update,
+            batch.delete,
+            user_id=user_id,
+        )
@@ -1,14 +1,37 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from models.user import UserProfile
 from config.database import SupabaseWrapper
 
 
 class UserService:
     def __init__(self) -> None:
-        self.db = SupabaseWrapper[UserProfile](UserProfile, "user_profiles")
+        # Perfis são públicos para usuários autenticados: sem escopo por dono
+        self.db = SupabaseWrapper[UserProfile](
+            UserProfile, "user_profiles", owner_column=None
+        )
 
-    async def list_users(self) -> List[UserProfile]:
-        return await self.db.select()
+    async def list_users(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[UserProfile]:
+        return await self.db.select(query, limit=limit, cursor=cursor, user_id=user_id)
+
+    async def list_user_fields(
+        self,
+        fields: Sequence[str],
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.db.select_rows(
+            query, fields=fields, limit=limit, cursor=cursor, user_id=user_id
+        )
 
     async def get_user(self, user_id: str) -> Optional[UserProfile]:
         return await self.db.get_by_id(user_id)
@@ -3,6 +3,7 @@ from fastapi.testclient import TestClient
 from uuid import uuid4
 
 from server.run import app
+from server.routes.auth.dependencies import get_current_user_id
 from server.models.user import UserProfile
 from server.models.note import Note, NoteCreate
 from server.models.task import Task, TaskCreate, TaskStatus, TaskPriority
@@ -11,7 +12,8 @@ from server.models.conversation import Conversation, ConversationCreate
 
 @pytest.fixture
 def client() -> TestClient:
-    """Cliente de teste para a API."""
+    """Cliente de teste para a API, autenticado como `test_user`."""
+    app.dependency_overrides[get_current_user_id] = lambda: "test_user"
     return TestClient(app)
 
 
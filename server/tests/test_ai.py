@@ -1,7 +1,12 @@
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
 import pytest
 from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
 
+from server.langchain_components.response_cache import ResponseCache
+from server.services import ai
+from server.services.ai import stream_chat_message
 from server.services.ai_service import AIService
 from server.models.conversation import Conversation, ConversationCreate
 from server.models.user import UserProfile
@@ -119,3 +124,92 @@ async def test_get_conversation_not_found(
             headers={"Authorization": f"Bearer {test_user.id}"},
         )
         assert response.status_code == 404
+
+
+class FakeAssistant:
+    """Assistente que devolve a resposta em pedaços fixos."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+        self.closed = False
+
+    def stream_message(self, message: str) -> Iterator[str]:
+        try:
+            yield "Olá"
+            if self.error:
+                raise self.error
+            yield ", mundo"
+        finally:
+            self.closed = True
+
+    async def astream_message(self, message: str) -> AsyncIterator[str]:
+        for token in ("Olá", ", mundo"):
+            yield token
+
+
+def test_stream_chat_message_events() -> None:
+    """Testa os eventos SSE, o erro amigável e o fechamento do stream."""
+    events = list(stream_chat_message("oi", FakeAssistant()))
+    assert events == [
+        'data: {"token": "Olá"}\n\n',
+        'data: {"token": ", mundo"}\n\n',
+        "event: done\ndata: {}\n\n",
+    ]
+
+    failing = list(stream_chat_message("oi", FakeAssistant(RuntimeError("quota"))))
+    assert failing[-1].startswith("event: error\n")
+
+    assistant = FakeAssistant()
+    stream = stream_chat_message("oi", assistant)
+    next(stream)
+    stream.close()
+    assert assistant.closed
+
+
+def test_stream_chat_endpoint(
+    client: TestClient,
+    test_user: UserProfile,
+    test_conversation_create: ConversationCreate,
+) -> None:
+    """Testa o endpoint de streaming do chat."""
+
+    async def fake_stream(message: str, **kwargs: Any) -> AsyncIterator[str]:
+        yield 'data: {"token": "Olá"}\n\n'
+        yield "event: done\ndata: {}\n\n"
+
+    with patch("server.routes.api.ai.astream_chat_message", fake_stream):
+        response = client.post(
+            "/api/chat/stream",
+            headers={"Authorization": f"Bearer {test_user.id}"},
+            json=test_conversation_create.model_dump(),
+        )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("event: done\ndata: {}\n\n")
+
+
+def test_agent_answers_cached_only_without_tools(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa que execuções do agente com ferramentas nunca vêm do cache."""
+    cache = ResponseCache(max_entries=10, ttl=60)
+    monkeypatch.setattr(ai, "get_response_cache", lambda: cache)
+    runs: List[str] = []
+
+    class Agent:
+        def get_agent(self) -> "Agent":
+            return self
+
+        def invoke(self, data: Dict[str, Any]) -> Dict[str, Any]:
+            runs.append(data["input"])
+            steps = [("create_note", "ok")] if "nota" in data["input"] else []
+            return {"output": "feito", "intermediate_steps": steps}
+
+    monkeypatch.setattr(ai, "agent", Agent())
+
+    for _ in range(2):
+        assert ai.process_chat_message("crie uma nota", "u1") == "feito"
+        assert ai.process_chat_message("olá", "u1") == "feito"
+    assert ai.process_chat_message("olá", "u2") == "feito"
+
+    assert runs == ["crie uma nota", "olá", "crie uma nota", "olá"]
@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+from typing import Any, Dict, List
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from server.routes.auth import jwks, tokens
+from server.routes.auth.dependencies import get_current_user_id
+
+
+def make_jwk(private_key: Any, kid: str) -> Dict[str, Any]:
+    jwk: Dict[str, Any] = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    return {**jwk, "kid": kid, "alg": "RS256"}
+
+
+def make_token(private_key: Any, kid: str, exp: int = 60) -> str:
+    claims = {
+        "sub": "test_user",
+        "exp": int(time.time()) + exp,
+        "aud": tokens.CLERK_AUDIENCE,
+        "iss": f"https://{tokens.CLERK_FRONTEND_API}",
+    }
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def signing_key() -> Any:
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def published(monkeypatch: pytest.MonkeyPatch, signing_key: Any) -> List[Any]:
+    """Publica as chaves num JWKS falso e conta as buscas."""
+    keys = [make_jwk(signing_key, "key-1")]
+    calls: List[Any] = []
+
+    def fetch(url: str) -> Dict[str, Any]:
+        calls.append(url)
+        return {"keys": list(keys)}
+
+    store = jwks.JWKSKeyStore("jwks", min_refresh_interval=0, fetch=fetch)
+    monkeypatch.setattr(tokens, "key_store", store)
+    monkeypatch.setattr(tokens, "CLERK_JWT_KEY", None)
+    tokens.clear_token_cache()
+    return [keys, calls]
+
+
+def test_decode_token_is_cached(
+    monkeypatch: pytest.MonkeyPatch, published: List[Any], signing_key: Any
+) -> None:
+    """Testa que um token verificado não é verificado de novo."""
+    token = make_token(signing_key, "key-1")
+    assert tokens.decode_token(token)["sub"] == "test_user"
+
+    def decode(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        raise AssertionError("token verificado de novo")
+
+    monkeypatch.setattr(jwt, "decode", decode)
+    assert tokens.decode_token(token)["sub"] == "test_user"
+
+
+def test_decode_token_follows_key_rotation(
+    published: List[Any], signing_key: Any
+) -> None:
+    """Testa que um `kid` desconhecido força a atualização do JWKS."""
+    keys, calls = published
+    tokens.decode_token(make_token(signing_key, "key-1"))
+    rotated = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    keys.append(make_jwk(rotated, "key-2"))
+
+    assert tokens.decode_token(make_token(rotated, "key-2"))["sub"] == "test_user"
+    assert len(calls) == 2
+
+    with pytest.raises(jwt.InvalidTokenError):
+        tokens.decode_token(make_token(rotated, "key-3"))
+
+
+def test_key_store_keeps_keys_on_failure(signing_key: Any) -> None:
+    """Testa que uma falha na busca do JWKS mantém as chaves conhecidas."""
+    responses: List[Any] = [{"keys": [make_jwk(signing_key, "key-1")]}]
+
+    def fetch(url: str) -> Dict[str, Any]:
+        if not responses:
+            raise RuntimeError("indisponível")
+        result: Dict[str, Any] = responses.pop()
+        return result
+
+    store = jwks.JWKSKeyStore("jwks", fetch=fetch)
+    assert store.refresh()
+    assert not store.refresh()
+    assert store.get_key("key-1") is not None
+
+
+def test_key_store_fetches_outside_lock(signing_key: Any) -> None:
+    """Testa que a busca não segura o lock e atualizações simultâneas dividem uma."""
+    started, release = threading.Event(), threading.Event()
+    calls: List[str] = []
+
+    def fetch(url: str) -> Dict[str, Any]:
+        calls.append(url)
+        started.set()
+        release.wait(2)
+        return {"keys": [make_jwk(signing_key, "key-1")]}
+
+    store = jwks.JWKSKeyStore("jwks", fetch=fetch)
+    results: List[bool] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(store.refresh()))
+        for _ in range(2)
+    ]
+    threads[0].start()
+    assert started.wait(2)
+    threads[1].start()
+
+    # Durante a busca, o lock fica livre
+    assert store._lock.acquire(timeout=1)
+    store._lock.release()
+
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    assert results == [True, True]
+    assert calls == ["jwks"]
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_id(published: List[Any], signing_key: Any) -> None:
+    """Testa a dependência FastAPI com token válido, ausente e inválido."""
+    token = make_token(signing_key, "key-1")
+    assert await get_current_user_id(f"Bearer {token}") == "test_user"
+
+    with pytest.raises(HTTPException) as missing:
+        await get_current_user_id(None)
+    assert missing.value.status_code == 401
+
+    with pytest.raises(HTTPException) as invalid:
+        await get_current_user_id("Bearer invalido")
+    assert invalid.value.status_code == 401
@@ -0,0 +1,144 @@
+import pytest
+from typing import Any, Dict, Optional
+from unittest.mock import patch, AsyncMock
+
+from server.utils.cache import LRUCache, RedisCache, TieredCache
+from server.config.cache import CachedSupabaseWrapper
+from server.config.database import SupabaseWrapper
+from server.models.note import Note
+
+
+class InMemoryRedis:
+    """Substituto mínimo do cliente `redis.asyncio` para os testes."""
+
+    def __init__(self) -> None:
+        self.data: Dict[str, Any] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None) -> None:
+        self.data[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def expire(self, key: str, ttl: int) -> None:
+        pass
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    """Testa a remoção da entrada menos usada ao atingir o limite."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+
+def test_lru_cache_expires_entries() -> None:
+    """Testa a expiração por TTL e os contadores de acerto/erro."""
+    cache = LRUCache(max_entries=10, ttl=60)
+    with patch("server.utils.cache.time.monotonic", return_value=1000.0):
+        cache.set("a", 1)
+    with patch("server.utils.cache.time.monotonic", return_value=1030.0):
+        assert cache.get("a") == 1
+    with patch("server.utils.cache.time.monotonic", return_value=1061.0):
+        assert cache.get("a") is None
+
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_reads_through_redis() -> None:
+    """Testa que um erro no LRU local é atendido pela camada Redis."""
+    redis = InMemoryRedis()
+    writer = TieredCache(LRUCache(), RedisCache("", client=redis))
+    reader = TieredCache(LRUCache(), RedisCache("", client=redis))
+
+    await writer.set("notes:row:1", {"id": "1"})
+    assert await reader.get("notes:row:1") == {"id": "1"}
+    assert reader.stats.hits == 1
+
+    await writer.bump("notes")
+    assert await reader.generation("notes") == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_get_by_id_and_invalidation(test_note: Note) -> None:
+    """Testa o cache de get_by_id e a invalidação após update."""
+    db = CachedSupabaseWrapper(Note, "notes", cache=TieredCache(LRUCache()))
+    note_id = str(test_note.id)
+    with patch.object(
+        SupabaseWrapper, "get_by_id", new_callable=AsyncMock
+    ) as mock_get_by_id, patch.object(
+        SupabaseWrapper, "update", new_callable=AsyncMock
+    ) as mock_update:
+        mock_get_by_id.return_value = test_note
+        mock_update.return_value = test_note
+
+        assert await db.get_by_id(note_id, user_id="test_user") == test_note
+        assert await db.get_by_id(note_id, user_id="test_user") == test_note
+        assert await db.get_by_id(note_id, user_id="other_user") is None
+        assert mock_get_by_id.call_count == 1
+
+        await db.update(note_id, {"title": "Novo"}, user_id="test_user")
+        await db.get_by_id(note_id, user_id="test_user")
+        assert mock_get_by_id.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_get_by_id_skips_rows_read_during_write(test_note: Note) -> None:
+    """Testa que uma linha lida durante uma escrita não volta ao cache."""
+    db = CachedSupabaseWrapper(Note, "notes", cache=TieredCache(LRUCache()))
+    note_id = str(test_note.id)
+
+    async def read_then_write(*args: Any, **kwargs: Any) -> Note:
+        # Outra requisição altera a nota enquanto esta ainda lê a antiga
+        await db.update(note_id, {"title": "Novo"}, user_id="test_user")
+        return test_note
+
+    with patch.object(
+        SupabaseWrapper, "get_by_id", new_callable=AsyncMock
+    ) as mock_get_by_id, patch.object(
+        SupabaseWrapper, "update", new_callable=AsyncMock
+    ) as mock_update:
+        mock_update.return_value = test_note
+        mock_get_by_id.side_effect = read_then_write
+
+        assert await db.get_by_id(note_id, user_id="test_user") == test_note
+        assert await db.cache.get(f"notes:row:{note_id}") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_list_is_scoped_per_user(test_note: Note) -> None:
+    """Testa que as listagens são guardadas e invalidadas por usuário."""
+    db = CachedSupabaseWrapper(Note, "notes", cache=TieredCache(LRUCache()))
+    row = test_note.model_dump(mode="json")
+    with patch.object(
+        SupabaseWrapper, "select_rows", new_callable=AsyncMock
+    ) as mock_select_rows, patch.object(
+        SupabaseWrapper, "insert", new_callable=AsyncMock
+    ) as mock_insert:
+        mock_select_rows.return_value = [row]
+        mock_insert.return_value = test_note
+
+        await db.select(user_id="test_user")
+        await db.select(user_id="test_user")
+        await db.select(user_id="other_user")
+        assert mock_select_rows.call_count == 2
+
+        await db.insert({"content": "Nova"}, user_id="test_user")
+        await db.select(user_id="test_user")
+        await db.select(user_id="other_user")
+        assert mock_select_rows.call_count == 3
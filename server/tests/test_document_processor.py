@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import List, Tuple
+import asyncio
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from server.langchain_components.document_processor import DocumentProcessor
+from server.langchain_components.embedding_pipeline import EmbeddingPipeline
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(len(text))]
+
+
+def write_words(tmp_path: Path, count: int) -> Path:
+    path = tmp_path / "brief.txt"
+    path.write_text(" ".join(f"palavra{number}" for number in range(count)))
+    return path
+
+
+def test_iter_file_streams_bounded_chunks(tmp_path: Path) -> None:
+    """Testa que janelas pequenas não cortam palavras nem perdem texto."""
+    path = write_words(tmp_path, 2000)
+    processor = DocumentProcessor(chunk_size=100, chunk_overlap=20)
+
+    chunks = list(processor.iter_file(str(path), window_size=257))
+
+    assert all(len(chunk.page_content) <= 100 for chunk in chunks)
+    assert [chunk.metadata["chunk"] for chunk in chunks] == list(range(len(chunks)))
+    words = {word for chunk in chunks for word in chunk.page_content.split()}
+    assert words == {f"palavra{number}" for number in range(2000)}
+
+
+def test_embed_file_pairs_chunks_with_vectors(tmp_path: Path) -> None:
+    """Testa que cada chunk chega junto do seu embedding, em ordem."""
+    path = write_words(tmp_path, 500)
+    processor = DocumentProcessor(chunk_size=80, chunk_overlap=10)
+    pipeline = EmbeddingPipeline(LengthEmbeddings(), max_items=3, concurrency=2)
+
+    async def collect() -> List[Tuple[Document, List[float]]]:
+        return [pair async for pair in processor.embed_file(str(path), pipeline)]
+
+    pairs = asyncio.run(collect())
+
+    assert [document.metadata["chunk"] for document, _ in pairs] == list(
+        range(len(pairs))
+    )
+    assert all(vector == [float(len(doc.page_content))] for doc, vector in pairs)
@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from server.langchain_components.embedding_cache import (
+    CachedEmbeddings,
+    EmbeddingCache,
+)
+
+
+class CountingEmbeddings(Embeddings):
+    """Embeddings falsos que registram os textos enviados."""
+
+    model = "fake"
+
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls.append([text])
+        return [0.0, float(len(text)), 0.5]
+
+
+def test_cache_dedupes_and_persists(tmp_path: Path) -> None:
+    """Testa que textos repetidos ou já vistos não vão de novo à API."""
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, EmbeddingCache(tmp_path / "cache.db"))
+
+    first = embeddings.embed_documents(["olá  mundo", "nota", "olá mundo"])
+    assert inner.calls == [["olá  mundo", "nota"]]
+    assert first[0] == first[2] == [10.0, 1.0, 0.5]
+
+    # Novo processo, mesmo arquivo: tudo vem do disco
+    reopened = CachedEmbeddings(inner, EmbeddingCache(tmp_path / "cache.db"))
+    assert reopened.embed_documents(["nota", "olá mundo"]) == [first[1], first[0]]
+    assert len(inner.calls) == 1
+    assert reopened.cache.hits == 2
+
+    # Consultas têm chave própria
+    assert reopened.embed_query("nota") == [0.0, 4.0, 0.5]
+    assert reopened.embed_query("nota") == [0.0, 4.0, 0.5]
+    assert inner.calls[1:] == [["nota"]]
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    """Testa a remoção das entradas mais antigas ao passar do limite."""
+    # Cada vetor de 3 float32 ocupa 12 bytes
+    cache = EmbeddingCache(tmp_path / "cache.db", max_bytes=30)
+    cache.put_many("fake", ["a", "b"], [[1.0, 1.0, 1.0], [2.0, 2.0, 2.0]])
+    cache.get_many("fake", ["a"])
+    cache.put_many("fake", ["c"], [[3.0, 3.0, 3.0]])
+
+    assert cache.size <= 27
+    assert cache.get_many("fake", ["a", "b", "c"]) == [
+        [1.0, 1.0, 1.0],
+        None,
+        [3.0, 3.0, 3.0],
+    ]
+
+
+def test_cache_size_counts_replaced_entries_once(tmp_path: Path) -> None:
+    """Testa que regravar uma chave não conta o vetor antigo de novo."""
+    cache = EmbeddingCache(tmp_path / "cache.db")
+    cache.put_many("fake", ["a"], [[1.0, 1.0, 1.0]])
+    cache.put_many("fake", ["a", "b"], [[2.0, 2.0, 2.0], [3.0, 3.0, 3.0]])
+
+    assert cache.size == 24
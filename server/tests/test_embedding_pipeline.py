@@ -0,0 +1,94 @@
+from typing import List
+import asyncio
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from server.langchain_components.embedding_pipeline import (
+    EmbeddingPipeline,
+    make_batches,
+)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeEmbeddings(Embeddings):
+    """Embeddings falsos, lentos e com limite de taxa na primeira chamada."""
+
+    def __init__(self, fail_first: int = 0) -> None:
+        self.fail_first = fail_first
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> List[float]:
+        raise NotImplementedError
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise RateLimitError("too many requests")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        # Lotes menores terminam antes, fora de ordem
+        await asyncio.sleep(0.001 * len(texts))
+        self.active -= 1
+        return [[float(text)] for text in texts]
+
+
+def test_make_batches_respects_items_and_tokens() -> None:
+    """Testa os limites de itens e de tokens estimados por lote."""
+    texts = ["a" * 40, "b", "c", "d" * 400, "e"]
+
+    batches = list(make_batches(texts, max_items=2, max_tokens=20))
+
+    assert batches == [
+        (0, ["a" * 40, "b"]),
+        (2, ["c"]),
+        (3, ["d" * 400]),
+        (4, ["e"]),
+    ]
+
+
+def test_pipeline_keeps_order_and_bounds_concurrency() -> None:
+    """Testa a ordem dos resultados, a concorrência e as retentativas."""
+    fake = FakeEmbeddings(fail_first=2)
+    pipeline = EmbeddingPipeline(
+        fake, max_items=7, max_tokens=1000, concurrency=3, base_delay=0.001
+    )
+    texts = [str(number) for number in range(100)]
+
+    vectors = pipeline.embed(texts)
+
+    assert vectors == [[float(number)] for number in range(100)]
+    assert fake.peak <= 3
+    assert pipeline.retries == 2
+
+
+def test_pipeline_gives_up_on_other_errors() -> None:
+    """Testa que erros que não são de limite de taxa não são repetidos."""
+
+    class Broken(FakeEmbeddings):
+        async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+            self.calls += 1
+            raise ValueError("entrada inválida")
+
+    fake = Broken()
+    with pytest.raises(ValueError):
+        EmbeddingPipeline(fake, concurrency=1).embed(["1", "2"])
+    assert fake.calls == 1
+
+
+def test_pipeline_embed_inside_event_loop() -> None:
+    """Testa que a API síncrona funciona chamada de dentro de um event loop."""
+    pipeline = EmbeddingPipeline(FakeEmbeddings(), max_items=2)
+
+    async def handler() -> List[List[float]]:
+        return pipeline.embed(["1", "2", "3"])
+
+    assert asyncio.run(handler()) == [[1.0], [2.0], [3.0]]
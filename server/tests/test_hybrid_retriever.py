@@ -0,0 +1,84 @@
+from typing import Any, Dict, List
+import threading
+import time
+
+from server.langchain_components.hybrid_retriever import (
+    HybridRetriever,
+    reciprocal_rank_fusion,
+)
+
+
+def results(*ids: str) -> List[Dict[str, Any]]:
+    return [{"id": note_id} for note_id in ids]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement() -> None:
+    """Testa que notas presentes nas duas listas sobem no ranking."""
+    fused = reciprocal_rank_fusion(
+        {"lexical": results("a", "b", "c"), "semantic": results("c", "d", "a")},
+        limit=3,
+    )
+
+    assert [entry["id"] for entry in fused] == ["a", "c", "b"]
+    assert fused[0]["sources"] == ["lexical", "semantic"]
+
+
+def test_hybrid_search_respects_time_budget() -> None:
+    """Testa que um lado lento fica de fora sem atrasar a resposta."""
+
+    def slow(user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        time.sleep(0.5)
+        return results("x")
+
+    retriever = HybridRetriever(lambda *args: results("a", "b"), slow, timeout=0.1)
+
+    started = time.perf_counter()
+    response = retriever.search("test_user", "cliente")
+
+    assert time.perf_counter() - started < 0.4
+    assert response["sources"] == {"lexical": "ok", "semantic": "timeout"}
+    assert [entry["id"] for entry in response["results"]] == ["a", "b"]
+
+
+def test_hybrid_search_tolerates_errors() -> None:
+    """Testa que a falha de um lado não derruba a busca."""
+
+    def broken(user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        raise RuntimeError("índice indisponível")
+
+    retriever = HybridRetriever(broken, lambda *args: results("z"))
+
+    response = retriever.search("test_user", "SKU-123")
+
+    assert response["success"]
+    assert response["sources"] == {"lexical": "error", "semantic": "ok"}
+    assert not HybridRetriever(broken, broken).search("u", "q")["success"]
+
+
+def test_hybrid_search_bounds_late_work() -> None:
+    """Testa que buscas atrasadas ocupam vagas e o lado lento fica de fora."""
+    release = threading.Event()
+    calls: List[str] = []
+
+    def slow(user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        calls.append(query)
+        release.wait(2)
+        return results("x")
+
+    retriever = HybridRetriever(
+        lambda *args: results("a"), slow, timeout=0.05, max_in_flight=1
+    )
+
+    first = retriever.search("test_user", "um")
+    second = retriever.search("test_user", "dois")
+
+    assert first["sources"] == {"lexical": "ok", "semantic": "timeout"}
+    assert second["sources"] == {"lexical": "ok", "semantic": "busy"}
+    assert [entry["id"] for entry in second["results"]] == ["a"]
+    # A busca atrasada não é repetida nem enfileirada
+    assert calls == ["um"]
+
+    release.set()
+    time.sleep(0.1)
+    third = retriever.search("test_user", "tres", timeout=1)
+    assert third["sources"] == {"lexical": "ok", "semantic": "ok"}
@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import List
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from server.langchain_components.embedding_pipeline import EmbeddingPipeline
+from server.langchain_components.ingestion import IngestionPipeline, discover
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return [float(len(text))]
+
+
+def test_ingestion_dedupes_and_indexes(tmp_path: Path) -> None:
+    """Testa as etapas da ingestão, do diretório até o índice."""
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.txt").write_text("Contrato do cliente ACME.\n\nSKU 123")
+    (tmp_path / "docs" / "b.md").write_text("Contrato do cliente ACME.")
+    (tmp_path / "docs" / "c.bin").write_bytes(b"\x00\x01")
+    indexed: List[Document] = []
+
+    def sink(batch: List[Document], vectors: List[List[float]]) -> None:
+        assert len(batch) == len(vectors)
+        indexed.extend(batch)
+
+    pipeline = IngestionPipeline(
+        EmbeddingPipeline(LengthEmbeddings(), concurrency=2),
+        sink,
+        chunk_size=30,
+        chunk_overlap=0,
+        workers=2,
+        batch_size=1,
+    )
+
+    result = pipeline.ingest(tmp_path)
+
+    assert [path.name for path in discover(tmp_path)] == ["a.txt", "b.md"]
+    assert sorted(document.page_content for document in indexed) == [
+        "Contrato do cliente ACME.",
+        "SKU 123",
+    ]
+    metrics = result["metrics"]
+    assert metrics["parse"]["items"] == 2
+    assert metrics["dedupe"]["skipped"] == 1
+    assert metrics["index"]["items"] == 2
+
+    known = {document.metadata["hash"] for document in indexed}
+    assert pipeline.ingest(tmp_path, known)["metrics"]["embed"]["items"] == 0
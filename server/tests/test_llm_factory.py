@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+import pytest
+
+from server.langchain_components import llm_factory
+
+
+class FakeChat:
+    created: List[dict] = []
+
+    def __init__(self, **kwargs: Any) -> None:
+        FakeChat.created.append(kwargs)
+        self.kwargs = kwargs
+
+
+@pytest.fixture(autouse=True)
+def fake_llm(monkeypatch: pytest.MonkeyPatch) -> None:
+    FakeChat.created = []
+    monkeypatch.setattr(llm_factory, "ChatGoogleGenerativeAI", FakeChat)
+    llm_factory.clear()
+
+
+def test_get_llm_reuses_clients_per_config() -> None:
+    """Testa que a mesma configuração devolve o mesmo cliente."""
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        llms = list(pool.map(lambda _: llm_factory.get_llm("key"), range(32)))
+
+    assert all(llm is llms[0] for llm in llms)
+    assert len(FakeChat.created) == 1
+    assert llm_factory.get_llm("key", temperature=0.2) is not llms[0]
+    assert llm_factory.get_llm("outra-chave") is not llms[0]
+    assert len(FakeChat.created) == 3
+
+
+def test_shared_builds_once() -> None:
+    """Testa que prompts e agentes são montados uma vez por chave."""
+    builds: List[int] = []
+
+    def build() -> object:
+        builds.append(1)
+        return object()
+
+    first = llm_factory.shared("agent", build)
+
+    assert llm_factory.shared("agent", build) is first
+    assert len(builds) == 1
+    llm_factory.clear()
+    assert llm_factory.shared("agent", build) is not first
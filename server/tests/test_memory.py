@@ -0,0 +1,124 @@
+from typing import Any, Dict, List
+import threading
+import time
+
+from langchain.memory import ConversationBufferMemory
+
+from server.langchain_components.memory import ConversationStore
+
+
+class FakeQuery:
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows
+        self.filters: Dict[str, str] = {}
+        self.data: List[Dict[str, Any]] = []
+
+    def select(self, columns: str) -> "FakeQuery":
+        return self
+
+    def eq(self, column: str, value: str) -> "FakeQuery":
+        self.filters[column] = value
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "FakeQuery":
+        return self
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self
+
+    def insert(self, row: Dict[str, Any]) -> "FakeQuery":
+        self.rows.append(row)
+        return self
+
+    def execute(self) -> "FakeQuery":
+        self.data = [
+            row
+            for row in reversed(self.rows)
+            if row["user_id"] == self.filters.get("user_id")
+            and row["metadata"]["session_id"]
+            == self.filters.get("metadata->>session_id")
+        ]
+        return self
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.rows: List[Dict[str, Any]] = []
+
+    def table(self, name: str) -> FakeQuery:
+        assert name == "conversations"
+        return FakeQuery(self.rows)
+
+
+class GatedQuery(FakeQuery):
+    def __init__(self, rows: List[Dict[str, Any]], gate: threading.Event) -> None:
+        super().__init__(rows)
+        self.gate = gate
+
+    def insert(self, row: Dict[str, Any]) -> "FakeQuery":
+        # Segura a gravação até o teste liberar
+        assert self.gate.wait(2)
+        return super().insert(row)
+
+
+class GatedClient(FakeClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = threading.Event()
+
+    def table(self, name: str) -> FakeQuery:
+        assert name == "conversations"
+        return GatedQuery(self.rows, self.gate)
+
+
+def wait_for(rows: List[Dict[str, Any]], count: int) -> None:
+    deadline = time.monotonic() + 2
+    while len(rows) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_session_window_is_token_bounded() -> None:
+    """Testa que o histórico enviado ao modelo respeita o orçamento."""
+    client = FakeClient()
+    store = ConversationStore(max_tokens=30, client=lambda: client)
+
+    for number in range(10):
+        store.append("ana", "s1", f"pergunta {number}", "resposta " * 5)
+
+    session = store.get("ana", "s1")
+    assert session.tokens <= 30
+    assert session.turns[-1][0] == "pergunta 9"
+    assert len(session.turns) < 10
+
+
+def test_history_persists_and_survives_eviction() -> None:
+    """Testa a gravação no banco e a recarga após sair do LRU."""
+    client = FakeClient()
+    store = ConversationStore(max_sessions=1, client=lambda: client)
+    memory = ConversationBufferMemory(
+        chat_memory=store.history("ana", "s1"),
+        memory_key="chat_history",
+        return_messages=True,
+    )
+
+    memory.save_context({"input": "Olá"}, {"response": "Oi, Ana!"})
+    wait_for(client.rows, 1)
+    store.get("bia", "s1")  # tira a sessão da Ana do LRU
+
+    messages = memory.load_memory_variables({})["chat_history"]
+    assert [message.content for message in messages] == ["Olá", "Oi, Ana!"]
+    assert client.rows[0]["metadata"] == {"session_id": "s1"}
+    assert not store.get("ana", "s2").turns
+
+
+def test_expired_session_reload_waits_for_pending_writes() -> None:
+    """Testa que a sessão relida após o TTL inclui trocas ainda na fila."""
+    client = GatedClient()
+    store = ConversationStore(ttl=0.05, client=lambda: client)
+
+    store.append("ana", "s1", "Olá", "Oi, Ana!")
+    time.sleep(0.1)  # a sessão expira com a gravação ainda pendente
+    threading.Timer(0.1, client.gate.set).start()
+
+    session = store.get("ana", "s1")
+    assert list(session.turns) == [("Olá", "Oi, Ana!")]
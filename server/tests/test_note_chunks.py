@@ -0,0 +1,37 @@
+from server.langchain_components.note_chunks import (
+    chunk_key,
+    note_of,
+    plan_update,
+    split_note,
+)
+
+
+def brief(paragraphs: int) -> str:
+    return "\n\n".join(
+        f"Parágrafo {n}: cláusula do contrato." for n in range(paragraphs)
+    )
+
+
+def test_split_note_keeps_paragraph_boundaries() -> None:
+    """Testa que parágrafos viram chunks próprios e os longos são divididos."""
+    text = "Primeiro.\n\n \n\nSegundo.\n\n" + "palavra " * 50
+
+    chunks = split_note(text, chunk_size=100, chunk_overlap=0)
+
+    assert chunks[:2] == ["Primeiro.", "Segundo."]
+    assert len(chunks) > 3
+    assert all(len(chunk) <= 100 for chunk in chunks)
+
+
+def test_editing_one_paragraph_reembeds_one_chunk() -> None:
+    """Testa que só o parágrafo editado é reenviado para embedding."""
+    before = split_note(brief(100))
+    existing = [chunk_key("note-1", chunk) for chunk in before]
+
+    edited = brief(100).replace("Parágrafo 42:", "Parágrafo 42 (revisado):")
+    added, removed = plan_update("note-1", split_note(edited), existing)
+
+    assert list(added.values()) == ["Parágrafo 42 (revisado): cláusula do contrato."]
+    assert removed == [chunk_key("note-1", "Parágrafo 42: cláusula do contrato.")]
+    assert note_of(removed[0]) == "note-1"
+    assert plan_update("note-1", before, existing) == ({}, [])
@@ -2,8 +2,10 @@ import pytest
 from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
 
+from server.config.database import InvalidCursorError, encode_cursor
 from server.services.note_service import NoteService
 from server.models.note import Note, NoteCreate
+from server.models.batch import BatchItemResult, BatchResponse
 from server.models.user import UserProfile
 
 
@@ -133,3 +135,100 @@ async def test_delete_note_success(
         assert response.status_code == 200
         data = response.json()
         assert data["message"] == "Nota deletada com sucesso"
+
+
+@pytest.mark.asyncio
+async def test_list_notes_next_cursor(
+    client: TestClient, test_user: UserProfile, test_note: Note
+) -> None:
+    """Testa que a página cheia devolve o cursor da próxima página."""
+    with patch.object(
+        NoteService, "list_notes", new_callable=AsyncMock
+    ) as mock_list_notes:
+        mock_list_notes.return_value = [test_note]
+        response = client.get(
+            "/api/notes?limit=1", headers={"Authorization": f"Bearer {test_user.id}"}
+        )
+        assert response.status_code == 200
+        assert response.headers["X-Next-Cursor"] == encode_cursor(test_note)
+        assert mock_list_notes.call_args.kwargs == {
+            "limit": 1,
+            "cursor": None,
+            "user_id": "test_user",
+        }
+
+
+@pytest.mark.asyncio
+async def test_list_notes_fields(
+    client: TestClient, test_user: UserProfile, test_note: Note
+) -> None:
+    """Testa listagem de notas com projeção de colunas."""
+    row = {
+        "id": str(test_note.id),
+        "created_at": "2024-01-01T00:00:00Z",
+        "title": test_note.title,
+    }
+    with patch.object(
+        NoteService, "list_note_fields", new_callable=AsyncMock
+    ) as mock_list_note_fields:
+        mock_list_note_fields.return_value = [row]
+        response = client.get(
+            "/api/notes?fields=id,title",
+            headers={"Authorization": f"Bearer {test_user.id}"},
+        )
+        assert response.status_code == 200
+        assert response.json() == [row]
+        assert mock_list_note_fields.call_args.args[0] == ["id", "title"]
+        assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_list_notes_invalid_cursor(
+    client: TestClient, test_user: UserProfile
+) -> None:
+    """Testa que um cursor inválido retorna 400."""
+    with patch.object(
+        NoteService, "list_notes", new_callable=AsyncMock
+    ) as mock_list_notes:
+        mock_list_notes.side_effect = InvalidCursorError("Cursor inválido")
+        response = client.get(
+            "/api/notes?cursor=invalido",
+            headers={"Authorization": f"Bearer {test_user.id}"},
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_batch_notes_success(
+    client: TestClient, test_user: UserProfile, test_note: Note
+) -> None:
+    """Testa operações em lote sobre notas com resultado por item."""
+    batch_response = BatchResponse(
+        created=[BatchItemResult(index=0, id=str(test_note.id), success=True)],
+        deleted=[
+            BatchItemResult(
+                index=0,
+                id=str(test_note.id),
+                success=False,
+                error="Registro não encontrado",
+            )
+        ],
+    )
+    with patch.object(
+        NoteService, "batch_notes", new_callable=AsyncMock
+    ) as mock_batch_notes:
+        mock_batch_notes.return_value = batch_response
+        response = client.post(
+            "/api/notes:batch",
+            headers={"Authorization": f"Bearer {test_user.id}"},
+            json={
+                "create": [{"title": "Nova", "content": "Conteúdo"}],
+                "delete": [str(test_note.id)],
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"][0]["success"] is True
+        assert data["deleted"][0]["error"] == "Registro não encontrado"
+        batch = mock_batch_notes.call_args.args[0]
+        assert batch.create[0].content == "Conteúdo"
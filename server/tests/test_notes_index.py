@@ -0,0 +1,87 @@
+from typing import Dict, List
+
+from server.modules.notes_index import NotesIndex, fold, tokenize
+
+
+NOTES: Dict[str, List[Dict[str, str]]] = {
+    "ana": [
+        {"id": "1", "title": "Reunião", "content": "Reunião com o cliente às 10h"},
+        {"id": "2", "title": "Compras", "content": "Comprar café e pão"},
+        {"id": "3", "title": "Ideias", "content": "Reuniões semanais mais curtas"},
+    ],
+    "bia": [{"id": "4", "title": "Viagem", "content": "Passagens para Lisboa"}],
+}
+
+
+def make_index(max_bytes: int = 1024 * 1024) -> NotesIndex:
+    return NotesIndex(lambda user_id: NOTES.get(user_id, []), max_bytes=max_bytes)
+
+
+def test_tokenize_folds_accents_and_stopwords() -> None:
+    """Testa a normalização de acentos e a remoção de stopwords."""
+    assert fold("Reunião ÀS 10h") == "reuniao as 10h"
+    assert tokenize("Reunião com o cliente") == ["reuniao", "cliente"]
+
+
+def test_search_prefix_and_accents() -> None:
+    """Testa a busca por prefixo, sem acentos, limitada ao usuário."""
+    index = make_index()
+
+    results = index.search("ana", "reuni")
+    assert {result["id"] for result in results} == {"1", "3"}
+    assert results[0]["id"] == "1"
+    assert [result["id"] for result in index.search("ana", "cafe pa")] == ["2"]
+    assert index.search("ana", "lisboa") == []
+
+
+def test_upsert_and_remove_keep_index_current() -> None:
+    """Testa que criar, alterar e remover notas atualiza o índice."""
+    index = make_index()
+    index.search("ana", "cliente")
+
+    index.upsert("ana", {"id": "5", "title": "Cliente novo", "content": "Contrato"})
+    index.upsert("ana", {"id": "1", "title": "Reunião", "content": "Adiada"})
+    assert [result["id"] for result in index.search("ana", "cliente")] == ["5"]
+
+    index.remove("5")
+    assert index.search("ana", "contrato") == []
+
+
+def test_memory_cap_evicts_least_recently_used_user() -> None:
+    """Testa o descarte do índice inteiro do usuário menos recente."""
+    index = make_index(max_bytes=1)
+    index.search("ana", "cliente")
+    index.search("bia", "lisboa")
+
+    assert "bia" in index
+    assert "ana" not in index
+    assert index.search("ana", "cliente")[0]["id"] == "1"
+
+
+def test_changes_during_build_are_not_lost() -> None:
+    """Testa que alterações feitas durante a carga entram no índice."""
+
+    def loader(user_id: str) -> List[Dict[str, str]]:
+        notes = [dict(note) for note in NOTES[user_id]]
+        # Outra requisição altera as notas enquanto a carga está em andamento
+        index.upsert(user_id, {"id": "9", "title": "Nova", "content": "Orçamento"})
+        index.remove("2")
+        return notes
+
+    index = NotesIndex(loader)
+
+    assert [result["id"] for result in index.search("ana", "orcamento")] == ["9"]
+    assert index.search("ana", "cafe") == []
+
+
+def test_invalidate_during_build_discards_result() -> None:
+    """Testa que um índice invalidado durante a carga não fica guardado."""
+
+    def loader(user_id: str) -> List[Dict[str, str]]:
+        index.invalidate(user_id)
+        return NOTES[user_id]
+
+    index = NotesIndex(loader)
+
+    assert index.search("ana", "cafe")
+    assert "ana" not in index
@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+import threading
+import time
+
+import pytest
+
+from server.langchain_components.rate_limiter import (
+    BATCH,
+    INTERACTIVE,
+    RateLimiter,
+    RateLimitExceeded,
+    TokenBucket,
+    priority,
+)
+
+
+def test_token_bucket_refills_over_time() -> None:
+    """Testa o cálculo de espera do balde."""
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])
+    bucket.consume(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    now[0] = 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    # Pedidos maiores que o balde esperam só que ele encha
+    assert bucket.wait_time(1000) == pytest.approx(59.5)
+
+
+def test_rejects_what_would_miss_the_deadline() -> None:
+    """Testa a recusa imediata de pedidos que não caberiam no prazo."""
+    limiter = RateLimiter(rpm=60, tpm=100, timeout=0.5)
+    limiter.acquire(tokens=10)
+    limiter.tokens.level = 0  # type: ignore[union-attr]
+
+    started = time.monotonic()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(tokens=50)
+    assert time.monotonic() - started < 0.1
+    assert limiter.snapshot()["interactive"]["timed_out"] == 1
+
+
+def test_interactive_goes_before_batch() -> None:
+    """Testa que o chat passa na frente das cargas em lote."""
+    limiter = RateLimiter(rpm=600, timeout=5)
+    limiter.requests.level = 0  # type: ignore[union-attr]
+    order: List[str] = []
+
+    def call(name: str, level: int) -> None:
+        with priority(level):
+            limiter.acquire()
+        order.append(name)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        batch = [pool.submit(call, f"lote-{i}", BATCH) for i in range(2)]
+        while limiter.metrics[BATCH].depth < 2:
+            time.sleep(0.005)
+        chat = pool.submit(call, "chat", INTERACTIVE)
+        for future in [*batch, chat]:
+            future.result(5)
+
+    assert order[0] == "chat"
+    snapshot = limiter.snapshot()
+    assert snapshot["batch"]["admitted"] == 2
+    assert snapshot["interactive"]["max_wait"] > 0
+
+
+def test_bounded_queue_per_priority() -> None:
+    """Testa o limite de pedidos esperando em cada classe."""
+    limiter = RateLimiter(rpm=600, max_queue=1, timeout=5)
+    limiter.requests.level = 0  # type: ignore[union-attr]
+
+    waiting = threading.Thread(target=limiter.acquire, kwargs={"level": BATCH})
+    waiting.start()
+    while limiter.metrics[BATCH].depth < 1:
+        time.sleep(0.005)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(level=BATCH)
+    waiting.join(5)
+
+    assert limiter.snapshot()["batch"]["rejected"] == 1
+    assert limiter.snapshot()["batch"]["depth"] == 0
@@ -0,0 +1,58 @@
+import time
+from typing import List
+
+from server.langchain_components.response_cache import ResponseCache
+
+
+def fake_embed(text: str) -> List[float]:
+    # Prompts sobre o mesmo briefing apontam para a mesma direção
+    return [1.0, 0.05 * len(text.split())] if "briefing" in text else [0.0, 1.0]
+
+
+def test_exact_hits_are_scoped_and_normalized() -> None:
+    """Testa acertos exatos, normalização do prompt e isolamento por usuário."""
+    cache = ResponseCache(max_entries=10, ttl=60)
+    calls: List[str] = []
+
+    def compute() -> str:
+        calls.append("llm")
+        return "resumo"
+
+    params = {"temperature": 0.7}
+    first = cache.get_or_compute("u1", "gemini-pro", params, "Resuma  isto", compute)
+    again = cache.get_or_compute("u1", "gemini-pro", params, "Resuma isto\n", compute)
+    assert first == again == "resumo"
+    assert calls == ["llm"]
+
+    # Outro usuário, modelo ou parâmetros: nova chamada
+    cache.get_or_compute("u2", "gemini-pro", params, "Resuma isto", compute)
+    cache.get_or_compute("u1", "gemini-pro", {"temperature": 0}, "Resuma isto", compute)
+    assert len(calls) == 3
+    assert cache.stats.hits == 1
+    assert cache.stats.snapshot()["hit_rate"] == 0.25
+
+
+def test_ttl_and_size_bound() -> None:
+    """Testa a expiração e o limite de entradas."""
+    cache = ResponseCache(max_entries=2, ttl=0.05)
+    cache.set("u1", "m", {}, "a", "A")
+    cache.set("u1", "m", {}, "b", "B")
+    cache.set("u1", "m", {}, "c", "C")
+    assert cache.get("u1", "m", {}, "a") is None
+    assert cache.get("u1", "m", {}, "c") == "C"
+    time.sleep(0.06)
+    assert cache.get("u1", "m", {}, "c") is None
+
+
+def test_semantic_tier_for_near_duplicates() -> None:
+    """Testa o reaproveitamento de prompts quase idênticos."""
+    cache = ResponseCache(max_entries=10, ttl=60, embed=fake_embed, similarity=0.99)
+    cache.set("u1", "m", {}, "Resuma este briefing", "resumo do briefing")
+
+    assert cache.get("u1", "m", {}, "Resuma este briefing, por favor") == (
+        "resumo do briefing"
+    )
+    assert cache.stats.semantic_hits == 1
+    assert cache.get("u1", "m", {}, "Qual a previsão do tempo?") is None
+    # O nível semântico também respeita o escopo do usuário
+    assert cache.get("u2", "m", {}, "Resuma este briefing, por favor") is None
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+import threading
+
+import pytest
+
+from server.langchain_components.response_cache import ResponseCache
+from server.langchain_components.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_the_leader() -> None:
+    """Testa que chamadas idênticas simultâneas fazem uma única chamada."""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls: List[int] = []
+
+    def slow() -> str:
+        calls.append(1)
+        release.wait(2)
+        return "análise"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, "nota-1", slow) for _ in range(8)]
+        while flight.stats.leaders + flight.stats.shared < 8:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [future.result(2) for future in futures]
+
+    assert results == ["análise"] * 8
+    assert calls == [1]
+    assert (flight.stats.leaders, flight.stats.shared) == (1, 7)
+    # Terminada a chamada, a próxima é uma nova chamada
+    assert flight.do("nota-1", lambda: "nova") == "nova"
+
+
+def test_errors_reach_every_waiter() -> None:
+    """Testa que o erro do líder chega a quem esperava por ele."""
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing() -> str:
+        started.set()
+        release.wait(2)
+        raise RuntimeError("quota")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", failing)
+        assert started.wait(2)
+        follower = pool.submit(flight.do, "k", lambda: "outra")
+        while flight.stats.shared < 1:
+            threading.Event().wait(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="quota"):
+                future.result(2)
+
+
+def test_response_cache_coalesces_misses() -> None:
+    """Testa que misses simultâneos no cache de respostas viram uma chamada."""
+    cache = ResponseCache(max_entries=10, ttl=60, flight=SingleFlight())
+    calls: List[int] = []
+    barrier = threading.Barrier(4)
+
+    def compute() -> str:
+        calls.append(1)
+        threading.Event().wait(0.1)
+        return "resumo"
+
+    def ask() -> str:
+        barrier.wait()
+        return cache.get_or_compute("u1", "m", {}, "Resuma o briefing", compute)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: ask(), range(4)))
+
+    assert results == ["resumo"] * 4
+    assert calls == [1]
@@ -0,0 +1,45 @@
+from typing import List, Tuple
+import threading
+
+from server.langchain_components.summarizer import (
+    ScheduledSummaryMemory,
+    SummaryScheduler,
+)
+
+
+def test_summary_runs_off_path_and_coalesces() -> None:
+    """Testa o resumo em segundo plano e o agrupamento de gatilhos."""
+    started, release = threading.Event(), threading.Event()
+    calls: List[int] = []
+
+    def summarize(summary: str, turns: List[Tuple[str, str]]) -> str:
+        calls.append(len(turns))
+        started.set()
+        release.wait(2)
+        return f"{summary}+{len(turns)}"
+
+    scheduler = SummaryScheduler(summarize, threshold=5)
+    memory = ScheduledSummaryMemory(scheduler=scheduler, key="c1")
+
+    memory.save_context({"input": "a"}, {"output": "b"})
+    assert calls == []  # abaixo do limite: nenhuma chamada ao LLM
+
+    first = scheduler.record("c1", "pergunta longa " * 3, "resposta longa " * 3)
+    assert first is not None
+    assert started.wait(2)
+    # Enquanto o resumo roda, novos gatilhos só marcam outra rodada
+    assert scheduler.record("c1", "mais " * 10, "texto " * 10) is None
+    assert scheduler.record("c1", "mais " * 10, "texto " * 10) is None
+    messages = memory.load_memory_variables({})["chat_history"]
+    assert len(messages) == 8  # resposta servida sem esperar pelo resumo
+
+    release.set()
+    first.result(2)
+    deadline = threading.Event()
+    while scheduler.runs < 2 and not deadline.wait(0.01):
+        pass
+
+    assert calls == [2, 2]
+    summary, tail = scheduler.context("c1")
+    assert summary == "+2+2"
+    assert tail == []
@@ -0,0 +1,27 @@
+import asyncio
+
+import httpx
+
+from server.config.supabase import AsyncMeteredTransport
+
+
+async def test_async_pool_wait_counter_survives_cancellation() -> None:
+    """Testa que uma espera cancelada não fica contada no pool."""
+    transport = AsyncMeteredTransport(
+        max_connections=1,
+        max_keepalive_connections=1,
+        keepalive_expiry=5,
+        pool_timeout=5,
+    )
+    await transport._slots.acquire()  # pool cheio
+    request = httpx.Request("GET", "http://localhost/")
+
+    task = asyncio.ensure_future(transport.handle_async_request(request))
+    await asyncio.sleep(0.01)
+    assert transport.stats().waiting == 1
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert transport.stats().waiting == 0
+    assert transport.stats().in_use == 0
+    await transport.aclose()
@@ -1,9 +1,19 @@
 import pytest
+from uuid import uuid4
 from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
 
+from server.services.batch import apply_batch
 from server.services.task_service import TaskService
-from server.models.task import Task, TaskCreate, TaskStatus
+from server.models.batch import BatchItemResult
+from server.models.task import (
+    Task,
+    TaskBatch,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskPriority,
+    TaskStatus,
+)
 from server.models.user import UserProfile
 
 
@@ -113,6 +123,7 @@ async def test_list_tasks_with_filter(
         data = response.json()
         assert len(data) == 1
         assert data[0]["status"] == TaskStatus.PENDING.value
+        assert mock_list_tasks.call_args.args[0] == {"status": "pending"}
 
 
 @pytest.mark.asyncio
@@ -153,3 +164,39 @@ async def test_delete_task_success(
         assert response.status_code == 200
         data = response.json()
         assert data["message"] == "Tarefa deletada com sucesso"
+
+
+@pytest.mark.asyncio
+async def test_apply_batch_groups_updates(test_task: Task) -> None:
+    """Testa que atualizações iguais são enviadas em um único `update ... in`."""
+    first, second, third = uuid4(), uuid4(), uuid4()
+    db = AsyncMock()
+    db.update_many.side_effect = lambda ids, data, user_id: [
+        BatchItemResult(index=index, id=id, success=True)
+        for index, id in enumerate(ids)
+    ]
+    batch = TaskBatch(
+        update=[
+            TaskBatchUpdate(id=first, status=TaskStatus.COMPLETED),
+            TaskBatchUpdate(id=second, priority=TaskPriority.HIGH),
+            TaskBatchUpdate(id=third, status=TaskStatus.COMPLETED),
+            TaskBatchUpdate(id=test_task.id),
+        ]
+    )
+
+    response = await apply_batch(
+        db, batch.create, batch.upsert, batch.update, batch.delete, "test_user"
+    )
+
+    assert db.update_many.call_count == 2
+    db.update_many.assert_any_call(
+        [str(first), str(third)], {"status": "completed"}, user_id="test_user"
+    )
+    assert [result.index for result in response.updated] == [0, 1, 2, 3]
+    assert [result.id for result in response.updated[:3]] == [
+        str(first),
+        str(second),
+        str(third),
+    ]
+    assert response.updated[3].success is False
+    db.insert_many.assert_not_called()
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from server.langchain_components.matrix_index import MatrixIndex
+from server.langchain_components.vector_index import VectorIndexStore
+
+
+def test_vector_index_incremental_and_persistent(tmp_path: Path) -> None:
+    """Testa upsert, remoção e recarga do índice a partir do disco."""
+    vectors = np.random.default_rng(0).normal(size=(10, 8))
+    index = VectorIndexStore(tmp_path, "model").get("test_user")
+    index.upsert_many([(f"note-{i}", "v1") for i in range(10)], vectors)
+
+    assert index.upsert("note-1", "v1", vectors[1]) is False
+    assert index.upsert("note-1", "v2", vectors[2]) is True
+    assert index.delete("note-2")
+    index.save()
+
+    reloaded = VectorIndexStore(tmp_path, "model").get("test_user")
+    assert len(reloaded) == 9
+    assert reloaded.stale({"note-1": "v2", "note-3": "v1", "note-2": "v1"}) == [
+        "note-2"
+    ]
+    assert reloaded.search(vectors[2], k=1)[0][0] == "note-1"
+
+
+def test_vector_index_ignores_other_model(tmp_path: Path) -> None:
+    """Testa que um índice de outro modelo de embedding é descartado."""
+    index = VectorIndexStore(tmp_path, "model-a").get("test_user")
+    index.upsert("note-1", "v1", [1.0, 0.0, 0.0])
+    index.save()
+
+    assert len(VectorIndexStore(tmp_path, "model-b").get("test_user")) == 0
+
+
+def test_vector_index_merges_concurrent_writers(tmp_path: Path) -> None:
+    """Testa que gravações de dois workers no mesmo índice não se perdem."""
+    vectors = np.eye(4)
+    first = VectorIndexStore(tmp_path, "model").get("test_user")
+    second = VectorIndexStore(tmp_path, "model").get("test_user")
+    first.upsert_many([("note-0", "v1"), ("note-1", "v1")], vectors[:2])
+    first.save()
+
+    # O segundo worker ainda não viu a gravação do primeiro
+    second.upsert("note-2", "v1", vectors[2])
+    second.delete("note-0")
+    second.save()
+    first.upsert("note-3", "v1", vectors[3])
+    first.save()
+
+    reloaded = VectorIndexStore(tmp_path, "model").get("test_user")
+    assert sorted(reloaded.entries) == ["note-1", "note-2", "note-3"]
+    assert reloaded.search(vectors[2], k=1)[0][0] == "note-2"
+    second.refresh()
+    assert sorted(second.entries) == ["note-1", "note-2", "note-3"]
+
+
+def test_matrix_index_quantized_top_k(tmp_path: Path) -> None:
+    """Testa a busca exata, com e sem int8, e a gravação em disco."""
+    vectors = np.random.default_rng(1).normal(size=(200, 16))
+    ids = np.arange(100, 300, dtype="int64")
+    exact = MatrixIndex(16)
+    quantized = MatrixIndex(16, quantize=True)
+    for index in (exact, quantized):
+        index.add_with_ids(vectors, ids)
+
+    scores, found = exact.search(vectors[:2], k=3)
+    assert found[:, 0].tolist() == [100, 101]
+    assert np.all(np.diff(scores, axis=1) <= 0)
+    assert quantized.search(vectors[5], k=1)[1][0, 0] == 105
+    assert quantized.nbytes < exact.nbytes / 2
+
+    exact.remove_ids(np.array([100]))
+    exact.write(str(tmp_path / "index.npy"))
+    reloaded = MatrixIndex.read(tmp_path / "index.npy", mmap=True)
+    assert reloaded.ntotal == 199
+    assert reloaded.search(vectors[0], k=1)[1][0, 0] != 100
+    assert reloaded.vectors().flags.c_contiguous
+
+
+def test_vector_index_promotes_to_faiss(tmp_path: Path) -> None:
+    """Testa a troca da matriz NumPy por um IVF do FAISS acima do limite."""
+    vectors = np.random.default_rng(2).normal(size=(6, 8))
+    store = VectorIndexStore(tmp_path, "model", promote_at=4)
+    index = store.get("test_user")
+    index.upsert_many([(f"note-{i}", "v1") for i in range(3)], vectors[:3])
+    assert index.backend == "matrix"
+
+    index.upsert_many([(f"note-{i}", "v1") for i in range(3, 6)], vectors[3:])
+    index.save()
+
+    reloaded = VectorIndexStore(tmp_path, "model", promote_at=4).get("test_user")
+    assert reloaded.backend == "faiss"
+    assert (
+        faiss.extract_index_ivf(faiss.read_index(str(reloaded.index_path))).nlist == 2
+    )
+    assert reloaded.search(vectors[4], k=1)[0][0] == "note-4"
+
+    # O IVF aceita remoção, usada a cada nota apagada
+    assert reloaded.delete("note-4")
+    assert "note-4" not in [note_id for note_id, _ in reloaded.search(vectors[4])]
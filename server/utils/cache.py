@@ -0,0 +1,210 @@
+"""Cache em memória (LRU com TTL) e camada opcional no Redis."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Contadores de uso de um cache."""
+
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    """
+    Cache LRU em memória, seguro entre threads, com expiração por TTL.
+
+    Ao atingir `max_entries`, a entrada usada há mais tempo é descartada.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                del self._data[key]
+            self.stats.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            self.stats.sets += 1
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if self._data.pop(key, _MISSING) is _MISSING:
+                return False
+            self.stats.invalidations += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and (item[1] is None or item[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCache:
+    """Camada de cache compartilhada entre workers, usando `redis.asyncio`."""
+
+    def __init__(self, url: str, ttl: Optional[float] = None, client: Any = None):
+        if client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "O pacote 'redis' é necessário para CACHE_TYPE=redis"
+                ) from e
+            client = Redis.from_url(url, decode_responses=True)
+        self.client = client
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Any:
+        raw = await self.client.get(key)
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        await self.client.set(
+            key, json.dumps(value, default=str), ex=int(ttl) if ttl else None
+        )
+        self.stats.sets += 1
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+        self.stats.invalidations += 1
+
+    async def incr(self, key: str, ttl: Optional[float] = None) -> int:
+        value = int(await self.client.incr(key))
+        if ttl:
+            await self.client.expire(key, int(ttl))
+        return value
+
+    async def get_int(self, key: str) -> int:
+        raw = await self.client.get(key)
+        return int(raw) if raw is not None else 0
+
+
+class TieredCache:
+    """
+    Cache de leitura em duas camadas: LRU local e, opcionalmente, Redis.
+
+    Os valores devem ser serializáveis em JSON. Listagens são invalidadas
+    por geração: cada escopo tem um contador que entra na chave, e
+    incrementá-lo torna obsoletas todas as entradas anteriores de uma vez.
+    """
+
+    # As gerações precisam durar mais que qualquer entrada que as referencie
+    GENERATION_TTL = 24 * 60 * 60
+
+    def __init__(self, local: LRUCache, remote: Optional[RedisCache] = None):
+        self.local = local
+        self.remote = remote
+        self.stats = CacheStats()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats.hits += 1
+            return value
+        value = None
+        if self.remote is not None:
+            try:
+                value = await self.remote.get(key)
+            except Exception as e:
+                logger.warning(f"Falha ao ler do Redis: {str(e)}")
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        self.stats.sets += 1
+        if self.remote is not None:
+            try:
+                await self.remote.set(key, value)
+            except Exception as e:
+                logger.warning(f"Falha ao gravar no Redis: {str(e)}")
+
+    async def delete(self, key: str) -> None:
+        self.local.delete(key)
+        self.stats.invalidations += 1
+        if self.remote is not None:
+            try:
+                await self.remote.delete(key)
+            except Exception as e:
+                logger.warning(f"Falha ao invalidar no Redis: {str(e)}")
+
+    async def generation(self, scope: str) -> int:
+        key = f"gen:{scope}"
+        if self.remote is not None:
+            try:
+                return await self.remote.get_int(key)
+            except Exception as e:
+                logger.warning(f"Falha ao ler geração no Redis: {str(e)}")
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    async def bump(self, scope: str) -> None:
+        key = f"gen:{scope}"
+        self.stats.invalidations += 1
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+        if self.remote is not None:
+            try:
+                await self.remote.incr(key, ttl=self.GENERATION_TTL)
+            except Exception as e:
+                logger.warning(f"Falha ao invalidar geração no Redis: {str(e)}")